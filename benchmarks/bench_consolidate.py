@@ -0,0 +1,141 @@
+"""
+Compare interval table queries with a scan of the combined index histories.
+
+Histories of three S&P-style indices are simulated, with tickers moving
+between them and in and out of the universe, then consolidated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import random
+import timeit
+import typing
+
+from scrape_wiki_snp import consolidate, index
+
+_SIZES = {"S&P 400": 400, "S&P 500": 500, "S&P 600": 600}
+
+
+def _component(symbol: str) -> index.Component:
+    return index.Component(symbol, f"{symbol} Inc.")
+
+
+def _histories(
+    rnd: random.Random, scale: int, years: int
+) -> typing.Dict[str, index.Index]:
+    counter = 0
+
+    def new_symbol() -> str:
+        nonlocal counter
+        counter += 1
+        return f"T{counter}"
+
+    members = {
+        name: {new_symbol() for _ in range(size * scale)}
+        for name, size in _SIZES.items()
+    }
+    diffs: typing.Dict[str, typing.List[index.Diff]] = {name: [] for name in _SIZES}
+    left: typing.List[str] = []
+    names = list(_SIZES)
+
+    date = datetime.date.today() - datetime.timedelta(days=365 * years)
+    while date < datetime.date.today():
+        for _ in range(rnd.randint(1, 4) * scale):
+            target = rnd.choice(names)
+            removed = rnd.choice(sorted(members[target]))
+            source = rnd.choice(names + [""])
+
+            if source and source != target:
+                # Moves up or down from another index, which gets a new ticker.
+                added = rnd.choice(sorted(members[source]))
+                replacement = left.pop() if left else new_symbol()
+                members[source].remove(added)
+                members[source].add(replacement)
+                diffs[source].append(
+                    index.Diff(
+                        date, _component(replacement), _component(added), "Moved."
+                    )
+                )
+            else:
+                added = left.pop() if left else new_symbol()
+
+            members[target].remove(removed)
+            members[target].add(added)
+            diffs[target].append(
+                index.Diff(date, _component(added), _component(removed), "Change.")
+            )
+            left.insert(0, removed)
+        date += datetime.timedelta(days=rnd.randint(1, 30))
+
+    return {
+        name: index.Index(
+            [_component(symbol) for symbol in sorted(members[name])],
+            diffs[name][::-1],
+        )
+        for name in _SIZES
+    }
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1, help="Index size multiplier.")
+    parser.add_argument("--years", type=int, default=30, help="History length.")
+    parser.add_argument("--queries", type=int, default=1000, help="Query count.")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    indices = _histories(rnd, args.scale, args.years)
+
+    build = timeit.timeit(lambda: consolidate.consolidate(indices), number=1)
+    table = consolidate.consolidate(indices)
+
+    first = datetime.date.today() - datetime.timedelta(days=365 * args.years)
+    dates = [
+        first + datetime.timedelta(days=rnd.randint(0, 365 * args.years))
+        for _ in range(args.queries)
+    ]
+    symbols = [rnd.choice(table.rows).symbol for _ in range(args.queries)]
+
+    scan_members = timeit.timeit(
+        lambda: [[row for row in table.rows if date in row] for date in dates[:50]],
+        number=1,
+    )
+    members = timeit.timeit(lambda: [table.members(date) for date in dates], number=1)
+    scan_indices = timeit.timeit(
+        lambda: [
+            [
+                row.index_name
+                for row in table.rows
+                if row.symbol == symbol and date in row
+            ]
+            for symbol, date in zip(symbols[:50], dates)
+        ],
+        number=1,
+    )
+    indices_of = timeit.timeit(
+        lambda: [
+            table.indices_of(symbol, date) for symbol, date in zip(symbols, dates)
+        ],
+        number=1,
+    )
+
+    diffs = sum(len(idx.diffs) for idx in indices.values())
+    print(f"diffs: {diffs}, intervals: {len(table)}, queries: {args.queries}")
+    print(f"consolidate:        {build * 1e3:10.2f} ms")
+    print(f"members() scan:     {scan_members / 50 * 1e6:10.2f} us/query")
+    print(f"members():          {members / args.queries * 1e6:10.2f} us/query")
+    print(f"indices_of() scan:  {scan_indices / 50 * 1e6:10.2f} us/query")
+    print(f"indices_of():       {indices_of / args.queries * 1e6:10.2f} us/query")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""Compare download throughput of per-call requests and the pooled downloader."""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import time
+import typing
+
+import requests
+
+from scrape_wiki_snp.download import Downloader
+from tests.server import StandInServer
+
+
+def _per_call(url: str) -> str:
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return response.text
+
+
+def _throughput(
+    download_fn: typing.Callable[[str], str], urls: typing.List[str], jobs: int
+) -> float:
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        list(executor.map(download_fn, urls))
+    return len(urls) / (time.perf_counter() - start)
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200, help="Request count.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Server latency.")
+    parser.add_argument("--jobs", type=int, default=8, help="Concurrent requests.")
+    parser.add_argument("--size", type=int, default=512, help="Page size, KiB.")
+    args = parser.parse_args()
+
+    with StandInServer({"/page": b"x" * args.size * 1024}, args.latency) as server:
+        urls = [server.url("/page")] * args.requests
+
+        with Downloader(pool_size=args.jobs, per_host=args.jobs, cache=False) as pooled:
+            cases = {
+                "requests.get, serial": (_per_call, 1),
+                "Downloader, serial": (pooled.download, 1),
+                f"requests.get, {args.jobs} jobs": (_per_call, args.jobs),
+                f"Downloader, {args.jobs} jobs": (pooled.download, args.jobs),
+            }
+
+            print(f"{'case':<24} {'req/s':>8}")
+            for name, (download_fn, jobs) in cases.items():
+                print(f"{name:<24} {_throughput(download_fn, urls, jobs):>8.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
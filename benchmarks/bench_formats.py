@@ -0,0 +1,92 @@
+"""Compare size, write and read time of the output formats."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import io
+import json
+import os
+import tempfile
+import timeit
+import typing
+
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+from scrape_wiki_snp import formats, snapshot, stream_parse
+from scrape_wiki_snp.loader import load_index
+
+from . import page
+
+
+def _best(func: typing.Callable[[], typing.Any], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _read_yaml(path: str) -> typing.Any:
+    with io.open(path, "r", encoding="utf-8") as yaml_file:
+        return load_index(yaml_file)
+
+
+def _read_jsonl(path: str) -> typing.Any:
+    with io.open(path, "r", encoding="utf-8") as jsonl_file:
+        return [json.loads(line) for line in jsonl_file]
+
+
+def _read_csv(path: str) -> typing.Any:
+    with io.open(path, "r", encoding="utf-8", newline="") as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def _read_arrow(path: str) -> typing.Any:
+    with pa.ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+_READERS: typing.Dict[str, typing.Callable[[str], typing.Any]] = {
+    "yaml": _read_yaml,
+    "jsonl": _read_jsonl,
+    "csv": _read_csv,
+    "parquet": pq.read_table,
+    "arrow": _read_arrow,
+    "snapshot": snapshot.load,
+}
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=10, help="Page size multiplier.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per format.")
+    args = parser.parse_args()
+
+    idx = stream_parse.parse(page.scaled(args.scale))
+
+    print(f"components: {len(idx.components)}, diffs: {len(idx.diffs)}")
+    print(f"{'format':8} {'size, KiB':>10} {'write, ms':>10} {'read, ms':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, output_format in formats.FORMATS.items():
+            path = os.path.join(directory, "index" + output_format.suffix)
+
+            write = _best(
+                functools.partial(formats.write, idx, name, path), args.repeat
+            )
+            read = _best(functools.partial(_READERS[name], path), args.repeat)
+            size = os.path.getsize(path)
+
+            print(
+                f"{name:8} {size / 2**10:10.1f} {write * 1e3:10.1f} {read * 1e3:10.1f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
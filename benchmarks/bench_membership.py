@@ -0,0 +1,70 @@
+"""Compare as-of membership queries with a full replay of the diffs."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import random
+import timeit
+import typing
+
+from scrape_wiki_snp import index, stream_parse
+from scrape_wiki_snp.membership import Membership, to_date
+
+from . import page
+
+
+def _replay(idx: index.Index, date: datetime.date) -> typing.Set[str]:
+    members = {component.symbol for component in idx.components}
+    for diff in sorted(idx.diffs, key=lambda diff: to_date(diff.date), reverse=True):
+        if to_date(diff.date) <= date:
+            break
+        if diff.added is not None:
+            members.discard(diff.added.symbol)
+        if diff.removed is not None:
+            members.add(diff.removed.symbol)
+    return members
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1, help="Page size multiplier.")
+    parser.add_argument("--queries", type=int, default=1000, help="Query count.")
+    args = parser.parse_args()
+
+    idx = stream_parse.parse(page.scaled(args.scale))
+    dates = [to_date(diff.date) for diff in idx.diffs]
+    rnd = random.Random(0)
+    queries = [
+        min(dates)
+        + datetime.timedelta(days=rnd.randint(0, (max(dates) - min(dates)).days))
+        for _ in range(args.queries)
+    ]
+
+    build = timeit.timeit(lambda: Membership(idx), number=1)
+    membership = Membership(idx)
+
+    replay = timeit.timeit(lambda: [_replay(idx, date) for date in queries], number=1)
+    members = timeit.timeit(
+        lambda: [membership.members(date) for date in queries], number=1
+    )
+    is_member = timeit.timeit(
+        lambda: [membership.is_member("AAPL", date) for date in queries], number=1
+    )
+
+    print(f"diffs: {len(idx.diffs)}, queries: {args.queries}")
+    print(f"build:              {build * 1e3:10.2f} ms")
+    print(f"full replay:        {replay / args.queries * 1e6:10.2f} us/query")
+    print(f"members():          {members / args.queries * 1e6:10.2f} us/query")
+    print(f"is_member():        {is_member / args.queries * 1e6:10.2f} us/query")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
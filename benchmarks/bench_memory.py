@@ -0,0 +1,159 @@
+"""Compare memory held by many index revisions, plain and compact."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import gc
+import tracemalloc
+import typing
+from dataclasses import dataclass
+
+from scrape_wiki_snp import index, stream_parse
+
+from . import page
+
+# (components, changes) of the S&P 400, 500 and 600 pages.
+_INDICES = {
+    "S&P 400": (400, 300),
+    "S&P 500": (page.REAL_COMPONENTS, page.REAL_CHANGES),
+    "S&P 600": (600, 350),
+}
+
+
+@dataclass
+class _LegacyComponent:
+    symbol: str
+    name: str
+
+
+@dataclass
+class _LegacyDiff:
+    date: str
+    added: typing.Optional[_LegacyComponent]
+    removed: typing.Optional[_LegacyComponent]
+    reason: str
+
+
+@dataclass
+class _LegacyIndex:
+    components: typing.List[_LegacyComponent]
+    diffs: typing.List[_LegacyDiff]
+
+
+def _fresh(text: str) -> str:
+    # Separately parsed pages never share string objects.
+    return (text + ".")[:-1]
+
+
+def _fresh_date(date: index.DiffDate) -> index.DiffDate:
+    if isinstance(date, str):
+        return _fresh(date)
+    return datetime.date.fromordinal(date.toordinal())
+
+
+def _legacy_component(
+    component: typing.Optional[index.Component],
+) -> typing.Optional[_LegacyComponent]:
+    if component is None:
+        return None
+    return _LegacyComponent(_fresh(component.symbol), _fresh(component.name))
+
+
+def _legacy(idx: index.Index, dropped: int) -> _LegacyIndex:
+    return _LegacyIndex(
+        [
+            _LegacyComponent(_fresh(component.symbol), _fresh(component.name))
+            for component in idx.components
+        ],
+        [
+            _LegacyDiff(
+                _fresh(index.format_date(diff.date)),
+                _legacy_component(diff.added),
+                _legacy_component(diff.removed),
+                _fresh(diff.reason),
+            )
+            for diff in idx.diffs[dropped:]
+        ],
+    )
+
+
+def _component(
+    component: typing.Optional[index.Component],
+) -> typing.Optional[index.Component]:
+    if component is None:
+        return None
+    return index.Component(_fresh(component.symbol), _fresh(component.name))
+
+
+def _revision(idx: index.Index, dropped: int) -> index.Index:
+    return index.Index(
+        [
+            index.Component(_fresh(component.symbol), _fresh(component.name))
+            for component in idx.components
+        ],
+        [
+            index.Diff(
+                _fresh_date(diff.date),
+                _component(diff.added),
+                _component(diff.removed),
+                _fresh(diff.reason),
+            )
+            for diff in idx.diffs[dropped:]
+        ],
+    )
+
+
+def _retained(build: typing.Callable[[], typing.List[typing.Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--revisions", type=int, default=100, help="Revisions kept per index."
+    )
+    args = parser.parse_args()
+
+    latest = [
+        stream_parse.parse(page.generate(components, changes, noise=0, seed=seed))
+        for seed, (components, changes) in enumerate(_INDICES.values())
+    ]
+    # Revision N is the page as it was N changes ago.
+    revisions = [(idx, dropped) for idx in latest for dropped in range(args.revisions)]
+
+    legacy = _retained(lambda: [_legacy(idx, dropped) for idx, dropped in revisions])
+    slots = _retained(lambda: [_revision(idx, dropped) for idx, dropped in revisions])
+
+    def compact() -> typing.List[index.Index]:
+        interner = index.Interner()
+        return [interner.index(_revision(idx, dropped)) for idx, dropped in revisions]
+
+    compacted = _retained(compact)
+
+    print(f"indices: {', '.join(_INDICES)}, revisions: {len(revisions)}")
+    print(f"dict dataclasses:   {legacy / 2**20:8.2f} MiB")
+    print(f"slots:              {slots / 2**20:8.2f} MiB ({slots / legacy:.0%})")
+    print(
+        f"slots + shared:     {compacted / 2**20:8.2f} MiB ({compacted / legacy:.0%})"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""Compare parse time and peak memory of the parser engines and backends."""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import timeit
+import tracemalloc
+import typing
+
+from scrape_wiki_snp import index, stream_parse, wiki_snp
+
+from . import page
+
+
+def _engines() -> typing.Dict[str, typing.Callable[[str], index.Index]]:
+    engines: typing.Dict[str, typing.Callable[[str], index.Index]] = {
+        f"bs4/{backend}": functools.partial(wiki_snp.parse, backend=backend)
+        for backend in wiki_snp.available_backends()
+    }
+    engines["stream"] = stream_parse.parse
+    return engines
+
+
+def _peak_memory(parse_fn: typing.Callable[[str], index.Index], html: str) -> int:
+    tracemalloc.start()
+    try:
+        parse_fn(html)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1, help="Page size multiplier.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats.")
+    args = parser.parse_args()
+
+    html = page.scaled(args.scale)
+    expected = stream_parse.parse(html)
+
+    print(f"page: {len(html) / 1024:.0f} KiB")
+    print(f"{'engine':<16} {'best, ms':>10} {'peak, KiB':>10}")
+
+    for name, parse_fn in _engines().items():
+        assert parse_fn(html) == expected, f"{name} output differs"
+
+        best = min(
+            timeit.repeat(
+                lambda fn=parse_fn: fn(html),  # type: ignore[misc]
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        peak = _peak_memory(parse_fn, html)
+
+        print(f"{name:<16} {best * 1000:>10.1f} {peak / 1024:>10.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""Compare parsing a downloaded page with parsing it as it arrives."""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+import typing
+
+from scrape_wiki_snp import index, stream_parse
+from scrape_wiki_snp.download import Downloader
+from tests.server import StandInServer
+
+from . import page
+
+
+def _measure(run: typing.Callable[[], index.Index]) -> typing.Tuple[float, int]:
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=10, help="Page size multiplier.")
+    parser.add_argument(
+        "--rate", type=float, default=8.0, help="Server bandwidth, MiB/s."
+    )
+    args = parser.parse_args()
+
+    html = page.scaled(args.scale).encode("utf-8")
+
+    with StandInServer({"/page": html}, rate=args.rate * 2**20) as server, Downloader(
+        cache=False
+    ) as downloader:
+        url = server.url("/page")
+
+        def whole() -> index.Index:
+            return stream_parse.parse(downloader.download(url))
+
+        def streamed() -> index.Index:
+            with downloader.stream_text(url) as chunks:
+                return stream_parse.parse(chunks)
+
+        assert whole() == streamed()
+
+        print(f"page: {len(html) / 2**20:.1f} MiB at {args.rate:.1f} MiB/s")
+        print(f"{'case':<12} {'total, s':>9} {'peak, MiB':>10}")
+        for name, run in (("download", whole), ("stream", streamed)):
+            seconds, peak = _measure(run)
+            print(f"{name:<12} {seconds:>9.2f} {peak / 2**20:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""
+Time and memory profile parsing and yaml dumping and loading at scale.
+
+Results are compared to baselines saved before with ``--save``. Fails if
+time or peak memory of a case grows beyond the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import timeit
+import tracemalloc
+import typing
+
+import bs4
+import yaml
+
+from scrape_wiki_snp import wiki_snp
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.loader import Loader
+
+from . import page
+
+_DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+_BASELINE_VERSION = 1
+
+Case = typing.Callable[[], typing.Any]
+Result = typing.Dict[str, float]
+
+
+def _cases(scale: int) -> typing.Dict[str, Case]:
+    html = page.scaled(scale)
+    tables = bs4.BeautifulSoup(
+        html, "html.parser", parse_only=bs4.SoupStrainer("table")
+    )
+    components_table, diffs_table = tables.find_all("table")
+    idx = wiki_snp.parse(html)
+    text = yaml.dump(idx, None, Dumper)
+
+    return {
+        "parse": lambda: wiki_snp.parse(html),
+        "parse_components": lambda: wiki_snp.parse_components(components_table),
+        "parse_diffs": lambda: wiki_snp.parse_diffs(diffs_table),
+        "Dumper": lambda: yaml.dump(idx, io.StringIO(), Dumper),
+        "Loader": lambda: yaml.load(text, Loader),
+    }
+
+
+def _measure(case: Case, repeat: int) -> Result:
+    seconds = min(timeit.repeat(case, number=1, repeat=repeat))
+
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def _load_baseline(path: str) -> typing.Dict[str, Result]:
+    if not os.path.exists(path):
+        print(f"{path}: no baseline, save one with --save first")
+        return {}
+
+    with io.open(path, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    if baseline.get("version") != _BASELINE_VERSION:
+        print(f"{path}: baseline version is not supported, ignored")
+        return {}
+
+    return typing.cast(typing.Dict[str, Result], baseline["results"])
+
+
+def _save_baseline(path: str, results: typing.Dict[str, Result]) -> None:
+    with io.open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(
+            {"version": _BASELINE_VERSION, "results": results},
+            baseline_file,
+            indent=2,
+            sort_keys=True,
+        )
+        baseline_file.write("\n")
+
+
+def _change(value: float, base: typing.Optional[float]) -> str:
+    if not base:
+        return "new"
+    return f"{value / base - 1:+.0%}"
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales",
+        type=lambda text: [int(scale) for scale in text.split(",")],
+        default=[1, 10, 100],
+        help="Comma separated page size multipliers.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats.")
+    parser.add_argument(
+        "--baseline", default=_DEFAULT_BASELINE, help="Baseline results file."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed time and peak memory growth over the baseline.",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Save results as the new baseline instead of comparing.",
+    )
+    args = parser.parse_args()
+
+    baseline = _load_baseline(args.baseline)
+    results: typing.Dict[str, Result] = {}
+    regressed: typing.List[str] = []
+
+    print(
+        f"{'case':<24} {'best, ms':>10} {'change':>7} {'peak, KiB':>10} {'change':>7}"
+    )
+
+    for scale in args.scales:
+        for name, case in _cases(scale).items():
+            key = f"{scale}x/{name}"
+            result = _measure(case, args.repeat)
+            results[key] = result
+            base = baseline.get(key, {})
+
+            print(
+                f"{key:<24} {result['seconds'] * 1e3:>10.1f} "
+                f"{_change(result['seconds'], base.get('seconds')):>7} "
+                f"{result['peak_bytes'] / 1024:>10.0f} "
+                f"{_change(result['peak_bytes'], base.get('peak_bytes')):>7}"
+            )
+
+            for metric, value in result.items():
+                if metric in base and value > base[metric] * (1 + args.threshold):
+                    regressed.append(f"{key} {metric}")
+
+    if args.save:
+        _save_baseline(args.baseline, {**baseline, **results})
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if regressed:
+        print("regressed: " + ", ".join(regressed))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
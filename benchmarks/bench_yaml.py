@@ -0,0 +1,86 @@
+"""
+Compare pure Python and libyaml index dumpers and loaders.
+
+Fails if the event based `load_index` is not faster, or takes more memory,
+than ``yaml.load`` with `CLoader`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import timeit
+import tracemalloc
+import typing
+
+import yaml
+
+from scrape_wiki_snp import stream_parse, writer
+from scrape_wiki_snp.dumper import CDumper, Dumper
+from scrape_wiki_snp.loader import CLoader, Loader, load_index
+
+from . import page
+
+
+def _best(func: typing.Callable[[], typing.Any], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _peak(func: typing.Callable[[], typing.Any]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    """
+    Benchmark entry point.
+
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=10, help="Page size multiplier.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant.")
+    args = parser.parse_args()
+
+    idx = stream_parse.parse(page.scaled(args.scale))
+    text = yaml.dump(idx, None, Dumper)
+
+    print(f"libyaml: {yaml.__with_libyaml__}, yaml size: {len(text) / 2**20:.2f} MiB")
+
+    dump = _best(lambda: yaml.dump(idx, None, Dumper), args.repeat)
+    c_dump = _best(lambda: yaml.dump(idx, None, CDumper), args.repeat)
+    stream_dump = _best(lambda: writer.dump(idx, io.StringIO()), args.repeat)
+    load = _best(lambda: yaml.load(text, Loader), args.repeat)
+    c_load = _best(lambda: yaml.load(text, CLoader), args.repeat)
+    event_load = _best(lambda: load_index(text), args.repeat)
+
+    c_dump_peak = _peak(lambda: yaml.dump(idx, io.StringIO(), CDumper))
+    stream_dump_peak = _peak(lambda: writer.dump(idx, io.StringIO()))
+    c_peak = _peak(lambda: yaml.load(text, CLoader))
+    event_peak = _peak(lambda: load_index(text))
+
+    print(f"Dumper:       {dump * 1e3:10.1f} ms")
+    print(f"CDumper:      {c_dump * 1e3:10.1f} ms ({dump / c_dump:.1f}x)")
+    print(f"writer.dump:  {stream_dump * 1e3:10.1f} ms ({dump / stream_dump:.1f}x)")
+    print(f"Loader:       {load * 1e3:10.1f} ms")
+    print(f"CLoader:      {c_load * 1e3:10.1f} ms ({load / c_load:.1f}x)")
+    print(f"load_index(): {event_load * 1e3:10.1f} ms ({load / event_load:.1f}x)")
+    print(f"CDumper peak:      {c_dump_peak / 2**20:8.2f} MiB")
+    print(f"writer.dump peak:  {stream_dump_peak / 2**20:8.2f} MiB")
+    print(f"CLoader peak:      {c_peak / 2**20:8.2f} MiB")
+    print(f"load_index() peak: {event_peak / 2**20:8.2f} MiB")
+
+    if event_load >= c_load or event_peak >= c_peak:
+        print("load_index() regressed")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
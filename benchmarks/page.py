@@ -0,0 +1,198 @@
+"""Synthetic S&P-style Wikipedia page generator."""
+
+from __future__ import annotations
+
+import datetime
+import random
+import typing
+
+from scrape_wiki_snp import index
+
+REAL_COMPONENTS = 503
+REAL_CHANGES = 380
+
+_NOISE_PARAGRAPH = (
+    '<p>The <a href="/wiki/S%26P_Global" title="S&amp;P Global">S&amp;P</a> '
+    "index is a stock market index tracking the stock performance of large "
+    "companies listed on stock exchanges in the United States."
+    '<sup id="cite_ref-{n}" class="reference"><a href="#cite_note-{n}">'
+    "[{n}]</a></sup></p>\n"
+)
+
+_NAV_ITEM = '<li><a href="/wiki/Page_{n}" title="Page {n}">Page {n}</a></li>\n'
+
+
+def _symbol(rnd: random.Random, used: typing.Set[str]) -> str:
+    while True:
+        length = rnd.choice((1, 2, 3, 3, 4, 4, 4))
+        symbol = "".join(
+            rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(length)
+        )
+        if rnd.random() < 0.02:
+            symbol += ".B"
+        if symbol not in used:
+            used.add(symbol)
+            return symbol
+
+
+def _name(rnd: random.Random) -> str:
+    words = ("Global", "Holdings", "Systems", "Energy", "Bancorp", "Health", "Group")
+    return f"{rnd.choice(words)} {rnd.choice(words)} {rnd.randint(1, 999)} Inc."
+
+
+def _noise(rnd: random.Random, amount: int) -> str:
+    parts = ['<div class="navbox"><ul>\n']
+    parts += [_NAV_ITEM.format(n=rnd.randint(0, 10**6)) for _ in range(amount)]
+    parts.append("</ul></div>\n")
+    parts += [_NOISE_PARAGRAPH.format(n=idx) for idx in range(amount // 4)]
+    return "".join(parts)
+
+
+def _components_table(rnd: random.Random, symbols: typing.List[str]) -> str:
+    parts = [
+        '<table class="wikitable sortable" id="constituents">\n<tbody>\n'
+        "<tr><th>Symbol</th><th>Security</th><th>GICS Sector</th>"
+        "<th>GICS Sub-Industry</th><th>Headquarters Location</th>"
+        "<th>Date added</th><th>CIK</th><th>Founded</th></tr>\n"
+    ]
+    for symbol in symbols:
+        parts.append(
+            f'<tr>\n<td><a rel="nofollow" class="external text" '
+            f'href="https://www.nyse.com/quote/XNYS:{symbol}">{symbol}</a></td>\n'
+            f'<td><a href="/wiki/{symbol}_Inc." title="{symbol}">{_name(rnd)}</a>'
+            "</td>\n<td>Industrials</td>\n<td>Industrial Conglomerates</td>\n"
+            '<td><a href="/wiki/Saint_Paul">Saint Paul, Minnesota</a></td>\n'
+            "<td>1957-03-04</td>\n<td>0000066740</td>\n<td>1902</td>\n</tr>\n"
+        )
+    parts.append("</tbody></table>\n")
+    return "".join(parts)
+
+
+def _diff_cells(rnd: random.Random, symbol: typing.Optional[str]) -> str:
+    if symbol is None:
+        return "<td></td>\n<td></td>\n"
+    return (
+        f'<td><a href="https://www.nasdaq.com/symbol/{symbol}">{symbol}</a></td>\n'
+        f"<td>{_name(rnd)}</td>\n"
+    )
+
+
+def _pop(rnd: random.Random, symbols: typing.List[str]) -> str:
+    pos = rnd.randrange(len(symbols))
+    symbols[pos], symbols[-1] = symbols[-1], symbols[pos]
+    return symbols.pop()
+
+
+def _change(
+    rnd: random.Random,
+    used: typing.Set[str],
+    members: typing.List[str],
+    former: typing.List[str],
+) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    # Changes are generated newest first, undoing them from the components:
+    # symbols added are members, symbols removed are not, so that the history
+    # agrees with the components table.
+    added = _pop(rnd, members) if members and rnd.random() < 0.9 else None
+    removed = None
+    if rnd.random() < 0.9:
+        # Some symbols removed are added back later.
+        if former and rnd.random() < 0.2:
+            removed = _pop(rnd, former)
+        else:
+            removed = _symbol(rnd, used)
+        members.append(removed)
+    if added is not None:
+        former.append(added)
+    return added, removed
+
+
+def _changes_table(
+    rnd: random.Random,
+    changes: int,
+    used: typing.Set[str],
+    members: typing.List[str],
+    date: datetime.date,
+) -> str:
+    members = list(members)
+    former: typing.List[str] = []
+    parts = [
+        '<table class="wikitable sortable" id="changes">\n<tbody>\n'
+        '<tr>\n<th rowspan="2">Date</th>\n<th colspan="2">Added</th>\n'
+        '<th colspan="2">Removed</th>\n<th rowspan="2">Reason</th>\n</tr>\n'
+        "<tr>\n<th>Ticker</th>\n<th>Security</th>\n"
+        "<th>Ticker</th>\n<th>Security</th>\n</tr>\n"
+    ]
+    written = 0
+    while written < changes:
+        group = min(rnd.choice((1, 1, 1, 2, 3, 4)), changes - written)
+        shared_reason = group > 1 and rnd.random() < 0.5
+        for row in range(group):
+            cells = []
+            if row == 0:
+                span = f' rowspan="{group}"' if group > 1 else ""
+                cells.append(f"<td{span}>{index.format_date(date)}</td>\n")
+            added, removed = _change(rnd, used, members, former)
+            cells.append(_diff_cells(rnd, added))
+            cells.append(_diff_cells(rnd, removed))
+            if row == 0 and shared_reason:
+                cells.append(
+                    f'<td rowspan="{group}">S&amp;P 500 constituent '
+                    f'changes.<sup class="reference">[{written}]</sup></td>\n'
+                )
+            elif not shared_reason:
+                cells.append(
+                    f"<td>{removed or 'Company'} was acquired by "
+                    f"{added or 'another company'}.</td>\n"
+                )
+            parts.append("<tr>\n" + "".join(cells) + "</tr>\n")
+            written += 1
+        date -= datetime.timedelta(days=rnd.randint(1, 40))
+    parts.append("</tbody></table>\n")
+    return "".join(parts)
+
+
+def generate(
+    components: int = REAL_COMPONENTS,
+    changes: int = REAL_CHANGES,
+    noise: int = 2000,
+    seed: int = 0,
+) -> str:
+    """
+    Generate a synthetic S&P index Wikipedia page.
+
+    :param components: Number of rows in the components table.
+    :param changes: Number of rows in the changes table.
+    :param noise: Amount of navigation and prose around the tables.
+    :param seed: Random seed.
+    :return: Page html.
+    """
+    rnd = random.Random(seed)
+    used: typing.Set[str] = set()
+    symbols = [_symbol(rnd, used) for _ in range(components)]
+
+    return "".join(
+        (
+            "<!DOCTYPE html>\n<html><head><title>List of S&amp;P 500 companies"
+            "</title><script>var x = '<table>';</script></head><body>\n",
+            _noise(rnd, noise // 2),
+            "<h2>S&amp;P 500 component stocks</h2>\n",
+            _components_table(rnd, symbols),
+            "<h2>Selected changes to the list of S&amp;P 500 components</h2>\n",
+            _changes_table(rnd, changes, used, symbols, datetime.date(2024, 12, 23)),
+            _noise(rnd, noise),
+            "</body></html>\n",
+        )
+    )
+
+
+def scaled(scale: int, seed: int = 0) -> str:
+    """
+    Generate a page ``scale`` times the size of the real one.
+
+    :param scale: Size multiplier.
+    :param seed: Random seed.
+    :return: Page html.
+    """
+    return generate(
+        REAL_COMPONENTS * scale, REAL_CHANGES * scale, 2000 * scale, seed=seed
+    )
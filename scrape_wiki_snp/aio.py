@@ -0,0 +1,317 @@
+"""Asyncio download and parse, for services running an event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import time
+import typing
+from dataclasses import dataclass
+
+from . import index, spans, wiki_snp
+from .download import RETRY_STATUSES, Downloader, fresh_for, retry_delay
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore[assignment]
+
+
+@dataclass
+class _CacheEntry:
+    text: str
+    etag: typing.Optional[str]
+    last_modified: typing.Optional[str]
+    expires: float
+
+
+# pylint: disable=too-many-instance-attributes
+class AsyncDownloader:
+    """
+    Async http downloader owning a pooled keep-alive client session.
+
+    Follows `download.Downloader`: failed requests (connection errors,
+    timeouts and 429/5xx replies) are retried with exponential backoff and
+    full jitter, and replies are cached like the `requests_cache` http cache
+    does it: fresh replies (``Cache-Control: max-age``) are served from the
+    cache, stale ones are revalidated with ``If-None-Match`` and
+    ``If-Modified-Since``, and served if the request fails (stale-if-error).
+    The cache is kept in memory, per downloader, up to `cache_entries`
+    replies: the least recently used ones are dropped first.
+
+    Requests are sent with aiohttp. If it is not installed, pages are
+    downloaded with a `download.Downloader` in threads, through its http
+    cache.
+
+    :param concurrency: Max number of requests in flight.
+    :param pool_size: Max number of connections kept alive.
+    :param retries: Max number of retries of a failed request.
+    :param backoff: Base retry delay in seconds, doubled on every retry.
+    :param max_backoff: Max retry delay in seconds.
+    :param timeout: Request timeout in seconds.
+    :param cache: Cache replies.
+    :param cache_entries: Max number of replies cached.
+    :param use_aiohttp: Send requests with aiohttp. If not set, use it if
+        installed.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        concurrency: int = 8,
+        pool_size: int = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        cache: bool = True,
+        cache_entries: int = 256,
+        use_aiohttp: typing.Optional[bool] = None,
+    ) -> None:
+        """
+        Init downloader.
+
+        :param concurrency: Max number of requests in flight.
+        :param pool_size: Max number of connections kept alive.
+        :param retries: Max number of retries of a failed request.
+        :param backoff: Base retry delay in seconds, doubled on every retry.
+        :param max_backoff: Max retry delay in seconds.
+        :param timeout: Request timeout in seconds.
+        :param cache: Cache replies.
+        :param cache_entries: Max number of replies cached.
+        :param use_aiohttp: Send requests with aiohttp. If not set, use it if
+            installed.
+        """
+        if use_aiohttp is None:
+            use_aiohttp = aiohttp is not None
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pool_size = pool_size
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._timeout = timeout
+        self._cache: typing.Optional[collections.OrderedDict[str, _CacheEntry]] = (
+            collections.OrderedDict() if cache else None
+        )
+        self._cache_entries = cache_entries
+
+        self._session: typing.Optional[aiohttp.ClientSession] = None
+        self._fallback: typing.Optional[Downloader] = None
+        self._executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if not use_aiohttp:
+            self._fallback = Downloader(
+                pool_size=pool_size,
+                per_host=concurrency,
+                retries=retries,
+                backoff=backoff,
+                max_backoff=max_backoff,
+                timeout=timeout,
+                cache=cache,
+            )
+            self._executor = concurrent.futures.ThreadPoolExecutor(concurrency)
+
+    def _client(self) -> aiohttp.ClientSession:
+        # Client sessions have to be made with the event loop running.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+        return self._session
+
+    async def _get(
+        self, url: str, headers: typing.Dict[str, str]
+    ) -> typing.Tuple[int, bytes, str, typing.Mapping[str, str]]:
+        attempt = 0
+
+        while True:
+            try:
+                async with self._client().get(url, headers=headers) as response:
+                    if (
+                        response.status not in RETRY_STATUSES
+                        or attempt >= self._retries
+                    ):
+                        response.raise_for_status()
+                        body = await response.read()
+                        encoding = response.get_encoding() if body else "utf-8"
+                        return response.status, body, encoding, response.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self._retries:
+                    raise
+
+            await asyncio.sleep(retry_delay(attempt, self._backoff, self._max_backoff))
+            attempt += 1
+
+    def _cached(self, url: str) -> typing.Optional[_CacheEntry]:
+        if self._cache is None or url not in self._cache:
+            return None
+        self._cache.move_to_end(url)
+        return self._cache[url]
+
+    def _store(self, url: str, entry: _CacheEntry) -> None:
+        if self._cache is None:
+            return
+        self._cache[url] = entry
+        self._cache.move_to_end(url)
+        while len(self._cache) > self._cache_entries:
+            self._cache.popitem(last=False)
+
+    def _drop(self, url: str) -> None:
+        if self._cache is not None:
+            self._cache.pop(url, None)
+
+    async def _fetch(self, url: str, current: spans.Span) -> str:
+        entry = self._cached(url)
+        if entry is not None and entry.expires > time.monotonic():
+            current.attributes["from_cache"] = True
+            return entry.text
+
+        headers = {}
+        if entry is not None and entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            status, body, encoding, reply_headers = await self._get(url, headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if entry is None:
+                raise
+            current.attributes["from_cache"] = True
+            current.attributes["stale"] = True
+            return entry.text
+
+        current.attributes["status"] = status
+        current.attributes["bytes"] = len(body)
+        current.attributes["from_cache"] = status == 304
+
+        if status == 304 and entry is not None:
+            # Not modified: keep the validators not sent again.
+            text = entry.text
+            etag = reply_headers.get("ETag", entry.etag)
+            last_modified = reply_headers.get("Last-Modified", entry.last_modified)
+        else:
+            text = body.decode(encoding, "replace")
+            etag = reply_headers.get("ETag")
+            last_modified = reply_headers.get("Last-Modified")
+
+        lifetime = fresh_for(reply_headers)
+        if lifetime is None:
+            self._drop(url)
+        else:
+            self._store(
+                url,
+                _CacheEntry(text, etag, last_modified, time.monotonic() + lifetime),
+            )
+
+        return text
+
+    async def download(self, url: str) -> str:
+        """
+        Download url as a string.
+
+        Reported as a "download" span like `download.Downloader.download`.
+
+        :param url: url to download.
+        :return: content.
+        """
+        async with self._semaphore:
+            if self._fallback is not None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor, self._fallback.download, url
+                )
+
+            with spans.span("download", url=url) as current:
+                return await self._fetch(url, current)
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._fallback is not None:
+            self._fallback.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> AsyncDownloader:
+        """
+        Enter context.
+
+        :return: self.
+        """
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        """
+        Exit context, close pooled connections.
+
+        :param args: Exception info, if any.
+        """
+        await self.close()
+
+
+async def parse(
+    html: str,
+    parse_fn: typing.Callable[[str], index.Index] = wiki_snp.parse,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> index.Index:
+    """
+    Parse page in an executor, not to block the event loop.
+
+    Parsing is CPU bound, a process pool lets pages be parsed in parallel.
+
+    :param html: Page content.
+    :param parse_fn: Page parse function, must be picklable for a process pool.
+    :param executor: Executor to parse in, the loop's default one if not set.
+    :return: Index parsed.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parse_fn, html)
+
+
+async def scrape(
+    url: str,
+    downloader: AsyncDownloader,
+    parse_fn: typing.Callable[[str], index.Index] = wiki_snp.parse,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> index.Index:
+    """
+    Download and parse page.
+
+    :param url: Page url.
+    :param downloader: Downloader to download the page with.
+    :param parse_fn: Page parse function.
+    :param executor: Executor to parse in, the loop's default one if not set.
+    :return: Index parsed.
+    """
+    return await parse(await downloader.download(url), parse_fn, executor)
+
+
+async def scrape_all(
+    urls: typing.Iterable[str],
+    downloader: AsyncDownloader,
+    parse_fn: typing.Callable[[str], index.Index] = wiki_snp.parse,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> typing.List[index.Index]:
+    """
+    Download and parse pages concurrently.
+
+    Up to the downloader concurrency pages are downloaded at once, each one is
+    parsed as soon as it is downloaded.
+
+    :param urls: Page urls.
+    :param downloader: Downloader to download the pages with.
+    :param parse_fn: Page parse function.
+    :param executor: Executor to parse in, the loop's default one if not set.
+    :return: Indices parsed, in the order of the urls.
+    """
+    return list(
+        await asyncio.gather(
+            *(scrape(url, downloader, parse_fn, executor) for url in urls)
+        )
+    )
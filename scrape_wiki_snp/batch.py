@@ -0,0 +1,117 @@
+"""Scrape several index pages at once."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import time
+import typing
+import urllib.parse
+from dataclasses import dataclass, field
+
+from . import index, spans
+from .download import download
+
+
+@dataclass
+class Result:
+    """
+    Batch run result.
+
+    :param indices: Indices parsed, in the order of the urls given.
+    :param timings: Wall clock seconds spent in each stage.
+    """
+
+    indices: typing.List[index.Index]
+    timings: typing.Dict[str, float] = field(default_factory=dict)
+
+
+def read_manifest(path: str) -> typing.List[str]:
+    """
+    Read urls from a manifest file.
+
+    The manifest lists one url per line, blank lines and lines starting with
+    ``#`` are ignored.
+
+    :param path: Manifest file path.
+    :return: Urls listed.
+    """
+    with open(path, "r", encoding="utf-8") as manifest:
+        lines = [line.strip() for line in manifest]
+
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def output_name(url: str) -> str:
+    """
+    Derive an output file name from a page url.
+
+    :param url: Page url, e.g. ``.../wiki/List_of_S%26P_500_companies``.
+    :return: File name without extension, e.g. ``List_of_S&P_500_companies``.
+    """
+    path = urllib.parse.urlsplit(url).path.rstrip("/")
+    name = urllib.parse.unquote(path.rsplit("/", 1)[-1])
+
+    return name.replace(os.sep, "_") or "index"
+
+
+def output_names(urls: typing.Sequence[str]) -> typing.List[str]:
+    """
+    Derive unique output file names from page urls, see `output_name`.
+
+    Names already taken, ignoring case for case-insensitive file systems, get
+    a numeric suffix, e.g. ``index_2``, so that no output overwrites another.
+
+    :param urls: Page urls.
+    :return: File names without extension, in the order of the urls.
+    """
+    names: typing.List[str] = []
+    taken: typing.Set[str] = set()
+    for url in urls:
+        base = output_name(url)
+        name = base
+        number = 1
+        while name.lower() in taken:
+            number += 1
+            name = f"{base}_{number}"
+        taken.add(name.lower())
+        names.append(name)
+
+    return names
+
+
+def run(
+    urls: typing.Sequence[str],
+    parse_fn: typing.Callable[[str], index.Index],
+    download_jobs: int = 8,
+    parse_jobs: typing.Optional[int] = None,
+    download_fn: typing.Callable[[str], str] = download,
+) -> Result:
+    """
+    Download pages concurrently, then parse them in parallel.
+
+    :param urls: Page urls.
+    :param parse_fn: Page parse function, must be picklable.
+    :param download_jobs: Max number of concurrent downloads.
+    :param parse_jobs: Max number of parse processes, cpu count if not set.
+    :param download_fn: Page download function (unit tests only).
+    :return: Indices parsed and stage timings.
+    """
+    result = Result([])
+
+    start = time.perf_counter()
+    with spans.span("batch.download", urls=len(urls)):
+        with concurrent.futures.ThreadPoolExecutor(download_jobs) as executor:
+            pages = list(executor.map(download_fn, urls))
+    result.timings["download"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with spans.span("batch.parse", jobs=parse_jobs):
+        if len(pages) <= 1 or parse_jobs == 1:
+            result.indices = [parse_fn(page) for page in pages]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(parse_jobs) as executor:
+                result.indices = list(executor.map(parse_fn, pages))
+    result.timings["parse"] = time.perf_counter() - start
+
+    return result
@@ -0,0 +1,232 @@
+"""Membership intervals of several indices in one table."""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import datetime
+import typing
+from dataclasses import dataclass
+
+from . import index, lookup
+from .membership import to_date
+
+COLUMNS = ("symbol", "index", "start", "end")
+"""Columns of the interval table written by `write_csv`."""
+
+# Ordinals of the unbounded interval ends.
+_BEFORE = datetime.date.min.toordinal() - 1
+_AFTER = datetime.date.max.toordinal() + 1
+
+
+@dataclass(frozen=True)
+class IndexInterval:
+    """
+    Membership interval of a symbol in an index, the start date included and
+    the end date excluded.
+
+    :param symbol: Ticker symbol.
+    :param index_name: Index name, e.g. "S&P 500".
+    :param start: Date the symbol was added, None if it was a member before
+        the oldest diff known.
+    :param end: Date the symbol was removed, None if it is a member now.
+    """
+
+    symbol: str
+    index_name: str
+    start: typing.Optional[datetime.date]
+    end: typing.Optional[datetime.date]
+
+    def __contains__(self, date: datetime.date) -> bool:
+        """
+        Check whether the symbol was a member at a date.
+
+        :param date: Date to look at.
+        :return: True if the date is in the interval.
+        """
+        return (self.start is None or self.start <= date) and (
+            self.end is None or date < self.end
+        )
+
+
+def _start(row: IndexInterval) -> int:
+    return _BEFORE if row.start is None else row.start.toordinal()
+
+
+def _end(row: IndexInterval) -> int:
+    return _AFTER if row.end is None else row.end.toordinal()
+
+
+# pylint: disable=too-few-public-methods
+class _Node:
+    # Centered interval tree node: the intervals containing the center, and
+    # the subtrees of the ones ending before it and starting after it.
+
+    __slots__ = ("center", "by_start", "starts", "by_end", "neg_ends", "left", "right")
+
+    def __init__(
+        self, rows: typing.List[int], starts: typing.List[int], ends: typing.List[int]
+    ) -> None:
+        self.center = sorted(starts[row] for row in rows)[len(rows) // 2]
+
+        here = []
+        left = []
+        right = []
+        for row in rows:
+            if ends[row] <= self.center:
+                left.append(row)
+            elif starts[row] > self.center:
+                right.append(row)
+            else:
+                here.append(row)
+
+        self.by_start = sorted(here, key=starts.__getitem__)
+        self.starts = [starts[row] for row in self.by_start]
+        self.by_end = sorted(here, key=ends.__getitem__, reverse=True)
+        self.neg_ends = [-ends[row] for row in self.by_end]
+
+        self.left = _Node(left, starts, ends) if left else None
+        self.right = _Node(right, starts, ends) if right else None
+
+
+class IntervalTable:
+    """
+    Membership intervals of symbols in several indices, for point queries.
+
+    Rows are kept sorted by symbol and start date, so the intervals of a
+    symbol are found with a bisect. The members at a date are found with a
+    centered interval tree. Both queries take logarithmic time, plus the
+    number of intervals found.
+
+    :param rows: Intervals, in any order.
+    """
+
+    def __init__(self, rows: typing.Iterable[IndexInterval]) -> None:
+        """
+        Sort intervals and build the interval tree.
+
+        :param rows: Intervals, in any order.
+        """
+        self.rows: typing.List[IndexInterval] = sorted(
+            rows, key=lambda row: (row.symbol, _start(row), row.index_name)
+        )
+        """Intervals, sorted by symbol, start date and index name."""
+
+        self._symbols = [row.symbol for row in self.rows]
+        self._starts = [_start(row) for row in self.rows]
+        self._ends = [_end(row) for row in self.rows]
+
+        # Empty intervals (added and removed on one date) never match.
+        non_empty = [
+            row
+            for row, (start, end) in enumerate(zip(self._starts, self._ends))
+            if start < end
+        ]
+        self._root = _Node(non_empty, self._starts, self._ends) if non_empty else None
+
+    def __len__(self) -> int:
+        """
+        Count intervals.
+
+        :return: Number of intervals.
+        """
+        return len(self.rows)
+
+    def history(self, symbol: str) -> typing.List[IndexInterval]:
+        """
+        Get intervals of a symbol in all the indices.
+
+        :param symbol: Ticker symbol.
+        :return: Intervals, oldest first.
+        """
+        lo = bisect.bisect_left(self._symbols, symbol)
+        hi = bisect.bisect_right(self._symbols, symbol, lo)
+        return self.rows[lo:hi]
+
+    def indices_of(
+        self, symbol: str, date: typing.Union[datetime.date, str]
+    ) -> typing.List[str]:
+        """
+        Get indices a symbol was a member of at a date.
+
+        :param symbol: Ticker symbol.
+        :param date: Date to look at, or a date text like "September 18, 2023".
+        :return: Index names, usually one or none.
+        """
+        point = to_date(date).toordinal()
+        lo = bisect.bisect_left(self._symbols, symbol)
+        hi = bisect.bisect_right(self._symbols, symbol, lo)
+        # Intervals of the symbol starting after the date can not match.
+        hi = bisect.bisect_right(self._starts, point, lo, hi)
+        return [
+            self.rows[row].index_name
+            for row in range(lo, hi)
+            if point < self._ends[row]
+        ]
+
+    def members(
+        self, date: typing.Union[datetime.date, str]
+    ) -> typing.List[IndexInterval]:
+        """
+        Get members of all the indices at a date.
+
+        :param date: Date to look at, or a date text like "September 18, 2023".
+        :return: Intervals containing the date, sorted like `rows`.
+        """
+        point = to_date(date).toordinal()
+        found: typing.List[int] = []
+
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                # All the intervals here end after the point.
+                found += node.by_start[: bisect.bisect_right(node.starts, point)]
+                node = node.left
+            else:
+                # All the intervals here start before the point.
+                found += node.by_end[: bisect.bisect_left(node.neg_ends, -point)]
+                node = node.right if point > node.center else None
+
+        found.sort()
+        return [self.rows[row] for row in found]
+
+
+def consolidate(indices: typing.Mapping[str, index.Index]) -> IntervalTable:
+    """
+    Merge membership intervals of several indices into one table.
+
+    Intervals of every index are found with `lookup.build`.
+
+    :param indices: Indices by name, e.g. the S&P 400, 500 and 600 lists.
+    :return: Interval table.
+    """
+    rows = []
+    for name, idx in indices.items():
+        for history in lookup.build(idx).histories.values():
+            rows += [
+                IndexInterval(history.symbol, name, interval.start, interval.end)
+                for interval in history.intervals
+            ]
+
+    return IntervalTable(rows)
+
+
+def write_csv(rows: typing.Iterable[IndexInterval], stream: typing.TextIO) -> None:
+    """
+    Write intervals as CSV with a `COLUMNS` header, dates in ISO format and
+    empty for unbounded ends.
+
+    :param rows: Intervals to write.
+    :param stream: Text stream to write to.
+    """
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow(
+            (
+                row.symbol,
+                row.index_name,
+                "" if row.start is None else row.start.isoformat(),
+                "" if row.end is None else row.end.isoformat(),
+            )
+        )
@@ -0,0 +1,318 @@
+"""Changes between two versions of an index."""
+
+from __future__ import annotations
+
+import collections
+import typing
+from dataclasses import dataclass, field
+
+from . import index
+
+Event = typing.Dict[str, typing.Any]
+"""JSON serializable change, see `Delta.events`."""
+
+_T = typing.TypeVar("_T")
+
+
+def _diff_identity(
+    diff: index.Diff,
+) -> typing.Tuple[index.DiffDate, typing.Optional[str], typing.Optional[str]]:
+    # Rows equal but for the names and the reason are edits of one another.
+    return (
+        diff.date,
+        None if diff.added is None else diff.added.symbol,
+        None if diff.removed is None else diff.removed.symbol,
+    )
+
+
+def _component_event(
+    component: typing.Optional[index.Component],
+) -> typing.Optional[Event]:
+    if component is None:
+        return None
+    return {"symbol": component.symbol, "name": component.name}
+
+
+def _diff_event(diff: index.Diff) -> Event:
+    return {
+        "date": diff.date if isinstance(diff.date, str) else diff.date.isoformat(),
+        "added": _component_event(diff.added),
+        "removed": _component_event(diff.removed),
+        "reason": diff.reason,
+    }
+
+
+@dataclass
+class Delta:
+    """
+    Changes from an old version of an index to a new one.
+
+    :param components_added: Components in the new version only.
+    :param components_removed: Components in the old version only.
+    :param components_renamed: Old and new component of a symbol whose name
+        changed.
+    :param diffs_added: Diffs in the new version only.
+    :param diffs_removed: Diffs in the old version only.
+    :param diffs_edited: Old and new diff of the same date, added and removed
+        symbols whose names or reason changed.
+    """
+
+    components_added: typing.List[index.Component] = field(default_factory=list)
+    components_removed: typing.List[index.Component] = field(default_factory=list)
+    components_renamed: typing.List[typing.Tuple[index.Component, index.Component]] = (
+        field(default_factory=list)
+    )
+    diffs_added: typing.List[index.Diff] = field(default_factory=list)
+    diffs_removed: typing.List[index.Diff] = field(default_factory=list)
+    diffs_edited: typing.List[typing.Tuple[index.Diff, index.Diff]] = field(
+        default_factory=list
+    )
+
+    def __bool__(self) -> bool:
+        """
+        Check whether anything changed.
+
+        :return: True if there is any change.
+        """
+        return any(
+            (
+                self.components_added,
+                self.components_removed,
+                self.components_renamed,
+                self.diffs_added,
+                self.diffs_removed,
+                self.diffs_edited,
+            )
+        )
+
+    def events(self) -> typing.List[Event]:
+        """
+        Convert to JSON serializable events.
+
+        :return: "component_added", "component_removed", "component_renamed",
+            "diff_added", "diff_removed" and "diff_edited" events, in this
+            order. Renames and edits have the "old" and the "new" values.
+        """
+        events: typing.List[Event] = []
+
+        for kind, components in (
+            ("component_added", self.components_added),
+            ("component_removed", self.components_removed),
+        ):
+            events += [
+                {"event": kind, "component": _component_event(component)}
+                for component in components
+            ]
+        events += [
+            {
+                "event": "component_renamed",
+                "old": _component_event(old),
+                "new": _component_event(new),
+            }
+            for old, new in self.components_renamed
+        ]
+
+        for kind, diffs in (
+            ("diff_added", self.diffs_added),
+            ("diff_removed", self.diffs_removed),
+        ):
+            events += [{"event": kind, "diff": _diff_event(diff)} for diff in diffs]
+        events += [
+            {"event": "diff_edited", "old": _diff_event(old), "new": _diff_event(new)}
+            for old, new in self.diffs_edited
+        ]
+
+        return events
+
+
+@dataclass
+class _Keys:
+    # Row keys of an index, computed once when it is compared several times.
+    # Keys are ids of the row values, given by an intern table shared by the
+    # versions compared: rows are equal if and only if their ids are. Tuple
+    # hashes are not cached, so hashing rows on every set or dict operation
+    # would dominate the time, ids are hashed for free.
+    idx: index.Index
+    components: typing.List[int]
+    diffs: typing.List[int]
+    component_counts: typing.Dict[int, int]
+    diff_counts: typing.Dict[int, int]
+    component_duplicates: typing.List[int]
+    diff_duplicates: typing.List[int]
+
+
+def _keys(idx: index.Index, ids: typing.Dict[typing.Hashable, int]) -> _Keys:
+    components = [
+        ids.setdefault((component.symbol, component.name), len(ids))
+        for component in idx.components
+    ]
+    diffs = [
+        ids.setdefault(
+            (
+                diff.date,
+                None if diff.added is None else (diff.added.symbol, diff.added.name),
+                (
+                    None
+                    if diff.removed is None
+                    else (diff.removed.symbol, diff.removed.name)
+                ),
+                diff.reason,
+            ),
+            len(ids),
+        )
+        for diff in idx.diffs
+    ]
+    component_counts = dict(collections.Counter(components))
+    diff_counts = dict(collections.Counter(diffs))
+    return _Keys(
+        idx,
+        components,
+        diffs,
+        component_counts,
+        diff_counts,
+        [key for key, count in component_counts.items() if count > 1],
+        [key for key, count in diff_counts.items() if count > 1],
+    )
+
+
+def _unmatched(
+    items: typing.Sequence[_T],
+    keys: typing.Sequence[int],
+    counts: typing.Dict[int, int],
+    duplicates: typing.Iterable[int],
+    other: typing.Dict[int, int],
+) -> typing.List[_T]:
+    # Items whose key is not in the other multiset, in their order. The keys
+    # in excess are the set difference of the keys, and the duplicate keys
+    # listed more times than in the other multiset.
+    matched = dict.fromkeys(counts.keys() - other.keys(), 0)
+    for key in duplicates:
+        if counts[key] > other.get(key, 0):
+            matched[key] = other.get(key, 0)
+    if not matched:
+        return []
+
+    result = []
+    for item, key in zip(items, keys):
+        left = matched.get(key)
+        if left is None:
+            continue
+        if left:
+            matched[key] = left - 1
+        else:
+            result.append(item)
+    return result
+
+
+def _pair(
+    removed: typing.List[_T],
+    added: typing.List[_T],
+    identity: typing.Callable[[_T], typing.Hashable],
+) -> typing.Tuple[typing.List[_T], typing.List[_T], typing.List[typing.Tuple[_T, _T]]]:
+    # Pair removed and added items of the same identity, in their order.
+    candidates: typing.Dict[typing.Hashable, typing.Deque[int]] = {}
+    for position, item in enumerate(removed):
+        candidates.setdefault(identity(item), collections.deque()).append(position)
+
+    paired_positions = set()
+    pairs = []
+    added_rest = []
+    for item in added:
+        found = candidates.get(identity(item))
+        if found:
+            position = found.popleft()
+            paired_positions.add(position)
+            pairs.append((removed[position], item))
+        else:
+            added_rest.append(item)
+
+    removed_rest = [
+        item
+        for position, item in enumerate(removed)
+        if position not in paired_positions
+    ]
+    return removed_rest, added_rest, pairs
+
+
+def _compare(old: _Keys, new: _Keys) -> Delta:
+    result = Delta()
+
+    if old.component_counts != new.component_counts:
+        removed = _unmatched(
+            old.idx.components,
+            old.components,
+            old.component_counts,
+            old.component_duplicates,
+            new.component_counts,
+        )
+        added = _unmatched(
+            new.idx.components,
+            new.components,
+            new.component_counts,
+            new.component_duplicates,
+            old.component_counts,
+        )
+        (
+            result.components_removed,
+            result.components_added,
+            result.components_renamed,
+        ) = _pair(removed, added, lambda component: component.symbol)
+
+    if old.diff_counts != new.diff_counts:
+        removed_diffs = _unmatched(
+            old.idx.diffs,
+            old.diffs,
+            old.diff_counts,
+            old.diff_duplicates,
+            new.diff_counts,
+        )
+        added_diffs = _unmatched(
+            new.idx.diffs,
+            new.diffs,
+            new.diff_counts,
+            new.diff_duplicates,
+            old.diff_counts,
+        )
+        (
+            result.diffs_removed,
+            result.diffs_added,
+            result.diffs_edited,
+        ) = _pair(removed_diffs, added_diffs, _diff_identity)
+
+    return result
+
+
+def delta(old: index.Index, new: index.Index) -> Delta:
+    """
+    Find changes from an old version of an index to a new one.
+
+    Components and diffs are matched by value, through sets and dicts, in
+    linear time. Duplicates count: a component listed twice and then once is
+    removed once. Unmatched components of the same symbol are renames,
+    unmatched diffs of the same date, added and removed symbols are edits.
+
+    :param old: Old index version.
+    :param new: New index version.
+    :return: Changes.
+    """
+    ids: typing.Dict[typing.Hashable, int] = {}
+    return _compare(_keys(old, ids), _keys(new, ids))
+
+
+def deltas(indices: typing.Iterable[index.Index]) -> typing.Iterator[Delta]:
+    """
+    Find changes between consecutive versions of an index.
+
+    Keys of every version are computed once, not once per comparison. The
+    ids of all the distinct rows seen are kept until the end.
+
+    :param indices: Index versions, oldest first.
+    :return: Changes from every version to the next one.
+    """
+    ids: typing.Dict[typing.Hashable, int] = {}
+    previous: typing.Optional[_Keys] = None
+    for idx in indices:
+        current = _keys(idx, ids)
+        if previous is not None:
+            yield _compare(previous, current)
+        previous = current
@@ -2,8 +2,72 @@
 
 from __future__ import annotations
 
+import codecs
+import contextlib
+import datetime
+import random
+import threading
+import time
+import typing
+import urllib.parse
+
 import requests
+import requests.adapters
 import requests_cache
+from requests_cache.models.response import CachedResponse
+from requests_cache.policy.actions import CacheActions
+from requests_cache.policy.directives import CacheDirectives
+from requests_cache.policy.expiration import get_expiration_datetime
+from requests_cache.session import OriginalSession  # type: ignore[attr-defined]
+
+from . import spans
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+"""Reply statuses retried."""
+
+CHUNK_SIZE = 64 * 1024
+"""Bytes read from the network at a time by `Downloader.stream_text`."""
+
+
+def retry_delay(attempt: int, backoff: float, max_backoff: float) -> float:
+    """
+    Get delay before a retry: exponential backoff with full jitter.
+
+    :param attempt: Number of the attempt failed, from 0.
+    :param backoff: Base retry delay in seconds, doubled on every retry.
+    :param max_backoff: Max retry delay in seconds.
+    :return: Seconds to wait.
+    """
+    return random.uniform(0, min(max_backoff, backoff * 2**attempt))
+
+
+def fresh_for(headers: typing.Mapping[str, str]) -> typing.Optional[float]:
+    """
+    Get how long a reply may be served from a cache without revalidation,
+    reading its headers the way the http cache does it: ``Cache-Control``
+    first, then ``Expires``.
+
+    :param headers: Reply headers.
+    :return: Seconds, 0 if the reply must be revalidated every time, None if
+        it must not be stored.
+    """
+    directives = CacheDirectives.from_headers(dict(headers))
+    if directives.no_store:
+        return None
+    if directives.no_cache:
+        return 0.0
+    if directives.max_age is not None:
+        return max(0.0, float(directives.max_age))
+
+    expires = (
+        get_expiration_datetime(directives.expires, ignore_invalid_httpdate=True)
+        if directives.expires
+        else None
+    )
+    if expires is None:
+        return 0.0
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return max(0.0, (expires - now).total_seconds())
 
 
 def _install_cache() -> None:
@@ -21,6 +85,325 @@ def _install_cache() -> None:
     )
 
 
+# pylint: disable=too-many-instance-attributes
+class Downloader:
+    """
+    Http downloader owning a pooled keep-alive session.
+
+    Failed requests (connection errors, timeouts and 429/5xx replies) are
+    retried with exponential backoff and full jitter.
+
+    :param pool_size: Max number of connections kept alive per host.
+    :param per_host: Max number of concurrent requests to one host.
+    :param retries: Max number of retries of a failed request.
+    :param backoff: Base retry delay in seconds, doubled on every retry.
+    :param max_backoff: Max retry delay in seconds.
+    :param timeout: Request timeout in seconds.
+    :param cache: Go through the `requests_cache` http cache.
+    :param sleep: Sleep function (unit tests only).
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        pool_size: int = 10,
+        per_host: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        cache: bool = True,
+        sleep: typing.Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Init downloader.
+
+        :param pool_size: Max number of connections kept alive per host.
+        :param per_host: Max number of concurrent requests to one host.
+        :param retries: Max number of retries of a failed request.
+        :param backoff: Base retry delay in seconds, doubled on every retry.
+        :param max_backoff: Max retry delay in seconds.
+        :param timeout: Request timeout in seconds.
+        :param cache: Go through the `requests_cache` http cache.
+        :param sleep: Sleep function (unit tests only).
+        """
+        self._uncached = OriginalSession()
+        if cache:
+            _install_cache()
+            self._session = requests.Session()
+        else:
+            self._session = self._uncached
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+        )
+        for session in (self._session, self._uncached):
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+        self._per_host = per_host
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._timeout = timeout
+        self._sleep = sleep
+
+        self._hosts_lock = threading.Lock()
+        self._hosts: typing.Dict[str, threading.BoundedSemaphore] = {}
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(url).netloc
+
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self._per_host)
+            return self._hosts[host]
+
+    def _delay(self, attempt: int) -> float:
+        return retry_delay(attempt, self._backoff, self._max_backoff)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        stream: bool = False,
+        cache: bool = True,
+    ) -> requests.Response:
+        """
+        Send request, retrying on failures.
+
+        :param method: Http method.
+        :param url: url to request.
+        :param headers: Extra request headers.
+        :param stream: Do not read the response body right away.
+        :param cache: Go through the http cache, if the downloader does.
+        :return: Successful response.
+        """
+        session = self._session if cache else self._uncached
+        attempt = 0
+
+        while True:
+            try:
+                with self._host_slot(url):
+                    response = session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        timeout=self._timeout,
+                        stream=stream,
+                    )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self._retries:
+                    raise
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self._retries
+                ):
+                    response.raise_for_status()
+                    return response
+                response.close()
+
+            self._sleep(self._delay(attempt))
+            attempt += 1
+
+    def get(
+        self,
+        url: str,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        stream: bool = False,
+        cache: bool = True,
+    ) -> requests.Response:
+        """
+        Send GET request, retrying on failures.
+
+        :param url: url to get.
+        :param headers: Extra request headers.
+        :param stream: Do not read the response body right away.
+        :param cache: Go through the http cache, if the downloader does.
+        :return: Successful response.
+        """
+        return self.request("GET", url, headers, stream, cache)
+
+    def head(
+        self, url: str, headers: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> requests.Response:
+        """
+        Send HEAD request, retrying on failures.
+
+        :param url: url to request.
+        :param headers: Extra request headers.
+        :return: Successful response.
+        """
+        return self.request("HEAD", url, headers)
+
+    def download(self, url: str) -> str:
+        """
+        Download url as a string.
+
+        Reported as a "download" span with the url, the status, the bytes
+        received and whether the reply came from the http cache.
+
+        :param url: url to download.
+        :return: content.
+        """
+        with spans.span("download", url=url) as current:
+            response = self.get(url)
+            current.attributes["status"] = response.status_code
+            current.attributes["bytes"] = len(response.content)
+            current.attributes["from_cache"] = getattr(response, "from_cache", False)
+            return response.text
+
+    @contextlib.contextmanager
+    def stream_text(
+        self, url: str, chunk_size: int = CHUNK_SIZE
+    ) -> typing.Iterator[typing.Iterator[str]]:
+        """
+        Download url as text chunks decoded as they arrive.
+
+        The connection is closed when the ``with`` block ends, even if not all
+        the chunks are read. Reported as a "download" span like `download`,
+        with the bytes read by then; spans started in the ``with`` block, e.g.
+        the parse, are nested in it.
+
+        Through the http cache, a fresh cached reply is served as chunks too.
+        Otherwise the body is streamed from the network all the same, and
+        stored in the cache once read to the end; a stale cached reply is
+        served if the request fails, as the cache does it.
+
+        :param url: url to download.
+        :param chunk_size: Bytes to read at a time.
+        :return: Context manager yielding an iterator over text chunks.
+        """
+        with spans.span("download", url=url, bytes=0) as current:
+            cached = self._cached(url)
+            if cached is not None and not cached.is_expired:
+                cached.raise_for_status()
+                response: requests.Response = cached
+            else:
+                try:
+                    response = self.get(url, stream=True, cache=False)
+                except requests.RequestException:
+                    if cached is None:
+                        raise
+                    response = cached
+
+            with response:
+                current.attributes["status"] = response.status_code
+                current.attributes["from_cache"] = response is cached
+                # Read past the http cache: keep the body to store it once whole.
+                store = self._session is not self._uncached and response is not cached
+                body: typing.List[bytes] = []
+
+                def count(chunks: typing.Iterator[bytes]) -> typing.Iterator[bytes]:
+                    for chunk in chunks:
+                        current.attributes["bytes"] += len(chunk)
+                        if store:
+                            body.append(chunk)
+                        yield chunk
+                    if store:
+                        self._store(response, b"".join(body))
+
+                yield iter_text(
+                    count(response.iter_content(chunk_size)), response.encoding
+                )
+
+    def _cached(self, url: str) -> typing.Optional[CachedResponse]:
+        # Reply the http cache holds for url: fresh, or stale if the cache
+        # would serve it on errors.
+        if not isinstance(self._session, requests_cache.CachedSession):
+            return None
+
+        response = self._session.get(url, only_if_cached=True, timeout=self._timeout)
+        if response.status_code == 504 or not isinstance(response, CachedResponse):
+            return None
+        return response
+
+    def _store(self, response: requests.Response, content: bytes) -> None:
+        # Store a reply streamed past the http cache the way the cache would.
+        if not isinstance(self._session, requests_cache.CachedSession):
+            return
+
+        response._content = content  # pylint: disable=protected-access
+        cache = self._session.cache
+        # Keyed with the settings requests merges in, e.g. a CA bundle to verify.
+        settings = self._session.merge_environment_settings(
+            response.url, {}, True, None, None
+        )
+        key = cache.create_key(response.request, **settings)
+        actions = CacheActions.from_request(
+            key, response.request, self._session.settings
+        )
+        actions.update_from_response(response)
+        if not actions.skip_write:
+            cache.save_response(response, key, actions.expires)
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._session.close()
+        self._uncached.close()
+
+    def __enter__(self) -> Downloader:
+        """
+        Enter context.
+
+        :return: self.
+        """
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        """
+        Exit context, close pooled connections.
+
+        :param args: Exception info, if any.
+        """
+        self.close()
+
+
+def iter_text(
+    chunks: typing.Iterable[bytes], encoding: typing.Optional[str]
+) -> typing.Iterator[str]:
+    """
+    Decode body chunks incrementally.
+
+    Unlike ``response.text``, UTF-8 is assumed if the reply does not tell its
+    encoding, rather than guessed from the whole body.
+
+    :param chunks: Body chunks, e.g. ``response.iter_content(CHUNK_SIZE)``.
+    :param encoding: Body encoding, e.g. ``response.encoding``.
+    :return: Iterator over text chunks.
+    """
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")("replace")
+
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+_DEFAULTS_LOCK = threading.Lock()
+_DEFAULTS: typing.Dict[bool, Downloader] = {}
+
+
+def default_downloader(cache: bool = True) -> Downloader:
+    """
+    Get downloader shared by the module level functions.
+
+    :param cache: Get the one going through the http cache, or the one not.
+    :return: Downloader with default settings.
+    """
+    with _DEFAULTS_LOCK:
+        if cache not in _DEFAULTS:
+            _DEFAULTS[cache] = Downloader(cache=cache)
+        return _DEFAULTS[cache]
+
+
 def download(url: str) -> str:
     """
     Download url as a string.
@@ -28,9 +411,15 @@ def download(url: str) -> str:
     :param url: url to download.
     :return: content.
     """
-    _install_cache()
+    return default_downloader().download(url)
 
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
 
-    return response.text
+def stream_text(url: str) -> typing.ContextManager[typing.Iterator[str]]:
+    """
+    Download url as text chunks decoded as they arrive.
+
+    :param url: url to download.
+    :return: Context manager yielding an iterator over text chunks, see
+        `Downloader.stream_text`.
+    """
+    return default_downloader().stream_text(url)
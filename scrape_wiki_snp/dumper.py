@@ -2,26 +2,54 @@
 
 from __future__ import annotations
 
+import datetime
+import re
 import typing
 
 import yaml
+import yaml.representer
+import yaml.resolver
+import yaml.serializer
 
-from . import index
+from . import index, spans
 
+_NOT_ANCHOR_CHARS = re.compile(r"[^0-9A-Za-z_-]")
 
-class Dumper(yaml.SafeDumper):
-    """yaml dumper for index types class."""
 
-    def __init__(self, *args, **kwargs) -> None:  # type: ignore
-        """
-        Init dumper.
+def symbol_anchor(symbol: str, taken: typing.Collection[str]) -> str:
+    """
+    Make yaml anchor of a component.
 
-        :param args: Args to forward to SafeDumper constructor.
-        :param kwargs: Keyword args to forward to SafeDumper constructor.
-        """
-        super().__init__(*args, **kwargs)
+    Characters yaml does not allow in anchors are replaced (``BRK.B`` becomes
+    ``BRK_B``) and a number is appended to the anchors taken already
+    (``ABC_2``).
+
+    :param symbol: Component symbol.
+    :param taken: Anchors taken already in the document.
+    :return: Anchor string.
+    """
+    base = _NOT_ANCHOR_CHARS.sub("_", symbol)
+    anchor = base or "_"
+    number = 1
+    while anchor in taken:
+        number += 1
+        anchor = f"{base}_{number}"
+
+    return anchor
+
+
+if typing.TYPE_CHECKING:
+    _DumperBase = yaml.SafeDumper
+else:
+    _DumperBase = object
+
+
+class DumperMixin(_DumperBase):
+    """Representation of index types and symbol anchors, for any dumper."""
 
+    def _init_index(self) -> None:
         self._node2component: typing.Dict[yaml.Node, index.Component] = {}
+        self._anchors: typing.Set[str] = set()
 
     def represent_component(self, component: index.Component) -> yaml.Node:
         """
@@ -74,20 +102,172 @@ class Dumper(yaml.SafeDumper):
             },
         )
 
+    def ignore_aliases(self, data: typing.Any) -> bool:
+        """
+        Check whether an object is written in full every time it is seen.
+
+        Dates are, like the other scalars: diffs of one day often share one
+        date object.
+
+        :param data: Object to represent.
+        :return: True if no anchor is ever made for the object.
+        """
+        if isinstance(data, datetime.date):
+            return True
+
+        result: bool = super().ignore_aliases(data)
+        return result
+
+    def represent(self, data: typing.Any) -> None:
+        """
+        Build document node graph, then serialize it.
+
+        Reported as a "represent" span, the node graph is its peak memory.
+
+        :param data: Document object.
+        """
+        with spans.span("represent"):
+            super().represent(data)
+
+    def serialize(self, node: yaml.Node) -> None:
+        """
+        Serialize document.
+
+        :param node: Document root node.
+        """
+        self._anchors.clear()
+        super().serialize(node)
+
     def generate_anchor(self, node: yaml.Node) -> str:
         """
         Generate yaml anchor.
 
+        Components are anchored by their symbols, see `symbol_anchor`.
+
         :param node: node to generate anchor for.
         :return: Anchor string.
         """
         if isinstance(node, yaml.MappingNode) and node.tag == index.Component.tag:
-            return self._node2component[node].symbol
+            symbol = self._node2component[node].symbol
+            anchor = symbol_anchor(symbol, self._anchors)
+        else:
+            anchor = super().generate_anchor(node)  # type: ignore
+            while anchor in self._anchors:
+                anchor = super().generate_anchor(node)
 
-        result: str = super().generate_anchor(node)  # type: ignore
-        return result
+        self._anchors.add(anchor)
+        return anchor
+
+
+# pylint: disable=too-many-ancestors
+class Dumper(DumperMixin, yaml.SafeDumper):
+    """yaml dumper for index types class."""
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        """
+        Init dumper.
+
+        :param args: Args to forward to SafeDumper constructor.
+        :param kwargs: Keyword args to forward to SafeDumper constructor.
+        """
+        super().__init__(*args, **kwargs)
+
+        self._init_index()
+
+
+if yaml.__with_libyaml__:
+    from yaml._yaml import CEmitter  # pylint: disable=no-name-in-module
+
+    class CDumper(
+        DumperMixin,
+        yaml.serializer.Serializer,
+        CEmitter,
+        yaml.representer.SafeRepresenter,
+        yaml.resolver.Resolver,
+    ):
+        """
+        yaml dumper for index types class, emitting with libyaml.
+
+        Nodes are serialized in Python rather than by libyaml, so that anchors
+        come from `DumperMixin.generate_anchor`; events are emitted by libyaml.
+        """
+
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # pylint: disable=super-init-not-called
+        def __init__(  # type: ignore
+            self,
+            stream,
+            default_style=None,
+            default_flow_style=False,
+            canonical=None,
+            indent=None,
+            width=None,
+            allow_unicode=None,
+            line_break=None,
+            encoding=None,
+            explicit_start=None,
+            explicit_end=None,
+            version=None,
+            tags=None,
+            sort_keys=True,
+        ) -> None:
+            """
+            Init dumper, see `yaml.CSafeDumper` for the arguments.
+
+            :param stream: Stream to write to.
+            :param default_style: Default scalar style.
+            :param default_flow_style: Default collection style.
+            :param canonical: Write canonical yaml.
+            :param indent: Indentation width.
+            :param width: Preferred line width.
+            :param allow_unicode: Write non-ascii characters as is.
+            :param line_break: Line break.
+            :param encoding: Stream encoding, None for a text stream.
+            :param explicit_start: Write document start markers.
+            :param explicit_end: Write document end markers.
+            :param version: yaml version directive.
+            :param tags: Tag directives.
+            :param sort_keys: Sort mapping keys.
+            """
+            CEmitter.__init__(
+                self,
+                stream,
+                canonical=canonical,
+                indent=indent,
+                width=width,
+                encoding=encoding,
+                allow_unicode=allow_unicode,
+                line_break=line_break,
+                explicit_start=explicit_start,
+                explicit_end=explicit_end,
+                version=version,
+                tags=tags,
+            )
+            yaml.serializer.Serializer.__init__(
+                self,
+                encoding=encoding,
+                explicit_start=explicit_start,
+                explicit_end=explicit_end,
+                version=version,
+                tags=tags,
+            )
+            yaml.representer.SafeRepresenter.__init__(
+                self,
+                default_style=default_style,
+                default_flow_style=default_flow_style,
+                sort_keys=sort_keys,
+            )
+            yaml.resolver.Resolver.__init__(self)
+
+            self._init_index()
+
+else:
+    # libyaml is not installed, fall back to the pure Python dumper.
+    CDumper = Dumper  # type: ignore
 
 
-Dumper.add_representer(index.Component, Dumper.represent_component)
-Dumper.add_representer(index.Diff, Dumper.represent_diff)
-Dumper.add_representer(index.Index, Dumper.represent_index)
+_dumper: typing.Type[yaml.representer.SafeRepresenter]
+for _dumper in (Dumper, CDumper):
+    _dumper.add_representer(index.Component, DumperMixin.represent_component)
+    _dumper.add_representer(index.Diff, DumperMixin.represent_diff)
+    _dumper.add_representer(index.Index, DumperMixin.represent_index)
@@ -0,0 +1,253 @@
+"""Output formats of indices."""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+import typing
+from dataclasses import dataclass
+
+from . import index, snapshot, spans, writer
+
+COLUMNS = (
+    "kind",
+    "date",
+    "date_text",
+    "symbol",
+    "name",
+    "removed_symbol",
+    "removed_name",
+    "reason",
+)
+"""
+Columns of the flat formats. Components are "component" rows with the symbol
+and the name only. Diffs are "diff" rows: the symbol and the name of the
+component added, the ones of the component removed, the date, or the date text
+if it is not recognized, and the reason.
+"""
+
+# Columns dictionary encoded in the columnar formats.
+_DICTIONARY_COLUMNS = ("kind", "symbol", "name", "removed_symbol", "removed_name")
+
+Row = typing.Tuple[
+    str,
+    typing.Optional[datetime.date],
+    typing.Optional[str],
+    typing.Optional[str],
+    typing.Optional[str],
+    typing.Optional[str],
+    typing.Optional[str],
+    typing.Optional[str],
+]
+
+
+class FormatError(Exception):
+    """Output format exception class."""
+
+
+@dataclass(frozen=True)
+class Format:
+    """
+    Output format.
+
+    :param name: Format name, as given to ``--format``.
+    :param suffix: Output file name suffix.
+    :param binary: Whether `write` takes a binary stream rather than a text one.
+    :param write: Function writing an index to a stream.
+    """
+
+    name: str
+    suffix: str
+    binary: bool
+    write: typing.Callable[[index.Index, typing.Any], None]
+
+
+FORMATS: typing.Dict[str, Format] = {}
+"""Output formats by name."""
+
+
+def register(output_format: Format) -> None:
+    """
+    Register output format.
+
+    :param output_format: Format to register.
+    """
+    FORMATS[output_format.name] = output_format
+
+
+def get(name: str) -> Format:
+    """
+    Get output format.
+
+    :param name: Format name.
+    :return: Format registered under the name.
+    """
+    try:
+        return FORMATS[name]
+    except KeyError as exc:
+        raise FormatError(f"Unknown output format '{name}'") from exc
+
+
+def write(idx: index.Index, name: str, out: typing.Optional[str]) -> None:
+    """
+    Write index to a file or to stdout.
+
+    Reported as a "write" span with the format and, when written to a file,
+    the file size in bytes.
+
+    :param idx: Index to write.
+    :param name: Format name.
+    :param out: Output file path. If not set, write to stdout.
+    """
+    output_format = get(name)
+
+    with spans.span("write", format=name, out=out) as current:
+        if output_format.binary:
+            if out is None:
+                output_format.write(idx, sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+            else:
+                with io.open(out, "wb") as binary_file:
+                    output_format.write(idx, binary_file)
+        elif out is None:
+            output_format.write(idx, sys.stdout)
+        else:
+            with io.open(out, "w", encoding="utf-8") as text_file:
+                output_format.write(idx, text_file)
+
+        if out is not None:
+            current.attributes["bytes"] = os.path.getsize(out)
+
+
+def rows(idx: index.Index) -> typing.Iterator[Row]:
+    """
+    Flatten index into table rows.
+
+    :param idx: Index to flatten.
+    :return: Iterator over rows, see `COLUMNS`.
+    """
+    for component in idx.components:
+        yield (
+            "component",
+            None,
+            None,
+            component.symbol,
+            component.name,
+            None,
+            None,
+            None,
+        )
+
+    for diff in idx.diffs:
+        added = diff.added
+        removed = diff.removed
+        yield (
+            "diff",
+            None if isinstance(diff.date, str) else diff.date,
+            diff.date if isinstance(diff.date, str) else None,
+            None if added is None else added.symbol,
+            None if added is None else added.name,
+            None if removed is None else removed.symbol,
+            None if removed is None else removed.name,
+            diff.reason,
+        )
+
+
+def write_jsonl(idx: index.Index, stream: typing.IO[str]) -> None:
+    """
+    Write index as JSON Lines, one object per row.
+
+    :param idx: Index to write.
+    :param stream: Text stream to write to.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+
+    for row in rows(idx):
+        record = dict(zip(COLUMNS, row))
+        if row[1] is not None:
+            record["date"] = row[1].isoformat()
+        stream.write(encoder.encode(record))
+        stream.write("\n")
+
+
+def write_csv(idx: index.Index, stream: typing.IO[str]) -> None:
+    """
+    Write index as CSV with a header row, missing values empty.
+
+    :param idx: Index to write.
+    :param stream: Text stream to write to.
+    """
+    csv_writer = csv.writer(stream, lineterminator="\n")
+
+    csv_writer.writerow(COLUMNS)
+    csv_writer.writerows(rows(idx))
+
+
+def table(idx: index.Index) -> typing.Any:
+    """
+    Make Arrow table of the index rows (requires pyarrow).
+
+    Dates are ``date32``, ticker, name and kind columns are dictionary encoded.
+
+    :param idx: Index to convert.
+    :return: ``pyarrow.Table`` with `COLUMNS`.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    import pyarrow as pa  # type: ignore
+
+    columns = list(zip(*rows(idx))) or [()] * len(COLUMNS)
+
+    arrays = []
+    for name, values in zip(COLUMNS, columns):
+        if name == "date":
+            array = pa.array(values, pa.date32())
+        else:
+            array = pa.array(values, pa.string())
+        if name in _DICTIONARY_COLUMNS:
+            array = array.dictionary_encode()
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=list(COLUMNS))
+
+
+def write_parquet(idx: index.Index, stream: typing.IO[bytes]) -> None:
+    """
+    Write index as a Parquet file (requires pyarrow).
+
+    :param idx: Index to write.
+    :param stream: Binary stream to write to.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    import pyarrow.parquet as pq  # type: ignore
+
+    with spans.span("serialize"):
+        parquet_table = table(idx)
+    pq.write_table(parquet_table, stream)
+
+
+def write_arrow(idx: index.Index, stream: typing.IO[bytes]) -> None:
+    """
+    Write index as an Arrow IPC file (requires pyarrow).
+
+    :param idx: Index to write.
+    :param stream: Binary stream to write to.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    import pyarrow as pa
+
+    with spans.span("serialize"):
+        arrow_table = table(idx)
+    with pa.ipc.new_file(stream, arrow_table.schema) as arrow_writer:
+        arrow_writer.write_table(arrow_table)
+
+
+register(Format("yaml", ".yaml", False, writer.dump))
+register(Format("jsonl", ".jsonl", False, write_jsonl))
+register(Format("csv", ".csv", False, write_csv))
+register(Format("parquet", ".parquet", True, write_parquet))
+register(Format("arrow", ".arrow", True, write_arrow))
+register(Format("snapshot", ".snap", True, snapshot.write))
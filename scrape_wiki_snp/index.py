@@ -1,11 +1,73 @@
 """Index data types."""
 
 
+import bisect
+import datetime
+import re
+import sys
 import typing
 from dataclasses import dataclass
 
+_DATE_TEXT = re.compile(r"([A-Za-z]+) (\d{1,2}), (\d{4})")
 
-@dataclass
+# English month names, wiki pages do not depend on the locale.
+_MONTH_NAMES = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+_MONTHS = {name.lower(): month for month, name in enumerate(_MONTH_NAMES, 1)}
+
+DiffDate = typing.Union[datetime.date, str]
+
+
+def parse_date(text: str) -> DiffDate:
+    """
+    Parse date of an index change.
+
+    :param text: Date text like "September 18, 2023".
+    :return: Date parsed, or `text` stripped if it is not a date.
+    """
+    text = text.strip()
+
+    match = _DATE_TEXT.fullmatch(text)
+    if match is None:
+        return text
+
+    month = _MONTHS.get(match.group(1).lower())
+    if month is None:
+        return text
+
+    try:
+        return datetime.date(int(match.group(3)), month, int(match.group(2)))
+    except ValueError:
+        return text
+
+
+def format_date(date: DiffDate) -> str:
+    """
+    Format date of an index change the way wiki pages do.
+
+    :param date: Date, or date text kept as is.
+    :return: Date text like "September 18, 2023".
+    """
+    if isinstance(date, str):
+        return date
+
+    return f"{_MONTH_NAMES[date.month - 1]} {date.day}, {date.year}"
+
+
+@dataclass(slots=True)
 class Component:
     """
     Index component.
@@ -20,12 +82,12 @@ class Component:
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Diff:
     """
     Index change.
 
-    :param date: Date diff happened.
+    :param date: Date diff happened, the date text if it is not recognized.
     :param added: Component added, if any.
     :param removed: Component removed, if any.
     :param reason: Reason for the change.
@@ -33,13 +95,13 @@ class Diff:
 
     tag: typing.ClassVar[str] = "!index-diff"
 
-    date: str
+    date: DiffDate
     added: typing.Optional[Component]
     removed: typing.Optional[Component]
     reason: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Index:
     """
     Index description.
@@ -51,3 +113,166 @@ class Index:
     tag: typing.ClassVar[str] = "!index"
     components: typing.List[Component]
     diffs: typing.List[Diff]
+
+    def date_index(self) -> "DateIndex":
+        """
+        Make diffs index sorted by date.
+
+        :return: Date index of the diffs.
+        """
+        return DateIndex(self.diffs)
+
+
+class DateIndex:
+    """
+    Index changes sorted by date, for range queries.
+
+    Date texts left by hand made diffs are parsed, see `parse_date`.
+
+    :param diffs: Diffs to sort, newest first as on the page.
+    """
+
+    def __init__(self, diffs: typing.Iterable[Diff]) -> None:
+        """
+        Init date index.
+
+        :param diffs: Diffs to sort, newest first as on the page.
+        """
+        self.undated: typing.List[Diff] = []
+        """Diffs with dates not recognized, not indexed."""
+
+        dated = []
+        for diff in diffs:
+            date = parse_date(diff.date) if isinstance(diff.date, str) else diff.date
+            if isinstance(date, str):
+                self.undated.append(diff)
+            else:
+                dated.append((date, diff))
+
+        # Page order is newest first, also within a date: reverse it so that the
+        # stable sort keeps same date diffs oldest first too.
+        dated.reverse()
+        dated.sort(key=lambda item: item[0])
+
+        self.dates: typing.List[datetime.date] = [date for date, _ in dated]
+        """Dates of the diffs, oldest first."""
+        self.diffs: typing.List[Diff] = [diff for _, diff in dated]
+        """Diffs, oldest first."""
+
+    def __len__(self) -> int:
+        """
+        Count diffs indexed.
+
+        :return: Diff count.
+        """
+        return len(self.diffs)
+
+    def between(
+        self,
+        start: typing.Optional[datetime.date] = None,
+        end: typing.Optional[datetime.date] = None,
+    ) -> typing.List[Diff]:
+        """
+        Get diffs in a date range.
+
+        :param start: First date of the range, unbounded if not set.
+        :param end: Last date of the range (included), unbounded if not set.
+        :return: Diffs in the range, oldest first.
+        """
+        lo = 0 if start is None else bisect.bisect_left(self.dates, start)
+        hi = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+
+        return self.diffs[lo:hi]
+
+    def on(self, date: datetime.date) -> typing.List[Diff]:
+        """
+        Get diffs of a date.
+
+        :param date: Date to look at.
+        :return: Diffs of the date.
+        """
+        return self.between(date, date)
+
+
+class Interner:
+    """
+    Pool of shared component instances, dates and strings.
+
+    Components equal by value are replaced by one shared instance, and their
+    strings are interned, so that diffs reference the components rather than
+    keep copies of them. One interner may be used for many indices, e.g. for
+    all the revisions of an index kept in memory.
+    """
+
+    def __init__(self) -> None:
+        """Init empty pool."""
+        self._components: typing.Dict[typing.Tuple[str, str], Component] = {}
+        self._dates: typing.Dict[datetime.date, datetime.date] = {}
+
+    def component(self, component: Component) -> Component:
+        """
+        Get shared component instance.
+
+        :param component: Component to share.
+        :return: Shared component equal to `component`.
+        """
+        key = (component.symbol, component.name)
+
+        shared = self._components.get(key)
+        if shared is None:
+            shared = Component(sys.intern(component.symbol), sys.intern(component.name))
+            self._components[key] = shared
+
+        return shared
+
+    def date(self, date: DiffDate) -> DiffDate:
+        """
+        Get shared date instance.
+
+        :param date: Date, or date text, to share.
+        :return: Shared date equal to `date`.
+        """
+        if isinstance(date, str):
+            return sys.intern(date)
+
+        return self._dates.setdefault(date, date)
+
+    def diff(self, diff: Diff) -> Diff:
+        """
+        Make diff referencing shared components.
+
+        :param diff: Diff to compact.
+        :return: Diff equal to `diff`.
+        """
+        return Diff(
+            self.date(diff.date),
+            None if diff.added is None else self.component(diff.added),
+            None if diff.removed is None else self.component(diff.removed),
+            sys.intern(diff.reason),
+        )
+
+    def index(self, idx: Index) -> Index:
+        """
+        Make index referencing shared components.
+
+        :param idx: Index to compact.
+        :return: Index equal to `idx`.
+        """
+        return Index(
+            [self.component(component) for component in idx.components],
+            [self.diff(diff) for diff in idx.diffs],
+        )
+
+
+def compact(idx: Index, interner: typing.Optional[Interner] = None) -> Index:
+    """
+    Make index with components shared between the components list and diffs.
+
+    :param idx: Index to compact.
+    :param interner: Pool to share components with, a new one if not set.
+    :return: Index equal to `idx`.
+    """
+    if interner is None:
+        interner = Interner()
+
+    return interner.index(idx)
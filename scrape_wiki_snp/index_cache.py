@@ -0,0 +1,205 @@
+"""Content addressed cache of parsed indices."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import typing
+import zlib
+from dataclasses import dataclass
+
+import platformdirs
+
+from . import index, spans
+
+_SUFFIX = ".idx"
+
+# Bump when parsing changes, so that stale entries are never hit.
+_VERSION = b"3"
+
+
+def default_directory() -> str:
+    """
+    Get default cache directory.
+
+    :return: Directory path.
+    """
+    return os.path.join(platformdirs.user_cache_dir("scrape_wiki_snp"), "indices")
+
+
+@dataclass
+class Entry:
+    """
+    Cache entry.
+
+    :param key: Hash of the page the index is parsed from.
+    :param size: Entry size in bytes.
+    :param last_used: Time the entry was last written or read.
+    """
+
+    key: str
+    size: int
+    last_used: float
+
+
+class IndexCache:
+    """
+    Cache of indices keyed by a hash of the html they are parsed from.
+
+    Indices are kept pickled and zlib compressed, one file per entry. Entries
+    not used for `max_age` seconds are evicted, then the least recently used
+    ones until the cache fits in `max_bytes`.
+
+    :param directory: Cache directory, created if missing.
+    :param max_bytes: Max total size of the entries.
+    :param max_age: Max seconds since an entry was last used.
+    """
+
+    def __init__(
+        self,
+        directory: typing.Optional[str] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 30 * 24 * 60 * 60,
+    ) -> None:
+        """
+        Init cache.
+
+        :param directory: Cache directory, `default_directory()` if not set.
+        :param max_bytes: Max total size of the entries.
+        :param max_age: Max seconds since an entry was last used.
+        """
+        self.directory = default_directory() if directory is None else directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(html: str) -> str:
+        """
+        Compute cache key of a page.
+
+        :param html: Page content.
+        :return: Cache key.
+        """
+        digest = hashlib.sha256(_VERSION + b"\0")
+        digest.update(html.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> typing.Optional[index.Index]:
+        """
+        Get cached index.
+
+        :param key: Cache key.
+        :return: Index cached, None on a cache miss.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as entry_file:
+                data = entry_file.read()
+            idx = pickle.loads(zlib.decompress(data))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+
+        if not isinstance(idx, index.Index):
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return idx
+
+    def put(self, key: str, idx: index.Index) -> None:
+        """
+        Cache index, evicting old entries if needed.
+
+        :param key: Cache key.
+        :param idx: Index to cache.
+        """
+        data = zlib.compress(pickle.dumps(idx, pickle.HIGHEST_PROTOCOL))
+
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self.directory, suffix=".tmp", delete=False
+        ) as tmp_file:
+            tmp_file.write(data)
+
+        os.replace(tmp_file.name, self._path(key))
+
+        self.evict()
+
+    def parse(
+        self, html: str, parse_fn: typing.Callable[[str], index.Index]
+    ) -> index.Index:
+        """
+        Parse page, unless its index is cached.
+
+        :param html: Page content.
+        :param parse_fn: Page parse function.
+        :return: Index parsed or cached.
+        """
+        with spans.span("index_cache") as current:
+            key = self.key(html)
+
+            idx = self.get(key)
+            current.attributes["from_cache"] = idx is not None
+            if idx is None:
+                idx = parse_fn(html)
+                self.put(key, idx)
+
+            return idx
+
+    def entries(self) -> typing.List[Entry]:
+        """
+        List cache entries.
+
+        :return: Entries, least recently used first.
+        """
+        result = []
+
+        with os.scandir(self.directory) as dir_entries:
+            for dir_entry in dir_entries:
+                if not dir_entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                key = dir_entry.name[: -len(_SUFFIX)]
+                result.append(Entry(key, stat.st_size, stat.st_mtime))
+
+        result.sort(key=lambda entry: entry.last_used)
+
+        return result
+
+    def _remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """Evict expired entries, then the least recently used ones."""
+        entries = self.entries()
+        deadline = time.time() - self.max_age
+
+        total = sum(entry.size for entry in entries)
+
+        for entry in entries:
+            if entry.last_used >= deadline and total <= self.max_bytes:
+                break
+            self._remove(entry.key)
+            total -= entry.size
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        for entry in self.entries():
+            self._remove(entry.key)
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import datetime
+import typing
+
 import yaml
+import yaml.constructor
+import yaml.resolver
 
 from . import index
 
@@ -11,9 +16,26 @@ class LoaderException(Exception):
     """Loader exception class."""
 
 
+def _diff_date(value: typing.Any) -> typing.Any:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return index.parse_date(value)
+    return value
+
+
+_Stream = typing.Union[str, bytes, typing.IO[str], typing.IO[bytes]]
+
+
+if typing.TYPE_CHECKING:
+    _LoaderBase = yaml.SafeLoader
+else:
+    _LoaderBase = object
+
+
 # pylint: disable=too-many-ancestors
-class Loader(yaml.SafeLoader):
-    """yaml loader for index types class."""
+class LoaderMixin(_LoaderBase):
+    """Construction of index types, for any loader."""
 
     def parse_component(self, node: yaml.Node) -> index.Component:
         """
@@ -35,6 +57,9 @@ class Loader(yaml.SafeLoader):
         """
         Parsse diff from a yaml node.
 
+        Dates are yaml timestamps, date texts written before dates were parsed
+        are parsed on load.
+
         :param node: Node to parse.
         :return: Diff parsed.
         """
@@ -43,6 +68,8 @@ class Loader(yaml.SafeLoader):
 
         try:
             args = self.construct_mapping(node)
+            if "date" in args:
+                args["date"] = _diff_date(args["date"])
             return index.Diff(**args)  # type: ignore
         except TypeError as exc:
             raise LoaderException("Type error while parsing.") from exc
@@ -57,15 +84,204 @@ class Loader(yaml.SafeLoader):
         if not isinstance(node, yaml.MappingNode):
             raise LoaderException("Expected a mapping node")
 
-        args = self.construct_mapping(node, deep=True)
-
         try:
-            args = self.construct_mapping(node)
+            args = self.construct_mapping(node, deep=True)
             return index.Index(**args)  # type: ignore
         except TypeError as exc:
             raise LoaderException("Type error while parsing.") from exc
 
 
-Loader.add_constructor(index.Component.tag, Loader.parse_component)
-Loader.add_constructor(index.Diff.tag, Loader.parse_diff)
-Loader.add_constructor(index.Index.tag, Loader.parse_index)
+class Loader(LoaderMixin, yaml.SafeLoader):
+    """yaml loader for index types class."""
+
+
+if yaml.__with_libyaml__:
+    from yaml._yaml import CParser  # pylint: disable=no-name-in-module
+
+    class CLoader(
+        LoaderMixin,
+        CParser,
+        yaml.constructor.SafeConstructor,
+        yaml.resolver.Resolver,
+    ):
+        """yaml loader for index types class, parsing with libyaml."""
+
+        # pylint: disable=super-init-not-called
+        def __init__(self, stream: _Stream) -> None:
+            """
+            Init loader.
+
+            :param stream: Stream to load.
+            """
+            CParser.__init__(self, stream)
+            yaml.constructor.SafeConstructor.__init__(self)
+            yaml.resolver.Resolver.__init__(self)
+
+else:
+    # libyaml is not installed, fall back to the pure Python loader.
+    CLoader = Loader  # type: ignore
+
+
+_loader: typing.Type[yaml.constructor.SafeConstructor]
+for _loader in (Loader, CLoader):
+    _loader.add_constructor(index.Component.tag, LoaderMixin.parse_component)
+    _loader.add_constructor(index.Diff.tag, LoaderMixin.parse_diff)
+    _loader.add_constructor(index.Index.tag, LoaderMixin.parse_index)
+
+
+_STR_TAG = "tag:yaml.org,2002:str"
+
+_TYPES: typing.Dict[str, typing.Callable[..., typing.Any]] = {
+    index.Component.tag: index.Component,
+    index.Diff.tag: index.Diff,
+    index.Index.tag: index.Index,
+}
+
+
+class _EventBuilder:  # pylint: disable=too-few-public-methods
+    """
+    Builder of index objects straight from yaml events.
+
+    No node graph is composed: mappings tagged with index types become index
+    objects as soon as they end, anchors are kept by name and aliases resolve
+    to the very objects anchored.
+    """
+
+    def __init__(self, events: typing.Iterator[yaml.Event]) -> None:
+        self._events = events
+        self._anchors: typing.Dict[str, typing.Any] = {}
+        self._scalars: typing.Dict[typing.Tuple[str, str], typing.Any] = {}
+        self._resolver = yaml.resolver.Resolver()
+        self._constructor = yaml.constructor.SafeConstructor()
+
+    def documents(self) -> typing.Iterator[typing.Any]:
+        """
+        Build every document of the stream.
+
+        :return: Iterator over the documents built.
+        """
+        try:
+            for event in self._events:
+                if isinstance(event, yaml.DocumentStartEvent):
+                    self._anchors.clear()
+                    yield self._value(self._next())
+                    self._next()  # DocumentEndEvent
+        except yaml.YAMLError as exc:
+            raise LoaderException(f"Invalid yaml: {exc}") from exc
+
+    def _next(self) -> yaml.Event:
+        try:
+            return next(self._events)
+        except StopIteration as exc:
+            raise LoaderException("Unexpected end of stream") from exc
+
+    def _value(self, event: yaml.Event) -> typing.Any:
+        if isinstance(event, yaml.ScalarEvent):
+            result = self._scalar(event)
+        elif isinstance(event, yaml.MappingStartEvent):
+            result = self._mapping(event)
+        elif isinstance(event, yaml.SequenceStartEvent):
+            result = self._sequence(event)
+        elif isinstance(event, yaml.AliasEvent):
+            try:
+                return self._anchors[typing.cast(str, event.anchor)]
+            except KeyError as exc:
+                raise LoaderException(f"Unknown anchor '{event.anchor}'") from exc
+        else:
+            raise LoaderException(f"Unexpected {event}")
+
+        if event.anchor is not None:
+            self._anchors[event.anchor] = result
+
+        return result
+
+    def _scalar(self, event: yaml.ScalarEvent) -> typing.Any:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = self._resolver.resolve(  # type: ignore[no-untyped-call]
+                yaml.ScalarNode, event.value, event.implicit
+            )
+        if tag == _STR_TAG:
+            return event.value
+
+        key = (tag, event.value)
+        if key not in self._scalars:
+            construct = self._constructor.yaml_constructors.get(tag)
+            if construct is None:
+                raise LoaderException(f"Unknown scalar tag '{tag}'")
+            node = yaml.ScalarNode(tag, event.value, style=event.style)
+            self._scalars[key] = construct(self._constructor, node)
+
+        return self._scalars[key]
+
+    def _sequence(self, event: yaml.SequenceStartEvent) -> typing.List[typing.Any]:
+        result: typing.List[typing.Any] = []
+        if event.anchor is not None:
+            self._anchors[event.anchor] = result
+
+        for item in self._events:
+            if isinstance(item, yaml.SequenceEndEvent):
+                return result
+            result.append(self._value(item))
+
+        raise LoaderException("Unexpected end of stream")
+
+    def _mapping(self, event: yaml.MappingStartEvent) -> typing.Any:
+        args: typing.Dict[typing.Any, typing.Any] = {}
+
+        for key_event in self._events:
+            if isinstance(key_event, yaml.MappingEndEvent):
+                break
+            key = self._value(key_event)
+            args[key] = self._value(self._next())
+        else:
+            raise LoaderException("Unexpected end of stream")
+
+        if event.tag is None or event.tag in ("!", "tag:yaml.org,2002:map"):
+            return args
+
+        make = _TYPES.get(event.tag)
+        if make is None:
+            raise LoaderException(f"Unknown mapping tag '{event.tag}'")
+
+        if "date" in args and event.tag == index.Diff.tag:
+            args["date"] = _diff_date(args["date"])
+
+        try:
+            return make(**args)
+        except TypeError as exc:
+            raise LoaderException("Type error while parsing.") from exc
+
+
+def load_all_indices(stream: _Stream) -> typing.Iterator[typing.Any]:
+    """
+    Load every document of a yaml stream, without composing a node graph.
+
+    Gives the same objects as ``yaml.load_all(stream, Loader)``, but builds
+    them straight from the parser events, see `load_index`.
+
+    :param stream: Stream to load.
+    :return: Iterator over the documents loaded.
+    """
+    return _EventBuilder(yaml.parse(stream, CLoader)).documents()
+
+
+def load_index(stream: _Stream) -> index.Index:
+    """
+    Load index document written by `dumper.Dumper`.
+
+    Faster and lighter than ``yaml.load(stream, Loader)``: objects are built
+    straight from the parser events, components referenced by aliases are
+    shared instances.
+
+    :param stream: Stream to load.
+    :return: Index loaded.
+    """
+    documents = list(load_all_indices(stream))
+
+    if len(documents) != 1:
+        raise LoaderException(f"Expected one document, got {len(documents)}")
+    if not isinstance(documents[0], index.Index):
+        raise LoaderException("Expected an index document")
+
+    return documents[0]
@@ -0,0 +1,370 @@
+"""Per-symbol index history, built once for many lookups."""
+
+from __future__ import annotations
+
+import datetime
+import io
+import json
+import os
+import typing
+from dataclasses import dataclass, field
+
+from . import index, source, spans, wiki_snp
+from .membership import to_date
+
+SIDECAR_SUFFIX = ".symbols.json"
+"""Suffix of the symbol index files written next to outputs."""
+
+_VERSION = 1
+
+
+class SymbolIndexError(Exception):
+    """Symbol index exception class."""
+
+
+@dataclass(frozen=True)
+class Interval:
+    """
+    Membership interval, the start date included and the end date excluded.
+
+    :param start: Date the symbol was added, None if it was a member before
+        the oldest diff known.
+    :param end: Date the symbol was removed, None if it is a member now.
+    """
+
+    start: typing.Optional[datetime.date]
+    end: typing.Optional[datetime.date]
+
+    def __contains__(self, date: datetime.date) -> bool:
+        """
+        Check whether the symbol was a member at a date.
+
+        :param date: Date to look at.
+        :return: True if the date is in the interval.
+        """
+        return (self.start is None or self.start <= date) and (
+            self.end is None or date < self.end
+        )
+
+
+@dataclass
+class SymbolHistory:
+    """
+    Index history of a symbol.
+
+    :param symbol: Ticker symbol.
+    :param member: Whether the symbol is a member now.
+    :param diffs: Diffs adding or removing the symbol, oldest first, then the
+        ones with dates not recognized.
+    :param intervals: Membership intervals, oldest first. Diffs with dates not
+        recognized are not taken into account.
+    """
+
+    symbol: str
+    member: bool
+    diffs: typing.List[index.Diff] = field(default_factory=list)
+    intervals: typing.List[Interval] = field(default_factory=list)
+
+    def is_member(self, date: typing.Union[datetime.date, str]) -> bool:
+        """
+        Check whether the symbol was a member at a date.
+
+        :param date: Date to look at, or a date text like "September 18, 2023".
+        :return: True if the symbol was a member.
+        """
+        date = to_date(date)
+        return any(date in interval for interval in self.intervals)
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Convert to a JSON serializable dict.
+
+        :return: History as a dict, dates in ISO format.
+        """
+        return {
+            "symbol": self.symbol,
+            "member": self.member,
+            "intervals": [
+                [_date_to_json(interval.start), _date_to_json(interval.end)]
+                for interval in self.intervals
+            ],
+            "diffs": [_diff_to_json(diff) for diff in self.diffs],
+        }
+
+
+class SymbolIndex:
+    """
+    Inverted index: the history of every symbol of an index.
+
+    Lookups are dict lookups, the diffs are not scanned again.
+
+    :param histories: Symbol histories by symbol.
+    """
+
+    def __init__(self, histories: typing.Dict[str, SymbolHistory]) -> None:
+        """
+        Init symbol index.
+
+        :param histories: Symbol histories by symbol.
+        """
+        self.histories = histories
+        """Symbol histories by symbol."""
+
+    def __len__(self) -> int:
+        """
+        Count symbols.
+
+        :return: Number of symbols, current members or not.
+        """
+        return len(self.histories)
+
+    def __contains__(self, symbol: object) -> bool:
+        """
+        Check whether a symbol is known.
+
+        :param symbol: Ticker symbol.
+        :return: True if the symbol is a component or in a diff.
+        """
+        return symbol in self.histories
+
+    def get(self, symbol: str) -> typing.Optional[SymbolHistory]:
+        """
+        Get history of a symbol.
+
+        :param symbol: Ticker symbol.
+        :return: History, None if the symbol is not known.
+        """
+        return self.histories.get(symbol)
+
+
+def _history(symbol: str, histories: typing.Dict[str, SymbolHistory]) -> SymbolHistory:
+    found = histories.get(symbol)
+    if found is None:
+        found = SymbolHistory(symbol, False)
+        histories[symbol] = found
+    return found
+
+
+def build(idx: index.Index) -> SymbolIndex:
+    """
+    Build symbol index in one pass over the diffs.
+
+    Intervals are found undoing the diffs newest first from the current
+    components, the way `membership.Membership` does it, so that both agree.
+
+    :param idx: Index to build the symbol index of.
+    :return: Symbol index.
+    """
+    histories: typing.Dict[str, SymbolHistory] = {}
+    for component in idx.components:
+        _history(component.symbol, histories).member = True
+
+    by_date = idx.date_index()
+    for diff in by_date.diffs + by_date.undated:
+        symbols = dict.fromkeys(
+            component.symbol
+            for component in (diff.added, diff.removed)
+            if component is not None
+        )
+        for symbol in symbols:
+            _history(symbol, histories).diffs.append(diff)
+
+    # Running interval end of every symbol being a member while undoing.
+    ends: typing.Dict[str, typing.Optional[datetime.date]] = {
+        component.symbol: None for component in idx.components
+    }
+    for date, diff in zip(reversed(by_date.dates), reversed(by_date.diffs)):
+        if diff.added is not None and diff.added.symbol in ends:
+            symbol = diff.added.symbol
+            histories[symbol].intervals.append(Interval(date, ends.pop(symbol)))
+        if diff.removed is not None and diff.removed.symbol not in ends:
+            ends[diff.removed.symbol] = date
+
+    for symbol, end in ends.items():
+        histories[symbol].intervals.append(Interval(None, end))
+    for history in histories.values():
+        history.intervals.reverse()
+
+    return SymbolIndex(histories)
+
+
+def _date_to_json(date: typing.Optional[datetime.date]) -> typing.Optional[str]:
+    return None if date is None else date.isoformat()
+
+
+def _date_from_json(text: typing.Optional[str]) -> typing.Optional[datetime.date]:
+    return None if text is None else datetime.date.fromisoformat(text)
+
+
+def _component_to_json(
+    component: typing.Optional[index.Component],
+) -> typing.Optional[typing.List[str]]:
+    return None if component is None else [component.symbol, component.name]
+
+
+def _component_from_json(
+    data: typing.Optional[typing.List[str]],
+    components: typing.Dict[typing.Tuple[str, str], index.Component],
+) -> typing.Optional[index.Component]:
+    if data is None:
+        return None
+    symbol, name = data
+    return components.setdefault((symbol, name), index.Component(symbol, name))
+
+
+def _diff_to_json(diff: index.Diff) -> typing.Dict[str, typing.Any]:
+    result: typing.Dict[str, typing.Any] = (
+        {"date_text": diff.date}
+        if isinstance(diff.date, str)
+        else {"date": diff.date.isoformat()}
+    )
+    result["added"] = _component_to_json(diff.added)
+    result["removed"] = _component_to_json(diff.removed)
+    result["reason"] = diff.reason
+    return result
+
+
+def _diff_from_json(
+    data: typing.Dict[str, typing.Any],
+    components: typing.Dict[typing.Tuple[str, str], index.Component],
+) -> index.Diff:
+    return index.Diff(
+        (
+            datetime.date.fromisoformat(data["date"])
+            if "date" in data
+            else data["date_text"]
+        ),
+        _component_from_json(data["added"], components),
+        _component_from_json(data["removed"], components),
+        data["reason"],
+    )
+
+
+def write(symbols: SymbolIndex, stream: typing.TextIO) -> None:
+    """
+    Write symbol index as JSON.
+
+    Diffs are written once, the histories refer to them by position. Dates
+    are in ISO format, the texts of dates not recognized are kept as
+    "date_text".
+
+    :param symbols: Symbol index to write.
+    :param stream: Text stream to write to.
+    """
+    diff_ids: typing.Dict[int, int] = {}
+    diffs: typing.List[typing.Dict[str, typing.Any]] = []
+    histories = []
+
+    for history in symbols.histories.values():
+        ids = []
+        for diff in history.diffs:
+            diff_id = diff_ids.get(id(diff))
+            if diff_id is None:
+                diff_id = len(diffs)
+                diff_ids[id(diff)] = diff_id
+                diffs.append(_diff_to_json(diff))
+            ids.append(diff_id)
+
+        histories.append(
+            {
+                "symbol": history.symbol,
+                "member": history.member,
+                "diffs": ids,
+                "intervals": [
+                    [_date_to_json(interval.start), _date_to_json(interval.end)]
+                    for interval in history.intervals
+                ],
+            }
+        )
+
+    json.dump(
+        {"version": _VERSION, "diffs": diffs, "symbols": histories},
+        stream,
+        separators=(",", ":"),
+    )
+
+
+def load(path: str) -> SymbolIndex:
+    """
+    Load symbol index written by `write`.
+
+    :param path: File path.
+    :return: Symbol index, diffs share their component instances.
+    """
+    with io.open(path, "r", encoding="utf-8") as symbols_file:
+        try:
+            data = json.load(symbols_file)
+        except json.JSONDecodeError as exc:
+            raise SymbolIndexError(f"'{path}' is not a symbol index: {exc}") from exc
+
+    if not isinstance(data, dict) or data.get("version") != _VERSION:
+        raise SymbolIndexError(f"'{path}' symbol index version is not supported")
+
+    components: typing.Dict[typing.Tuple[str, str], index.Component] = {}
+    diffs = [_diff_from_json(diff, components) for diff in data["diffs"]]
+
+    return SymbolIndex(
+        {
+            history["symbol"]: SymbolHistory(
+                history["symbol"],
+                history["member"],
+                [diffs[diff_id] for diff_id in history["diffs"]],
+                [
+                    Interval(_date_from_json(start), _date_from_json(end))
+                    for start, end in history["intervals"]
+                ],
+            )
+            for history in data["symbols"]
+        }
+    )
+
+
+def from_source(
+    path: str, parse_fn: typing.Callable[[str], index.Index] = wiki_snp.parse
+) -> SymbolIndex:
+    """
+    Load symbol index of an index source.
+
+    :param path: Symbol index file, or index source, see `source.load`. The
+        symbol index written next to a source file is used if it is not older
+        than the file, so that the source is not loaded again.
+    :param parse_fn: Page parse function.
+    :return: Symbol index.
+    """
+    if path.endswith(SIDECAR_SUFFIX):
+        return load(path)
+
+    sidecar = sidecar_path(path)
+    if (
+        os.path.exists(path)
+        and os.path.exists(sidecar)
+        and os.path.getmtime(sidecar) >= os.path.getmtime(path)
+    ):
+        return load(sidecar)
+
+    return build(source.load(path, parse_fn))
+
+
+def sidecar_path(out: str) -> str:
+    """
+    Get path of the symbol index written next to an output file.
+
+    :param out: Output file path.
+    :return: Symbol index path.
+    """
+    return out + SIDECAR_SUFFIX
+
+
+def write_sidecar(idx: index.Index, out: str) -> str:
+    """
+    Build symbol index of an index, and write it next to its output file.
+
+    :param idx: Index written.
+    :param out: Output file path.
+    :return: Symbol index path.
+    """
+    path = sidecar_path(out)
+    with spans.span("symbols", out=path):
+        with io.open(path, "w", encoding="utf-8") as symbols_file:
+            write(build(idx), symbols_file)
+    return path
@@ -1,18 +1,76 @@
 """Command line main entrypoint."""
 
 import argparse
+import collections
+import contextlib
+import cProfile
+import datetime
+import functools
 import io
+import json
+import os
+import pstats
 import sys
+import time
+import tracemalloc
 import typing
 from dataclasses import dataclass
 
-import yaml
+from . import (
+    batch,
+    consolidate,
+    delta,
+    formats,
+    index,
+    index_cache,
+    lookup,
+    refresh,
+    source,
+    spans,
+    stream_parse,
+    watch,
+    wiki_snp,
+    writer,
+)
+from .download import download, stream_text
+from .loader import LoaderException, load_index
+from .membership import to_date
 
-from . import wiki_snp
-from .download import download
-from .dumper import Dumper
+ENGINES = ("bs4", "stream")
 
+PROFILES = ("summary", "memory", "json", "cprofile")
 
+
+def parse_fn(
+    engine: str,
+    backend: str,
+    cache: typing.Optional[index_cache.IndexCache] = None,
+    history: typing.Sequence[index.Diff] = (),
+) -> typing.Callable[[str], index.Index]:
+    """
+    Get page parse function.
+
+    :param engine: Name of the page parser engine, one of `ENGINES`.
+    :param backend: BeautifulSoup backend, used by the "bs4" engine only.
+    :param cache: Cache of indices parsed. If not set, always parse.
+    :param history: Diffs known already, only newer ones are parsed. The
+        index then depends on more than the page, so the cache is not used.
+    :return: Function parsing a page into an index.
+    """
+    result: typing.Callable[[str], index.Index] = functools.partial(
+        stream_parse.parse, history=history
+    )
+
+    if engine != "stream":
+        result = functools.partial(wiki_snp.parse, backend=backend, history=history)
+
+    if cache is not None and not history:
+        result = functools.partial(cache.parse, parse_fn=result)
+
+    return result
+
+
+# pylint: disable=too-many-instance-attributes
 @dataclass
 class Options:
     """
@@ -20,10 +78,26 @@ class Options:
 
     :param url: URL to scrape the data from.
     :param out: Where to write output data. If not set, write to stdout.
+    :param engine: Name of the page parser engine, see `ENGINES`.
+    :param parser: BeautifulSoup backend, see `wiki_snp.BACKENDS`.
+    :param store_dir: Where to keep the last index parsed, to skip parsing
+        when the page did not change. If not set, always parse.
+    :param index_cache: Look up indices parsed in `index_cache.IndexCache`.
+    :param update: If `out` exists, parse only diffs newer than the ones in it.
+        yaml format only.
+    :param output_format: Output format name, see `formats.FORMATS`.
+    :param symbols: Write the symbol index next to `out`, see `lookup`.
     """
 
     url: str
     out: typing.Optional[str]
+    engine: str = "bs4"
+    parser: str = "html.parser"
+    store_dir: typing.Optional[str] = None
+    index_cache: bool = False
+    update: bool = False
+    output_format: str = "yaml"
+    symbols: bool = False
 
 
 def main(options: Options) -> int:
@@ -33,25 +107,687 @@ def main(options: Options) -> int:
     :param options: Program options.
     :return: Return code.
     """
-    html = download(options.url)
-    idx = wiki_snp.parse(html)
+    history: typing.Sequence[index.Diff] = ()
+    if (
+        options.update
+        and options.output_format == "yaml"
+        and options.out is not None
+        and os.path.exists(options.out)
+    ):
+        with io.open(options.out, "r", encoding="utf-8") as previous_file:
+            try:
+                history = load_index(previous_file).diffs
+            except LoaderException:
+                pass
+
+    cache = index_cache.IndexCache() if options.index_cache else None
+    parse = parse_fn(options.engine, options.parser, cache, history)
+
+    if options.store_dir is not None:
+        store = refresh.RevisionStore(options.store_dir)
+        idx = refresh.fetch_index(options.url, parse, store)
+    elif options.engine == "stream" and (cache is None or history):
+        # The page is parsed as it arrives, the index cache needs it whole.
+        with stream_text(options.url) as chunks:
+            idx = stream_parse.parse(chunks, history)
+    else:
+        idx = parse(download(options.url))
+
+    formats.write(idx, options.output_format, options.out)
+    if options.symbols and options.out is not None:
+        lookup.write_sidecar(idx, options.out)
+
+    return 0
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class BatchOptions:
+    """
+    Batch mode options.
+
+    :param urls: URLs to scrape the data from.
+    :param out: Where to write all the indices as one yaml stream.
+        If neither this nor `out_dir` is set, write to stdout. yaml format only.
+    :param out_dir: Directory to write one output file per index to.
+    :param engine: Name of the page parser engine, see `ENGINES`.
+    :param parser: BeautifulSoup backend, see `wiki_snp.BACKENDS`.
+    :param download_jobs: Max number of concurrent downloads.
+    :param parse_jobs: Max number of parse processes, cpu count if not set.
+    :param index_cache: Look up indices parsed in `index_cache.IndexCache`.
+    :param output_format: Output format name, see `formats.FORMATS`.
+    :param symbols: Write the symbol index next to every output file in
+        `out_dir`, see `lookup`.
+    """
+
+    urls: typing.List[str]
+    out: typing.Optional[str] = None
+    out_dir: typing.Optional[str] = None
+    engine: str = "bs4"
+    parser: str = "html.parser"
+    download_jobs: int = 8
+    parse_jobs: typing.Optional[int] = None
+    index_cache: bool = False
+    output_format: str = "yaml"
+    symbols: bool = False
+
+
+def batch_main(options: BatchOptions) -> int:
+    """
+    Batch mode entry point.
+
+    :param options: Batch mode options.
+    :return: Return code.
+    """
+    cache = index_cache.IndexCache() if options.index_cache else None
+    result = batch.run(
+        options.urls,
+        parse_fn(options.engine, options.parser, cache),
+        options.download_jobs,
+        options.parse_jobs,
+    )
 
-    if options.out is not None:
+    start = time.perf_counter()
+    if options.out_dir is not None:
+        os.makedirs(options.out_dir, exist_ok=True)
+        names = batch.output_names(options.urls)
+        for name, idx in zip(names, result.indices):
+            name += formats.get(options.output_format).suffix
+            out = os.path.join(options.out_dir, name)
+            formats.write(idx, options.output_format, out)
+            if options.symbols:
+                lookup.write_sidecar(idx, out)
+    elif options.output_format != "yaml":
+        raise formats.FormatError(
+            f"{options.output_format} holds one index, write to a directory"
+        )
+    elif options.out is not None:
         with io.open(options.out, "w", encoding="utf-8") as out_file:
-            yaml.dump(idx, out_file, Dumper)
+            writer.dump_all(result.indices, out_file)
+    else:
+        writer.dump_all(result.indices, sys.stdout)
+    result.timings["write"] = time.perf_counter() - start
+
+    for stage, seconds in result.timings.items():
+        print(f"{stage}: {seconds:.3f}s", file=sys.stderr)
+
+    return 0
+
+
+def _add_parse_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--engine",
+        help="Page parser engine: a full BeautifulSoup tree or "
+        "a streaming extractor of the two tables.",
+        choices=ENGINES,
+        default="bs4",
+    )
+    parser.add_argument(
+        "--parser",
+        help="BeautifulSoup backend of the bs4 engine. "
+        "lxml and html5lib have to be installed separately.",
+        choices=wiki_snp.BACKENDS,
+        default="html.parser",
+    )
+    parser.add_argument(
+        "--index-cache",
+        help="Skip parsing pages whose index is in the parsed index cache, "
+        "see the 'cache' subcommand.",
+        action="store_true",
+    )
+
+
+def _add_format_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--format",
+        help="Output format. Parquet and Arrow require pyarrow.",
+        choices=list(formats.FORMATS),
+        default="yaml",
+        dest="output_format",
+    )
+
+
+def _date_argument(text: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        pass
+
+    try:
+        return to_date(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _add_symbols_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--symbols",
+        help="Also write the history of every symbol next to the output, "
+        "for the 'lookup' subcommand.",
+        action="store_true",
+    )
+
+
+def _add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        help="Report time spent in each stage (download, parse, write) as "
+        "a summary or JSON spans, add peak and retained memory of each stage "
+        "to the summary (memory, slower), or profile the run with cProfile.",
+        choices=PROFILES,
+        default=None,
+    )
+    parser.add_argument(
+        "--profile-out",
+        help="Where to write the profile report. If not set, write to stderr. "
+        "cProfile stats are written in pstats format.",
+        default=None,
+    )
+
+
+def profiled(
+    run: typing.Callable[[], int],
+    profile: typing.Optional[str],
+    out: typing.Optional[str] = None,
+) -> int:
+    """
+    Run, then report where the time, or the memory, went.
+
+    :param run: Function to run.
+    :param profile: Report kind, one of `PROFILES`. If not set, just run.
+    :param out: Where to write the report. If not set, write to stderr.
+    :return: Return code of `run`.
+    """
+    if profile is None:
+        return run()
+
+    if profile == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(run)
+        finally:
+            if out is not None:
+                profiler.dump_stats(out)
+            else:
+                stats = pstats.Stats(profiler, stream=sys.stderr)
+                stats.sort_stats("cumulative").print_stats(30)
+
+    memory: typing.ContextManager[None] = contextlib.nullcontext()
+    if profile == "memory":
+        tracemalloc.start()
+        memory = spans.account_memory()
+
+    with memory, spans.Recorder() as recorder:
+        try:
+            return run()
+        finally:
+            if profile == "memory":
+                tracemalloc.stop()
+
+            if profile == "json":
+                report = json.dumps([span.to_dict() for span in recorder.spans])
+            else:
+                report = "\n".join(recorder.summary())
+
+            if out is not None:
+                with io.open(out, "w", encoding="utf-8") as report_file:
+                    print(report, file=report_file)
+            else:
+                print(report, file=sys.stderr)
+
+
+def _check_parse_arguments(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> None:
+    if args.parser not in wiki_snp.available_backends():
+        parser.error(f"parser backend '{args.parser}' is not installed")
+
+
+def batch_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Batch mode command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp batch",
+        description="Scrape several index pages at once.",
+    )
+
+    parser.add_argument("urls", help="URLs to scrape the data from.", nargs="*")
+    parser.add_argument("--manifest", help="File listing URLs to scrape, one per line.")
+    outputs = parser.add_mutually_exclusive_group()
+    outputs.add_argument(
+        "--out",
+        help="Where to write all the indices as one yaml stream. "
+        "If neither this nor --out-dir is set, write to stdout.",
+    )
+    outputs.add_argument(
+        "--out-dir", help="Directory to write one output file per index to."
+    )
+    parser.add_argument(
+        "--download-jobs",
+        help="Max number of concurrent downloads.",
+        type=int,
+        default=8,
+    )
+    parser.add_argument(
+        "--parse-jobs",
+        help="Max number of parse processes. If not set, use cpu count.",
+        type=int,
+        default=None,
+    )
+    _add_parse_arguments(parser)
+    _add_format_argument(parser)
+    _add_symbols_argument(parser)
+    _add_profile_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+    if args.output_format != "yaml" and args.out_dir is None:
+        parser.error(f"--format {args.output_format} requires --out-dir")
+    if args.symbols and args.out_dir is None:
+        parser.error("--symbols requires --out-dir")
+
+    urls = list(args.urls)
+    if args.manifest is not None:
+        urls += batch.read_manifest(args.manifest)
+    if not urls:
+        parser.error("no URLs given")
+
+    options = BatchOptions(
+        urls,
+        args.out,
+        args.out_dir,
+        args.engine,
+        args.parser,
+        args.download_jobs,
+        args.parse_jobs,
+        args.index_cache,
+        args.output_format,
+        args.symbols,
+    )
+
+    return profiled(lambda: batch_main(options), args.profile, args.profile_out)
+
+
+def cache_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Parsed index cache command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp cache",
+        description="Inspect or clear the cache of parsed indices.",
+    )
+
+    parser.add_argument("action", choices=("info", "list", "clear"))
+    parser.add_argument(
+        "--dir",
+        help="Cache directory.",
+        default=index_cache.default_directory(),
+    )
+
+    args = parser.parse_args(argv)
+
+    cache = index_cache.IndexCache(args.dir)
+    entries = cache.entries()
+
+    if args.action == "clear":
+        cache.clear()
+        print(f"removed {len(entries)} entries")
+    elif args.action == "list":
+        for entry in entries:
+            last_used = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(entry.last_used)
+            )
+            print(f"{entry.key}  {entry.size:>10}  {last_used}")
+    else:
+        print(f"directory: {cache.directory}")
+        print(f"entries: {len(entries)}")
+        print(f"size: {sum(entry.size for entry in entries)} bytes")
+
+    return 0
+
+
+def matrix_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Membership matrix command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp matrix",
+        description="Write index membership as a ticker by date boolean matrix "
+        "to an .npz file. Requires numpy.",
+    )
+
+    parser.add_argument(
+        "source",
+        help="yaml or snapshot file written before, or URL to scrape the data from.",
+    )
+    parser.add_argument("out", help="Where to write the .npz file.")
+    parser.add_argument(
+        "--columns",
+        help="Column dates: distinct diff dates or weekdays.",
+        choices=("diffs", "trading"),
+        default="diffs",
+    )
+    parser.add_argument(
+        "--packed",
+        help="Pack membership bits along the dates axis.",
+        action="store_true",
+    )
+    _add_parse_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+
+    # numpy is an optional dependency, only needed here.
+    from . import matrix  # pylint: disable=import-outside-toplevel
+
+    idx = source.load(args.source, parse_fn(args.engine, args.parser))
+    matrix.membership_matrix(idx, columns=args.columns, packed=args.packed).save(
+        args.out
+    )
+
+    return 0
+
+
+def watch_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Watch mode command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp watch",
+        description="Poll index pages and write the components and diffs "
+        "added or removed as JSON lines.",
+    )
+
+    parser.add_argument("urls", help="URLs to watch.", nargs="*")
+    parser.add_argument("--manifest", help="File listing URLs to watch, one per line.")
+    parser.add_argument(
+        "--interval",
+        help="Seconds between polls.",
+        type=float,
+        default=300.0,
+    )
+    parser.add_argument(
+        "--out",
+        help="File to append events to. If not set, write to stdout.",
+        default=None,
+    )
+    parser.add_argument(
+        "--polls",
+        help="Stop after this many polls. If not set, poll until interrupted.",
+        type=int,
+        default=None,
+    )
+    _add_parse_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+
+    urls = list(args.urls)
+    if args.manifest is not None:
+        urls += batch.read_manifest(args.manifest)
+    if not urls:
+        parser.error("no URLs given")
+
+    cache = index_cache.IndexCache() if args.index_cache else None
+    watcher = watch.Watcher(urls, parse_fn(args.engine, args.parser, cache))
+
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout
+        if args.out is not None:
+            out = stack.enter_context(io.open(args.out, "a", encoding="utf-8"))
+
+        def emit(event: watch.Event) -> None:
+            print(json.dumps(event), file=out, flush=True)
+
+        try:
+            watcher.run(args.interval, emit, args.polls)
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+
+def delta_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Delta command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp delta",
+        description="Write components and diffs added, removed, renamed or "
+        "edited between consecutive index versions as JSON lines.",
+    )
+
+    parser.add_argument(
+        "sources",
+        help="yaml or snapshot files written before, or URLs to scrape the "
+        "data from, oldest first.",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--out", help="Where to write the changes. If not set, write to stdout."
+    )
+    parser.add_argument(
+        "--summary",
+        help="Write the number of changes of each kind instead, one line per "
+        "pair of versions.",
+        action="store_true",
+    )
+    _add_parse_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+    if len(args.sources) < 2:
+        parser.error("at least two sources are needed")
+
+    parse = parse_fn(args.engine, args.parser)
+    # Loaded lazily, at most two versions are kept in memory.
+    changes = delta.deltas(source.load(path, parse) for path in args.sources)
+
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout
+        if args.out is not None:
+            out = stack.enter_context(io.open(args.out, "w", encoding="utf-8"))
+
+        for old, new, change in zip(args.sources, args.sources[1:], changes):
+            if args.summary:
+                counts = collections.Counter(
+                    event["event"] for event in change.events()
+                )
+                summary = ", ".join(f"{kind} {count}" for kind, count in counts.items())
+                print(f"{old} -> {new}: {summary or 'no changes'}", file=out)
+                continue
+
+            for event in change.events():
+                print(json.dumps({"from": old, "to": new, **event}), file=out)
+
+    return 0
+
+
+def lookup_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Symbol lookup command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code, 1 if a symbol is not found.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp lookup",
+        description="Write the index history of symbols as JSON lines: "
+        "current membership, membership intervals and diffs.",
+    )
+
+    parser.add_argument(
+        "source",
+        help="Symbol index written with --symbols, output file written with "
+        "--symbols next to it, or yaml or snapshot file or URL to build the "
+        "symbol index of.",
+    )
+    parser.add_argument("symbols", help="Ticker symbols to look up.", nargs="+")
+    parser.add_argument(
+        "--date",
+        help="Also tell whether the symbols were members at this date, "
+        'e.g. "2023-09-18" or "September 18, 2023".',
+        type=_date_argument,
+        default=None,
+    )
+    _add_parse_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+
+    symbols = lookup.from_source(args.source, parse_fn(args.engine, args.parser))
+
+    found_all = True
+    for symbol in args.symbols:
+        history = symbols.get(symbol)
+        if history is None:
+            print(f"{symbol}: not found", file=sys.stderr)
+            found_all = False
+            continue
+
+        result = history.to_dict()
+        if args.date is not None:
+            result["member_on_date"] = history.is_member(args.date)
+        print(json.dumps(result))
+
+    return 0 if found_all else 1
+
+
+def _source_name(path: str) -> str:
+    if os.path.exists(path):
+        name = os.path.basename(path)
+        for suffix in [lookup.SIDECAR_SUFFIX] + [
+            output_format.suffix for output_format in formats.FORMATS.values()
+        ]:
+            name = name.removesuffix(suffix)
+        return name
+    return batch.output_name(path)
+
+
+def consolidate_cli_main(argv: typing.Sequence[str]) -> int:
+    """
+    Consolidation command line entry point.
+
+    :param argv: Command line arguments.
+    :return: Return code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="scrape_wiki_snp consolidate",
+        description="Write membership intervals of several indices as one CSV "
+        "table of symbol, index, start and end date.",
+    )
+
+    parser.add_argument(
+        "sources",
+        help="yaml or snapshot files written before, or URLs to scrape the "
+        "data from, one per index.",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--name",
+        help="Index name of a source, once per source in order. If not set, "
+        "use the file or page name.",
+        action="append",
+        dest="names",
+        default=None,
+    )
+    parser.add_argument(
+        "--out", help="Where to write the table. If not set, write to stdout."
+    )
+    parser.add_argument(
+        "--date",
+        help="Write only the intervals of the members at this date.",
+        type=_date_argument,
+        default=None,
+    )
+    parser.add_argument(
+        "--symbol", help="Write only the intervals of this symbol.", default=None
+    )
+    _add_parse_arguments(parser)
+
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+    names = args.names
+    if names is None:
+        names = [_source_name(path) for path in args.sources]
+    if len(names) != len(args.sources):
+        parser.error("--name has to be given once per source")
+    if len(set(names)) != len(names):
+        parser.error(f"index names are not unique: {', '.join(names)}")
+
+    parse = parse_fn(args.engine, args.parser)
+    table = consolidate.consolidate(
+        {name: source.load(path, parse) for name, path in zip(names, args.sources)}
+    )
+
+    if args.symbol is not None:
+        rows = table.history(args.symbol)
+        if args.date is not None:
+            rows = [row for row in rows if args.date in row]
+    elif args.date is not None:
+        rows = table.members(args.date)
     else:
-        yaml.dump(idx, sys.stdout, Dumper)
+        rows = table.rows
+
+    if args.out is not None:
+        with io.open(args.out, "w", encoding="utf-8", newline="") as out_file:
+            consolidate.write_csv(rows, out_file)
+    else:
+        consolidate.write_csv(rows, sys.stdout)
 
     return 0
 
 
-def cli_main() -> int:
+_COMMANDS: typing.Dict[str, typing.Callable[[typing.Sequence[str]], int]] = {
+    "batch": batch_cli_main,
+    "cache": cache_cli_main,
+    "consolidate": consolidate_cli_main,
+    "delta": delta_cli_main,
+    "lookup": lookup_cli_main,
+    "matrix": matrix_cli_main,
+    "watch": watch_cli_main,
+}
+
+
+def cli_main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
     """
     Main command line entry point.
 
+    :param argv: Command line arguments. If not set, use `sys.argv`.
     :return: Return code.
     """
-    parser = argparse.ArgumentParser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in _COMMANDS:
+        return _COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        epilog="Subcommands: " + ", ".join(_COMMANDS) + ". "
+        "Run 'scrape_wiki_snp <subcommand> --help' for details."
+    )
 
     parser.add_argument("url", help="URL to scrape the data from.")
     parser.add_argument(
@@ -60,10 +796,44 @@ def cli_main() -> int:
         default=None,
         nargs="?",
     )
+    parser.add_argument(
+        "--update",
+        help="If the output file exists, parse only diffs newer than the ones "
+        "in it and keep the older ones as they are.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--store-dir",
+        help="Where to keep the last index parsed. If set, the page is not "
+        "parsed again until its revision changes.",
+        default=None,
+    )
+    _add_parse_arguments(parser)
+    _add_format_argument(parser)
+    _add_symbols_argument(parser)
+    _add_profile_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    _check_parse_arguments(parser, args)
+    if args.update and args.output_format != "yaml":
+        parser.error("--update requires --format yaml")
+    if args.symbols and args.out is None:
+        parser.error("--symbols requires an output file")
+
+    options = Options(
+        args.url,
+        args.out,
+        args.engine,
+        args.parser,
+        args.store_dir,
+        args.index_cache,
+        args.update,
+        args.output_format,
+        args.symbols,
+    )
 
-    return main(Options(args.url, args.out))
+    return profiled(lambda: main(options), args.profile, args.profile_out)
 
 
 if __name__ == "__main__":
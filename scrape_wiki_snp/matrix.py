@@ -0,0 +1,184 @@
+"""Index membership as a ticker by date boolean matrix."""
+
+from __future__ import annotations
+
+import datetime
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from . import index
+
+COLUMNS = ("diffs", "trading")
+
+
+@dataclass
+class MembershipMatrix:
+    """
+    Index membership matrix.
+
+    :param tickers: Row labels, sorted ticker symbols.
+    :param dates: Column labels, sorted ``datetime64[D]`` dates.
+    :param data: Membership at the end of every date, tickers by dates.
+        If `packed`, bits are packed along the dates axis with `np.packbits`.
+    :param packed: Whether `data` is bit packed.
+    """
+
+    tickers: npt.NDArray[np.str_]
+    dates: npt.NDArray[np.datetime64]
+    data: npt.NDArray[typing.Any]
+    packed: bool = False
+
+    def unpack(self) -> npt.NDArray[np.bool_]:
+        """
+        Get membership as a plain boolean matrix.
+
+        :return: Tickers by dates boolean matrix.
+        """
+        if not self.packed:
+            return self.data
+
+        bits = np.unpackbits(self.data, axis=1, count=len(self.dates))
+        return bits.astype(np.bool_)
+
+    def save(self, path: str) -> None:
+        """
+        Write matrix and labels to an ``.npz`` file.
+
+        :param path: File path.
+        """
+        np.savez_compressed(
+            path,
+            tickers=self.tickers,
+            dates=self.dates,
+            data=self.data,
+            packed=np.bool_(self.packed),
+        )
+
+
+def load(path: str) -> MembershipMatrix:
+    """
+    Read matrix written by `MembershipMatrix.save`.
+
+    :param path: File path.
+    :return: Matrix read.
+    """
+    with np.load(path) as npz:
+        return MembershipMatrix(
+            npz["tickers"], npz["dates"], npz["data"], bool(npz["packed"])
+        )
+
+
+def trading_days(
+    start: datetime.date, end: datetime.date
+) -> npt.NDArray[np.datetime64]:
+    """
+    List weekdays in a date range, exchange holidays are not excluded.
+
+    :param start: First date.
+    :param end: Last date, inclusive.
+    :return: Sorted ``datetime64[D]`` dates.
+    """
+    days = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]"
+    )
+    return days[np.is_busday(days)]
+
+
+def _columns(
+    diff_dates: typing.List[datetime.date],
+    dates: typing.Optional[npt.ArrayLike],
+    columns: str,
+) -> npt.NDArray[np.datetime64]:
+    if columns not in COLUMNS:
+        raise ValueError(f"Unknown columns '{columns}'")
+
+    if dates is not None:
+        return np.unique(np.asarray(dates, dtype="datetime64[D]"))
+    if columns == "trading" and diff_dates:
+        return trading_days(min(diff_dates), max(diff_dates))
+
+    return np.unique(np.array(diff_dates, dtype="datetime64[D]"))
+
+
+def _tickers(idx: index.Index, diffs: typing.List[index.Diff]) -> typing.List[str]:
+    symbols = {component.symbol for component in idx.components}
+
+    for diff in diffs:
+        for component in (diff.added, diff.removed):
+            if component is not None:
+                symbols.add(component.symbol)
+
+    return sorted(symbols)
+
+
+def _undone(
+    diffs: typing.List[index.Diff],
+    diff_dates: typing.List[datetime.date],
+    cols: npt.NDArray[np.datetime64],
+    rows: typing.Dict[str, int],
+) -> npt.NDArray[np.int32]:
+    # A diff is undone in the columns before its date: the effect is put at
+    # the last such column and summed up towards the first one.
+    positions = np.searchsorted(cols, np.array(diff_dates, dtype="datetime64[D]"))
+
+    effects: typing.List[typing.Tuple[int, int, int]] = []
+    for diff, position in zip(diffs, positions.tolist()):
+        if position == 0:
+            continue
+        if diff.added is not None:
+            effects.append((rows[diff.added.symbol], position - 1, -1))
+        if diff.removed is not None:
+            effects.append((rows[diff.removed.symbol], position - 1, 1))
+
+    effect_array = np.array(effects, dtype=np.intp).reshape(-1, 3)
+    delta = np.zeros((len(rows), len(cols)), dtype=np.int32)
+    np.add.at(delta, (effect_array[:, 0], effect_array[:, 1]), effect_array[:, 2])
+
+    result: npt.NDArray[np.int32] = np.flip(
+        np.cumsum(np.flip(delta, axis=1), axis=1), axis=1
+    )
+    return result
+
+
+def membership_matrix(
+    idx: index.Index,
+    dates: typing.Optional[npt.ArrayLike] = None,
+    columns: str = "diffs",
+    packed: bool = False,
+) -> MembershipMatrix:
+    """
+    Build index membership matrix.
+
+    Rows are all the tickers seen in the current components and in the diffs.
+    Diffs with dates not recognized are not taken into account.
+
+    :param idx: Index to build the matrix of.
+    :param dates: Column dates. If not set, see `columns`.
+    :param columns: If `dates` are not set, "diffs" for the distinct diff dates
+        or "trading" for the weekdays from the first to the last diff date.
+    :param packed: Pack membership bits along the dates axis.
+    :return: Membership matrix.
+    """
+    by_date = idx.date_index()
+    diff_dates, diffs = by_date.dates, by_date.diffs
+    cols = _columns(diff_dates, dates, columns)
+    tickers = _tickers(idx, diffs)
+    rows = {symbol: row for row, symbol in enumerate(tickers)}
+
+    current = np.zeros(len(tickers), dtype=np.int32)
+    current[
+        np.array([rows[component.symbol] for component in idx.components], np.intp)
+    ] = 1
+
+    undone = _undone(diffs, diff_dates, cols, rows)
+    data = (current[:, None] + undone) > 0
+
+    if packed:
+        return MembershipMatrix(
+            np.array(tickers, dtype=np.str_), cols, np.packbits(data, axis=1), True
+        )
+
+    return MembershipMatrix(np.array(tickers, dtype=np.str_), cols, data)
@@ -0,0 +1,135 @@
+"""Point-in-time index membership."""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import typing
+
+from . import index
+
+_DateLike = typing.Union[datetime.date, str]
+
+
+def to_date(value: _DateLike) -> datetime.date:
+    """
+    Convert diff date to a date object.
+
+    :param value: Date object, or a date text like "September 18, 2023".
+    :return: Date object.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+
+    date = index.parse_date(value)
+    if isinstance(date, str):
+        raise ValueError(f"Date '{value}' is not recognized")
+
+    return date
+
+
+class Membership:
+    """
+    Index membership at any date.
+
+    Diffs are sorted newest first and undone one by one starting from the
+    current components. Every `checkpoint_every` diffs the membership is kept,
+    so a query costs a bisect plus at most `checkpoint_every` diffs undone.
+
+    A diff applies on its date: members on a date include the components added
+    on that date and exclude the ones removed on it.
+
+    :param idx: Index to query.
+    :param checkpoint_every: Diffs between membership checkpoints.
+    """
+
+    def __init__(self, idx: index.Index, checkpoint_every: int = 32) -> None:
+        """
+        Init membership.
+
+        :param idx: Index to query.
+        :param checkpoint_every: Diffs between membership checkpoints.
+        """
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be positive")
+
+        by_date = idx.date_index()
+
+        self.skipped: typing.List[index.Diff] = by_date.undated
+        """Diffs with dates not recognized, not taken into account."""
+
+        self._every = checkpoint_every
+        self._neg_ordinals = [-date.toordinal() for date in reversed(by_date.dates)]
+        self._diffs = [
+            (
+                None if diff.added is None else diff.added.symbol,
+                None if diff.removed is None else diff.removed.symbol,
+            )
+            for diff in reversed(by_date.diffs)
+        ]
+
+        members = {component.symbol for component in idx.components}
+        self._checkpoints = [frozenset(members)]
+
+        for number, (added, removed) in enumerate(self._diffs, 1):
+            self._undo(members, added, removed)
+            if number % checkpoint_every == 0:
+                self._checkpoints.append(frozenset(members))
+
+    @staticmethod
+    def _undo(
+        members: typing.Set[str],
+        added: typing.Optional[str],
+        removed: typing.Optional[str],
+    ) -> None:
+        if added is not None:
+            members.discard(added)
+        if removed is not None:
+            members.add(removed)
+
+    def _undone(self, date: _DateLike) -> int:
+        return bisect.bisect_left(self._neg_ordinals, -to_date(date).toordinal())
+
+    def members(self, date: _DateLike) -> typing.FrozenSet[str]:
+        """
+        Get index members at a date.
+
+        :param date: Date to look at.
+        :return: Symbols of the members.
+        """
+        undone = self._undone(date)
+        checkpoint = undone // self._every
+        base = self._checkpoints[checkpoint]
+
+        start = checkpoint * self._every
+        if start == undone:
+            return base
+
+        members = set(base)
+        for added, removed in self._diffs[start:undone]:
+            self._undo(members, added, removed)
+
+        return frozenset(members)
+
+    def is_member(self, symbol: str, date: _DateLike) -> bool:
+        """
+        Check whether a symbol is an index member at a date.
+
+        :param symbol: Ticker symbol.
+        :param date: Date to look at.
+        :return: True if the symbol is a member.
+        """
+        undone = self._undone(date)
+        checkpoint = undone // self._every
+
+        member = symbol in self._checkpoints[checkpoint]
+
+        for added, removed in self._diffs[checkpoint * self._every : undone]:
+            if added == symbol:
+                member = False
+            if removed == symbol:
+                member = True
+
+        return member
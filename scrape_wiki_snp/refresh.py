@@ -0,0 +1,197 @@
+"""Skip parsing pages which did not change since the last run."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import typing
+import urllib.parse
+
+import requests
+
+from . import index, spans
+from .download import Downloader, default_downloader
+
+_NO_CACHE = {"Cache-Control": "no-cache"}
+
+# Bump when index types change, so that stale entries are never loaded.
+_STORE_VERSION = 3
+
+
+def revision_api_url(url: str) -> typing.Optional[str]:
+    """
+    Get MediaWiki API url returning the latest revision id of a wiki page.
+
+    :param url: Wiki page url, e.g. ``https://en.wikipedia.org/wiki/Title``.
+    :return: API url, None if this is not a wiki page url.
+    """
+    parts = urllib.parse.urlsplit(url)
+
+    if not parts.netloc.endswith(".wikipedia.org"):
+        return None
+    if not parts.path.startswith("/wiki/"):
+        return None
+
+    title = urllib.parse.unquote(parts.path[len("/wiki/") :])
+    query = urllib.parse.urlencode(
+        {
+            "action": "query",
+            "prop": "info",
+            "titles": title,
+            "format": "json",
+            "formatversion": "2",
+        }
+    )
+
+    return urllib.parse.urlunsplit(
+        (parts.scheme, parts.netloc, "/w/api.php", query, "")
+    )
+
+
+def revision(url: str, downloader: Downloader) -> typing.Optional[str]:
+    """
+    Look up page revision without downloading the page.
+
+    Wiki pages are looked up through the MediaWiki API, other pages through
+    ``ETag`` and ``Last-Modified`` headers of a HEAD request.
+
+    :param url: Page url.
+    :param downloader: Downloader to send requests with.
+    :return: Opaque revision string, None if revision is unknown.
+    """
+    api_url = revision_api_url(url)
+
+    if api_url is not None:
+        try:
+            reply = downloader.get(api_url, _NO_CACHE).json()
+            return f"revid:{reply['query']['pages'][0]['lastrevid']}"
+        except (requests.RequestException, ValueError, LookupError, TypeError):
+            pass
+
+    try:
+        response = downloader.head(url, _NO_CACHE)
+    except requests.RequestException:
+        return None
+
+    if "ETag" in response.headers:
+        return f"etag:{response.headers['ETag']}"
+    if "Last-Modified" in response.headers:
+        return f"last-modified:{response.headers['Last-Modified']}"
+
+    return None
+
+
+def content_revision(html: str) -> str:
+    """
+    Make revision string out of page content.
+
+    :param html: Page content.
+    :return: Revision string.
+    """
+    return "sha256:" + hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class RevisionStore:
+    """
+    Directory keeping the last index parsed from every page.
+
+    :param directory: Store directory, created if missing.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Init store.
+
+        :param directory: Store directory, created if missing.
+        """
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, name + ".pickle")
+
+    def get(self, url: str) -> typing.Optional[typing.Tuple[str, index.Index]]:
+        """
+        Get index stored for a page.
+
+        :param url: Page url.
+        :return: Revision and index stored, None if nothing is stored.
+        """
+        try:
+            with open(self._path(url), "rb") as stored_file:
+                stored = pickle.load(stored_file)
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError):
+            return None
+
+        if stored.get("version") != _STORE_VERSION or stored.get("url") != url:
+            return None
+
+        return stored["revision"], stored["index"]
+
+    def put(self, url: str, page_revision: str, idx: index.Index) -> None:
+        """
+        Store index parsed from a page.
+
+        :param url: Page url.
+        :param page_revision: Page revision the index is parsed from.
+        :param idx: Index parsed.
+        """
+        stored = {
+            "version": _STORE_VERSION,
+            "url": url,
+            "revision": page_revision,
+            "index": idx,
+        }
+
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self._directory, delete=False
+        ) as tmp_file:
+            pickle.dump(stored, tmp_file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_file.name, self._path(url))
+
+
+def fetch_index(
+    url: str,
+    parse_fn: typing.Callable[[str], index.Index],
+    store: RevisionStore,
+    downloader: typing.Optional[Downloader] = None,
+) -> index.Index:
+    """
+    Get page index, parsing the page only if it changed since the last time.
+
+    If the page revision can be looked up cheaply and matches the stored one,
+    the page is not even downloaded. Otherwise the page is downloaded and
+    parsed unless its content hash matches the stored one.
+
+    :param url: Page url.
+    :param parse_fn: Page parse function.
+    :param store: Store of indices parsed before.
+    :param downloader: Downloader, the shared default one if not set.
+    :return: Page index.
+    """
+    if downloader is None:
+        downloader = default_downloader()
+
+    stored = store.get(url)
+    with spans.span("revision", url=url) as current:
+        page_revision = revision(url, downloader)
+        current.attributes["revision"] = page_revision
+
+    if stored is not None and page_revision is not None and stored[0] == page_revision:
+        return stored[1]
+
+    html = downloader.download(url)
+
+    if page_revision is None:
+        page_revision = content_revision(html)
+        if stored is not None and stored[0] == page_revision:
+            return stored[1]
+
+    idx = parse_fn(html)
+    store.put(url, page_revision, idx)
+
+    return idx
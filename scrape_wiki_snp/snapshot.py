@@ -0,0 +1,312 @@
+"""
+Binary index snapshots, read through mmap.
+
+A snapshot file, all integers little endian, is:
+
+* header: magic, version, and the string, component, member and diff counts;
+* string offsets: ``strings + 1`` u32 offsets into the string data;
+* components: ``components`` records of the symbol and name string ids,
+  two i32 each, every distinct component once;
+* members: ``members`` u32 component ids of the index components list;
+* diffs: ``diffs`` records of four i32: the date ordinal (or ``-1 - id`` of
+  the date text string if the date is not recognized), the added and removed
+  component ids (-1 for none) and the reason string id;
+* string data: UTF-8 strings back to back.
+"""
+
+from __future__ import annotations
+
+import collections.abc
+import datetime
+import mmap
+import struct
+import typing
+
+from . import index
+
+MAGIC = b"SNPINDEX"
+"""First bytes of a snapshot file."""
+
+_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIIII")
+_U32 = struct.Struct("<I")
+_COMPONENT = struct.Struct("<ii")
+_DIFF = struct.Struct("<iiii")
+
+_T = typing.TypeVar("_T")
+
+
+class SnapshotError(Exception):
+    """Snapshot exception class."""
+
+
+def write(idx: index.Index, stream: typing.IO[bytes]) -> None:
+    """
+    Write index snapshot.
+
+    Components equal by value are written once.
+
+    :param idx: Index to write.
+    :param stream: Binary stream to write to.
+    """
+    string_ids: typing.Dict[str, int] = {}
+    string_data = bytearray()
+    string_offsets = [0]
+
+    def string_id(text: str) -> int:
+        found = string_ids.get(text)
+        if found is None:
+            found = len(string_ids)
+            string_ids[text] = found
+            string_data.extend(text.encode("utf-8"))
+            string_offsets.append(len(string_data))
+        return found
+
+    component_ids: typing.Dict[typing.Tuple[str, str], int] = {}
+    components = bytearray()
+
+    def component_id(component: typing.Optional[index.Component]) -> int:
+        if component is None:
+            return -1
+        key = (component.symbol, component.name)
+        found = component_ids.get(key)
+        if found is None:
+            found = len(component_ids)
+            component_ids[key] = found
+            components.extend(
+                _COMPONENT.pack(string_id(component.symbol), string_id(component.name))
+            )
+        return found
+
+    members = bytearray()
+    for component in idx.components:
+        members += _U32.pack(component_id(component))
+
+    diffs = bytearray()
+    for diff in idx.diffs:
+        if isinstance(diff.date, str):
+            date = -1 - string_id(diff.date)
+        else:
+            date = diff.date.toordinal()
+        diffs += _DIFF.pack(
+            date,
+            component_id(diff.added),
+            component_id(diff.removed),
+            string_id(diff.reason),
+        )
+
+    stream.write(
+        _HEADER.pack(
+            MAGIC,
+            _VERSION,
+            len(string_ids),
+            len(component_ids),
+            len(idx.components),
+            len(idx.diffs),
+        )
+    )
+    stream.write(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+    stream.write(components)
+    stream.write(members)
+    stream.write(diffs)
+    stream.write(string_data)
+
+
+class _Records(collections.abc.Sequence[_T]):
+    # Sequence decoding items on access.
+
+    def __init__(self, count: int, get: typing.Callable[[int], _T]) -> None:
+        self._count = count
+        self._get = get
+
+    def __len__(self) -> int:
+        return self._count
+
+    @typing.overload
+    def __getitem__(self, item: int) -> _T: ...
+
+    @typing.overload
+    def __getitem__(self, item: slice) -> typing.List[_T]: ...
+
+    def __getitem__(
+        self, item: typing.Union[int, slice]
+    ) -> typing.Union[_T, typing.List[_T]]:
+        if isinstance(item, slice):
+            return [self._get(i) for i in range(*item.indices(self._count))]
+        if item < 0:
+            item += self._count
+        if not 0 <= item < self._count:
+            raise IndexError("snapshot record index out of range")
+        return self._get(item)
+
+
+# pylint: disable=too-many-instance-attributes
+class Snapshot:
+    """
+    Index snapshot file mapped in memory.
+
+    Nothing is decoded up front: `components` and `diffs` are sequences
+    decoding records on access. Decoded components are kept, so that diffs
+    reference the same instances. Processes mapping one file share its pages.
+
+    :param path: Snapshot file path.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map snapshot file.
+
+        :param path: Snapshot file path.
+        """
+        with open(path, "rb") as snapshot_file:
+            try:
+                self._map = mmap.mmap(
+                    snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError as exc:
+                raise SnapshotError(f"'{path}' is empty") from exc
+
+        try:
+            self._read_header(path)
+        except SnapshotError:
+            self._map.close()
+            raise
+
+        self._strings: typing.Dict[int, str] = {}
+        self._components: typing.List[typing.Optional[index.Component]] = [
+            None
+        ] * self._component_count
+
+        self.components: typing.Sequence[index.Component] = _Records(
+            self._member_count, self._member
+        )
+        """Index components."""
+        self.diffs: typing.Sequence[index.Diff] = _Records(self._diff_count, self._diff)
+        """Index diffs."""
+
+    def _read_header(self, path: str) -> None:
+        if len(self._map) < _HEADER.size:
+            raise SnapshotError(f"'{path}' is not an index snapshot")
+
+        (
+            magic,
+            version,
+            self._string_count,
+            self._component_count,
+            self._member_count,
+            self._diff_count,
+        ) = _HEADER.unpack_from(self._map)
+
+        if magic != MAGIC:
+            raise SnapshotError(f"'{path}' is not an index snapshot")
+        if version != _VERSION:
+            raise SnapshotError(f"'{path}' snapshot version {version} is not supported")
+
+        self._offsets = _HEADER.size
+        self._component_records = self._offsets + _U32.size * (self._string_count + 1)
+        self._members = (
+            self._component_records + _COMPONENT.size * self._component_count
+        )
+        self._diff_records = self._members + _U32.size * self._member_count
+        self._string_data = self._diff_records + _DIFF.size * self._diff_count
+
+        if len(self._map) < self._string_data:
+            raise SnapshotError(f"'{path}' snapshot is truncated")
+        (data_size,) = _U32.unpack_from(
+            self._map, self._offsets + _U32.size * self._string_count
+        )
+        if len(self._map) != self._string_data + data_size:
+            raise SnapshotError(f"'{path}' snapshot is truncated")
+
+    def close(self) -> None:
+        """Unmap file. Records can not be read after that."""
+        self._map.close()
+
+    def __enter__(self) -> Snapshot:
+        """
+        Enter context.
+
+        :return: self.
+        """
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        """
+        Exit context, unmap file.
+
+        :param args: Exception info, if any.
+        """
+        self.close()
+
+    def to_index(self) -> index.Index:
+        """
+        Decode whole index.
+
+        :return: Index with components shared between the components list
+            and the diffs.
+        """
+        return index.Index(list(self.components), list(self.diffs))
+
+    def _string(self, string_id: int) -> str:
+        text = self._strings.get(string_id)
+        if text is None:
+            start, end = struct.unpack_from(
+                "<II", self._map, self._offsets + _U32.size * string_id
+            )
+            base = self._string_data
+            text = str(self._map[base + start : base + end], "utf-8")
+            self._strings[string_id] = text
+        return text
+
+    def _component(self, component_id: int) -> typing.Optional[index.Component]:
+        if component_id < 0:
+            return None
+
+        component = self._components[component_id]
+        if component is None:
+            symbol, name = _COMPONENT.unpack_from(
+                self._map, self._component_records + _COMPONENT.size * component_id
+            )
+            component = index.Component(self._string(symbol), self._string(name))
+            self._components[component_id] = component
+        return component
+
+    def _member(self, member: int) -> index.Component:
+        (component_id,) = _U32.unpack_from(
+            self._map, self._members + _U32.size * member
+        )
+        return typing.cast(index.Component, self._component(component_id))
+
+    def _diff(self, diff: int) -> index.Diff:
+        date, added, removed, reason = _DIFF.unpack_from(
+            self._map, self._diff_records + _DIFF.size * diff
+        )
+        return index.Diff(
+            self._string(-1 - date) if date < 0 else datetime.date.fromordinal(date),
+            self._component(added),
+            self._component(removed),
+            self._string(reason),
+        )
+
+
+def is_snapshot(path: str) -> bool:
+    """
+    Check whether a file is an index snapshot.
+
+    :param path: File path.
+    :return: True if the file starts with `MAGIC`.
+    """
+    with open(path, "rb") as snapshot_file:
+        return snapshot_file.read(len(MAGIC)) == MAGIC
+
+
+def load(path: str) -> index.Index:
+    """
+    Load whole index from a snapshot file.
+
+    :param path: Snapshot file path.
+    :return: Index loaded.
+    """
+    with Snapshot(path) as snapshot:
+        return snapshot.to_index()
@@ -0,0 +1,41 @@
+"""Load an index from a page url or from a file written before."""
+
+from __future__ import annotations
+
+import io
+import os
+import typing
+
+from . import index, snapshot, wiki_snp
+from .download import download
+from .loader import LoaderException, load_index
+
+
+class SourceError(Exception):
+    """Index source error."""
+
+
+def load(
+    source: str, parse_fn: typing.Callable[[str], index.Index] = wiki_snp.parse
+) -> index.Index:
+    """
+    Load index from a file, or download and parse it if this is not a file.
+
+    :param source: Path of a yaml or snapshot file written before, or a page url.
+    :param parse_fn: Page parse function.
+    :return: Index loaded.
+    """
+    if not os.path.exists(source):
+        return parse_fn(download(source))
+
+    if snapshot.is_snapshot(source):
+        try:
+            return snapshot.load(source)
+        except snapshot.SnapshotError as exc:
+            raise SourceError(str(exc)) from exc
+
+    try:
+        with io.open(source, "r", encoding="utf-8") as source_file:
+            return load_index(source_file)
+    except LoaderException as exc:
+        raise SourceError(f"'{source}' does not hold an index") from exc
@@ -0,0 +1,286 @@
+"""Timing spans of the scrape stages, reported to hooks."""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import gc
+import threading
+import time
+import tracemalloc
+import typing
+from dataclasses import dataclass, field
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Span:
+    """
+    Timed stage of a run.
+
+    :param name: Stage name, e.g. "download" or "html".
+    :param attributes: Stage details, e.g. the url or the bytes downloaded.
+    :param parent: Span this one is nested in, if any.
+    :param start: `time.perf_counter` at the start of the span.
+    :param seconds: Span duration, set when the span ends.
+    :param start_memory: Memory traced at the start of the span, if tracing.
+    :param peak_memory: Peak memory traced during the span so far.
+    :param outer_peak: Peak memory traced before the span started, since the
+        enclosing span started or the peak was last reset.
+    """
+
+    name: str
+    attributes: typing.Dict[str, typing.Any] = field(default_factory=dict)
+    parent: typing.Optional[Span] = field(default=None, repr=False)
+    start: float = 0.0
+    seconds: float = 0.0
+    start_memory: typing.Optional[int] = None
+    peak_memory: int = 0
+    outer_peak: int = field(default=0, repr=False)
+
+    @property
+    def path(self) -> str:
+        """
+        Names of the enclosing spans and this one, joined with "/".
+
+        :return: Span path.
+        """
+        if self.parent is None:
+            return self.name
+        return f"{self.parent.path}/{self.name}"
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Convert to a JSON serializable dict.
+
+        :return: Span as a dict.
+        """
+        return {
+            "name": self.name,
+            "path": self.path,
+            "start": self.start,
+            "seconds": self.seconds,
+            "attributes": self.attributes,
+        }
+
+
+Hook = typing.Callable[[Span], None]
+
+_TOTALS = (
+    "count",
+    "seconds",
+    "bytes",
+    "cached",
+    "hits",
+    "memory",
+    "memory_peak",
+    "memory_retained",
+)
+
+_HOOKS: typing.List[Hook] = []
+_HOOKS_LOCK = threading.Lock()
+
+# Number of `account_memory` blocks running.
+_MEMORY = 0
+
+_CURRENT: contextvars.ContextVar[typing.Optional[Span]] = contextvars.ContextVar(
+    "scrape_wiki_snp_span", default=None
+)
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Add hook called with every span ended.
+
+    Hooks are called from the thread running the span.
+
+    :param hook: Function taking the span ended.
+    """
+    with _HOOKS_LOCK:
+        _HOOKS.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """
+    Remove hook added before.
+
+    :param hook: Hook to remove.
+    """
+    with _HOOKS_LOCK:
+        _HOOKS.remove(hook)
+
+
+@contextlib.contextmanager
+def account_memory() -> typing.Iterator[None]:
+    """
+    Account memory of the spans run in the block, see `span`.
+
+    Memory is accounted only while `tracemalloc` is tracing, which is up to
+    the caller. Accounting collects garbage at the end of every span, so it is
+    off by default.
+
+    :return: Context manager.
+    """
+    global _MEMORY  # pylint: disable=global-statement
+
+    with _HOOKS_LOCK:
+        _MEMORY += 1
+    try:
+        yield
+    finally:
+        with _HOOKS_LOCK:
+            _MEMORY -= 1
+
+
+def _start_memory(current: Span) -> None:
+    # The peak traced is reset at every span start, so that it is the peak
+    # since then. The running peaks of the enclosing spans are kept in their
+    # `peak_memory`, and the peak before the reset in `outer_peak`, to be
+    # reported by the outermost span at its end.
+    if not _MEMORY or not tracemalloc.is_tracing():
+        return
+
+    traced, peak = tracemalloc.get_traced_memory()
+    if current.parent is not None:
+        current.parent.peak_memory = max(current.parent.peak_memory, peak)
+    tracemalloc.reset_peak()
+
+    current.start_memory = traced
+    current.peak_memory = traced
+    current.outer_peak = peak
+
+
+def _end_memory(current: Span) -> None:
+    if current.start_memory is None or not tracemalloc.is_tracing():
+        return
+
+    # Peak first, then the memory left once the garbage of the span is gone.
+    current.peak_memory = max(current.peak_memory, tracemalloc.get_traced_memory()[1])
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    if current.parent is not None:
+        current.parent.peak_memory = max(
+            current.parent.peak_memory, current.peak_memory
+        )
+    else:
+        current.attributes["memory_traced_peak"] = max(
+            current.outer_peak, current.peak_memory
+        )
+
+    current.attributes["memory_peak"] = current.peak_memory - current.start_memory
+    current.attributes["memory_retained"] = traced - current.start_memory
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: typing.Any) -> typing.Iterator[Span]:
+    """
+    Time a stage, then report it to the hooks.
+
+    Spans started inside the ``with`` block are nested in this one.
+
+    In an `account_memory` block, if `tracemalloc` is tracing, the peak
+    memory allocated during the span and the memory still allocated at its
+    end, after a garbage collection, both over the memory allocated at its
+    start, are set as "memory_peak" and "memory_retained" attributes. As the
+    peak `tracemalloc` reports is reset at every span start, the outermost span
+    sets the peak traced since before it started as "memory_traced_peak".
+    Memory is traced process wide, so spans of concurrent threads count
+    each other's allocations.
+
+    :param name: Stage name.
+    :param attributes: Stage details, more can be set on the span yielded.
+    :return: Context manager yielding the span.
+    """
+    current = Span(name, attributes, _CURRENT.get(), time.perf_counter())
+    _start_memory(current)
+    token = _CURRENT.set(current)
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - current.start
+        _end_memory(current)
+        _CURRENT.reset(token)
+        with _HOOKS_LOCK:
+            hooks = list(_HOOKS)
+        for hook in hooks:
+            hook(current)
+
+
+class Recorder:
+    """Hook keeping all the spans ended while it is active."""
+
+    def __init__(self) -> None:
+        """Init empty recorder."""
+        self.spans: typing.List[Span] = []
+        """Spans ended, in the order they ended."""
+        self._lock = threading.Lock()
+
+    def __call__(self, ended: Span) -> None:
+        """
+        Keep span.
+
+        :param ended: Span ended.
+        """
+        with self._lock:
+            self.spans.append(ended)
+
+    def __enter__(self) -> Recorder:
+        """
+        Start recording.
+
+        :return: self.
+        """
+        add_hook(self)
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        """
+        Stop recording.
+
+        :param args: Exception info, if any.
+        """
+        remove_hook(self)
+
+    def summary(self) -> typing.List[str]:
+        """
+        Summarize spans by path: count, total time, bytes, cache hits, and the
+        max peak and the total retained memory if traced.
+
+        :return: Summary lines, in the order the paths first ended.
+        """
+        totals: typing.Dict[str, typing.Dict[str, float]] = {}
+        for ended in self.spans:
+            total = totals.setdefault(
+                ended.path,
+                dict.fromkeys(_TOTALS, 0),
+            )
+            total["count"] += 1
+            total["seconds"] += ended.seconds
+            total["bytes"] += ended.attributes.get("bytes", 0)
+            if "from_cache" in ended.attributes:
+                total["cached"] += 1
+                total["hits"] += bool(ended.attributes["from_cache"])
+            if "memory_peak" in ended.attributes:
+                total["memory"] += 1
+                total["memory_peak"] = max(
+                    total["memory_peak"], ended.attributes["memory_peak"]
+                )
+                total["memory_retained"] += ended.attributes["memory_retained"]
+
+        lines = []
+        for path, total in totals.items():
+            line = f"{path}: {total['seconds']:.3f}s"
+            if total["count"] > 1:
+                line += f" in {total['count']:.0f} spans"
+            if total["bytes"]:
+                line += f", {total['bytes'] / 2**10:.1f} KiB"
+            if total["cached"]:
+                line += f", cache hits {total['hits']:.0f}/{total['cached']:.0f}"
+            if total["memory"]:
+                line += (
+                    f", peak {total['memory_peak'] / 2**20:.1f} MiB"
+                    f", retained {total['memory_retained'] / 2**20:.1f} MiB"
+                )
+            lines.append(line)
+
+        return lines
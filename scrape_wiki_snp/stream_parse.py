@@ -0,0 +1,254 @@
+"""Parse S&P index data from a wiki page without building a document tree."""
+
+from __future__ import annotations
+
+import html.parser
+import typing
+from dataclasses import dataclass, field
+
+from . import index, spans, wiki_snp
+
+_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class _Table:
+    """
+    Top level table being extracted.
+
+    :param headers: Texts of all the ``th`` cells seen so far.
+    :param rows: ``td`` cells of every row seen so far, diffs tables rows are
+        built into `diffs` instead.
+    :param kind: What the table holds, once known.
+    :param builder: Builder of the diffs, for a diffs table.
+    :param diffs: Diffs built so far, for a diffs table.
+    """
+
+    headers: typing.List[str] = field(default_factory=list)
+    rows: typing.List[typing.List[wiki_snp.Cell]] = field(default_factory=list)
+    kind: typing.Optional[str] = None
+    builder: typing.Optional[wiki_snp.DiffsBuilder] = None
+    diffs: typing.List[index.Diff] = field(default_factory=list)
+
+
+_COMPONENTS = "components"
+_DIFFS = "diffs"
+_OTHER = "other"
+
+
+# pylint: disable=too-many-instance-attributes
+class TableExtractor(html.parser.HTMLParser):
+    """
+    Event based extractor of the components and the diffs tables.
+
+    Only the text of ``th``/``td`` cells of the two tables of interest is kept,
+    everything else on the page is dropped as soon as it is seen.
+
+    :param history: Diffs known already. If set, the diffs table is read only
+        until the newest known diff, see `wiki_snp.merge_diffs`.
+    """
+
+    def __init__(self, history: typing.Sequence[index.Diff] = ()) -> None:
+        """
+        Init extractor.
+
+        :param history: Diffs known already.
+        """
+        super().__init__(convert_charrefs=True)
+
+        self._history = history
+        self.components: typing.Optional[typing.List[index.Component]] = None
+        self.diffs: typing.Optional[typing.List[index.Diff]] = None
+
+        self._table: typing.Optional[_Table] = None
+        self._depth = 0
+        self._row: typing.Optional[typing.List[wiki_snp.Cell]] = None
+        self._cell_tag: typing.Optional[str] = None
+        self._cell_rowspan = "0"
+        self._cell_text: typing.List[str] = []
+
+    @property
+    def done(self) -> bool:
+        """
+        Check whether both tables have been extracted.
+
+        :return: True if there is nothing left to extract.
+        """
+        return self.components is not None and self.diffs is not None
+
+    def handle_starttag(
+        self, tag: str, attrs: typing.List[typing.Tuple[str, typing.Optional[str]]]
+    ) -> None:
+        """
+        Handle start tag.
+
+        :param tag: Tag name.
+        :param attrs: Tag attributes.
+        """
+        if tag == "table":
+            self._depth += 1
+            if self._depth == 1 and not self.done:
+                self._table = _Table()
+            return
+
+        if self._depth != 1 or self._table is None or self._table.kind == _OTHER:
+            return
+
+        if tag == "tr":
+            self._end_row()
+            self._row = []
+        elif tag in ("td", "th"):
+            self._end_cell()
+            if tag == "td" and self._table.kind is None:
+                self._set_kind(self._table, self._classify(self._table.headers))
+                if self._table.kind == _OTHER:
+                    self._row = None
+                    return
+            self._cell_tag = tag
+            self._cell_rowspan = dict(attrs).get("rowspan") or "0"
+            self._cell_text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        """
+        Handle end tag.
+
+        :param tag: Tag name.
+        """
+        if tag == "table":
+            if self._depth == 1:
+                self._end_table()
+            self._depth = max(self._depth - 1, 0)
+        elif self._depth != 1 or self._table is None:
+            return
+        elif tag == "tr":
+            self._end_row()
+        elif tag == self._cell_tag:
+            self._end_cell()
+
+    def handle_data(self, data: str) -> None:
+        """
+        Handle text data.
+
+        :param data: Text.
+        """
+        if self._cell_tag is not None and self._depth == 1:
+            self._cell_text.append(data)
+
+    def _classify(self, headers: typing.Sequence[str]) -> str:
+        if self.diffs is None and wiki_snp.is_diffs_header(headers):
+            return _DIFFS
+
+        if self.components is None and wiki_snp.is_components_header(headers):
+            return _COMPONENTS
+
+        return _OTHER
+
+    def _set_kind(self, table: _Table, kind: str) -> None:
+        table.kind = kind
+
+        if kind == _DIFFS:
+            table.builder = wiki_snp.DiffsBuilder(table.headers)
+            for row in table.rows:
+                self._add_diff_row(table, row)
+            table.rows = []
+        elif kind == _OTHER:
+            table.rows = []
+
+    def _add_diff_row(self, table: _Table, row: typing.List[wiki_snp.Cell]) -> None:
+        assert table.builder is not None
+
+        diff = table.builder.add_row(row)
+        if diff is None:
+            return
+
+        if self._history and diff == self._history[0]:
+            self.diffs = table.diffs + list(self._history)
+            table.kind = _OTHER
+            table.diffs = []
+            return
+
+        table.diffs.append(diff)
+
+    def _end_cell(self) -> None:
+        if self._cell_tag is None or self._table is None:
+            return
+
+        text = "".join(self._cell_text)
+
+        if self._cell_tag == "th":
+            self._table.headers.append(text)
+        elif self._row is not None:
+            self._row.append(wiki_snp.Cell(text, self._cell_rowspan))
+
+        self._cell_tag = None
+        self._cell_text = []
+
+    def _end_row(self) -> None:
+        self._end_cell()
+
+        if self._row is not None and self._table is not None:
+            if self._table.builder is not None and self._table.kind == _DIFFS:
+                self._add_diff_row(self._table, self._row)
+            elif self._table.kind != _OTHER:
+                self._table.rows.append(self._row)
+
+        self._row = None
+
+    def _end_table(self) -> None:
+        self._end_row()
+
+        table = self._table
+        self._table = None
+
+        if table is None:
+            return
+
+        if table.kind is None:
+            self._set_kind(table, self._classify(table.headers))
+
+        if table.kind == _COMPONENTS:
+            self.components = wiki_snp.components_from_rows(table.headers, table.rows)
+        elif table.kind == _DIFFS:
+            if not wiki_snp.is_diffs_header(table.headers):
+                raise wiki_snp.ParseError("Diffs table structure is not recognized")
+            self.diffs = table.diffs
+
+
+def _chunks(stream: str) -> typing.Iterator[str]:
+    for offset in range(0, len(stream), _CHUNK_SIZE):
+        yield stream[offset : offset + _CHUNK_SIZE]
+
+
+def parse(
+    stream: typing.Union[str, typing.Iterable[str]],
+    history: typing.Sequence[index.Diff] = (),
+) -> index.Index:
+    """
+    Parse S&P index data from a wiki page.
+
+    Tables are recognized by their headers rather than by their position, and
+    reading stops as soon as both the components and the diffs are extracted.
+
+    :param stream: Page text, or an iterable of page text chunks.
+    :param history: Diffs known already. If set, the diffs table is read only
+        until the newest known diff, see `wiki_snp.merge_diffs`.
+    :return: index object parsed, components shared, see `index.compact`.
+    """
+    chunks = _chunks(stream) if isinstance(stream, str) else stream
+
+    with spans.span("parse", engine="stream"):
+        extractor = TableExtractor(history)
+
+        for chunk in chunks:
+            extractor.feed(chunk)
+            if extractor.done:
+                break
+        else:
+            extractor.close()
+
+        if extractor.components is None:
+            raise wiki_snp.ParseError("Components table not found")
+        if extractor.diffs is None:
+            raise wiki_snp.ParseError("Diffs table not found")
+
+        return index.compact(index.Index(extractor.components, extractor.diffs))
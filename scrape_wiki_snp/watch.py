@@ -0,0 +1,155 @@
+"""Poll index pages and report membership changes."""
+
+from __future__ import annotations
+
+import datetime
+import time
+import typing
+from dataclasses import dataclass
+
+import requests
+
+from . import delta, index, spans, wiki_snp
+from .download import Downloader
+from .refresh import content_revision
+
+Event = delta.Event
+"""JSON serializable event, see `Watcher.poll`."""
+
+
+@dataclass
+class _Page:
+    idx: typing.Optional[index.Index] = None
+    etag: typing.Optional[str] = None
+    last_modified: typing.Optional[str] = None
+    content: typing.Optional[str] = None
+
+
+class Watcher:
+    """
+    Poller keeping the last index parsed from every page in memory.
+
+    Pages are requested with ``If-None-Match`` and ``If-Modified-Since``, and
+    parsed only if the server replies they changed and their content hash did
+    change.
+
+    :param urls: Page urls.
+    :param parse_fn: Page parse function.
+    :param downloader: Downloader, one without the http cache if not set.
+    """
+
+    def __init__(
+        self,
+        urls: typing.Sequence[str],
+        parse_fn: typing.Callable[[str], index.Index],
+        downloader: typing.Optional[Downloader] = None,
+    ) -> None:
+        """
+        Init watcher, nothing is requested until the first poll.
+
+        :param urls: Page urls.
+        :param parse_fn: Page parse function.
+        :param downloader: Downloader, one without the http cache if not set.
+        """
+        self.urls = list(urls)
+        self._parse_fn = parse_fn
+        self._downloader = Downloader(cache=False) if downloader is None else downloader
+        self._pages = {url: _Page() for url in self.urls}
+
+    def current(self, url: str) -> typing.Optional[index.Index]:
+        """
+        Get last index parsed from a page.
+
+        :param url: Page url.
+        :return: Index, None if the page was not loaded yet.
+        """
+        return self._pages[url].idx
+
+    def _poll_page(self, url: str) -> typing.List[Event]:
+        page = self._pages[url]
+
+        headers: typing.Dict[str, str] = {}
+        if page.idx is not None and page.etag is not None:
+            headers["If-None-Match"] = page.etag
+        if page.idx is not None and page.last_modified is not None:
+            headers["If-Modified-Since"] = page.last_modified
+
+        with spans.span("poll", url=url) as current:
+            response = self._downloader.get(url, headers)
+            current.attributes["status"] = response.status_code
+            if response.status_code == 304:
+                return []
+
+            content = content_revision(response.text)
+            idx = None if content == page.content else self._parse_fn(response.text)
+
+        # Validators are kept once the page is parsed only, so that a page
+        # failing to parse is not replied "not modified" to the next poll.
+        page.etag = response.headers.get("ETag")
+        page.last_modified = response.headers.get("Last-Modified")
+        if idx is None:
+            return []
+
+        previous = page.idx
+        page.idx = idx
+        page.content = content
+
+        if previous is None:
+            return [
+                {
+                    "event": "loaded",
+                    "components": len(idx.components),
+                    "diffs": len(idx.diffs),
+                }
+            ]
+
+        return delta.delta(previous, idx).events()
+
+    def poll(self) -> typing.List[Event]:
+        """
+        Poll every page once.
+
+        The first successful poll of a page reports a "loaded" event, later
+        ones the changes found, see `delta.Delta.events`. Pages failing to
+        download or parse are reported as "error" events, and polled again
+        next time. Every event has "time" and "url" keys.
+
+        :return: Events.
+        """
+        events = []
+
+        for url in self.urls:
+            try:
+                page_events = self._poll_page(url)
+            except (requests.RequestException, wiki_snp.ParseError) as exc:
+                page_events = [{"event": "error", "error": str(exc)}]
+
+            now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            events += [{"time": now, "url": url, **event} for event in page_events]
+
+        return events
+
+    def run(
+        self,
+        interval: float,
+        emit: typing.Callable[[Event], None],
+        polls: typing.Optional[int] = None,
+        sleep: typing.Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Poll pages on an interval.
+
+        :param interval: Seconds from the start of a poll to the next one.
+        :param emit: Function called with every event.
+        :param polls: Number of polls. If not set, poll forever.
+        :param sleep: Sleep function (unit tests only).
+        """
+        done = 0
+        while polls is None or done < polls:
+            start = time.monotonic()
+            for event in self.poll():
+                emit(event)
+            done += 1
+
+            if polls is None or done < polls:
+                sleep(max(0.0, interval - (time.monotonic() - start)))
@@ -1,11 +1,13 @@
 """Pare S&P index data from a wiki page."""
 
+import functools
+import itertools
 import re
 import typing
 
 import bs4
 
-from . import index
+from . import index, spans
 
 
 class ParseError(Exception):
@@ -16,18 +18,52 @@ _SYMBOL_REGEX = re.compile("^(Ticker symbol|Symbol|Ticker)$")
 _NAME_REGEX = re.compile("^(Security|Company)$")
 
 
-def parse_components(table: bs4.element.Tag) -> typing.List[index.Component]:
+class Cell(typing.NamedTuple):
     """
-    Parse current index components.
+    Table data cell.
 
-    :param table: Table tag to parse.
-    :return: List of components parsed.
+    :param text: Cell text, as is.
+    :param rowspan: Raw ``rowspan`` attribute value.
+    """
+
+    text: str
+    rowspan: str = "0"
+
+
+def _cells(row: bs4.element.Tag) -> typing.List[Cell]:
+    return [
+        Cell(tag.getText(), typing.cast(str, tag.get("rowspan", "0")))
+        for tag in row.find_all("td")
+    ]
+
+
+def is_components_header(headers: typing.Sequence[str]) -> bool:
+    """
+    Check whether table headers look like the index components table.
+
+    :param headers: Texts of all the ``th`` cells of the table.
+    :return: True if both symbol and name columns are there.
+    """
+    has_symbol = any(_SYMBOL_REGEX.match(text) for text in headers)
+    has_name = any(_NAME_REGEX.match(text) for text in headers)
+
+    return has_symbol and has_name
+
+
+def components_from_rows(
+    headers: typing.Sequence[str], rows: typing.Iterable[typing.Sequence[Cell]]
+) -> typing.List[index.Component]:
+    """
+    Build current index components from table rows.
+
+    :param headers: Texts of all the ``th`` cells of the table.
+    :param rows: ``td`` cells of every table row, header rows included.
+    :return: List of components built.
     """
     symbol_idx = -1
     name_idx = -1
 
-    for idx, tag_th in enumerate(table.find_all("th")):
-        text = tag_th.getText()
+    for idx, text in enumerate(headers):
         if _SYMBOL_REGEX.match(text):
             symbol_idx = idx
         elif _NAME_REGEX.match(text):
@@ -40,14 +76,26 @@ def parse_components(table: bs4.element.Tag) -> typing.List[index.Component]:
 
     result = []
 
-    for row in table.find_all("tr")[1:]:
-        cells = [cell.getText().strip() for cell in row.find_all("td")]
+    for row in itertools.islice(rows, 1, None):
+        cells = [cell.text.strip() for cell in row]
 
         result.append(index.Component(cells[symbol_idx], cells[name_idx]))
 
     return result
 
 
+def parse_components(table: bs4.element.Tag) -> typing.List[index.Component]:
+    """
+    Parse current index components.
+
+    :param table: Table tag to parse.
+    :return: List of components parsed.
+    """
+    headers = [tag_th.getText() for tag_th in table.find_all("th")]
+
+    return components_from_rows(headers, map(_cells, table.find_all("tr")))
+
+
 _DIFFS_HEADER = [
     "Date",
     "Added",
@@ -67,41 +115,68 @@ _REMOVED_NAME_IDX = 4
 _REASON_IDX = 5
 
 
-def parse_diffs(table: bs4.element.Tag) -> typing.List[index.Diff]:
+def is_diffs_header(headers: typing.Sequence[str]) -> bool:
     """
-    Parse index changes.
+    Check whether table headers look like the index changes table.
 
-    :param table: Tale tag to parse.
-    :return: List of index diffs parsed.
+    :param headers: Texts of all the ``th`` cells of the table.
+    :return: True if this is a diffs table header.
     """
-    header_names = [hdr.getText().strip() for hdr in table.find_all("th")]
+    return [text.strip() for text in headers] == _DIFFS_HEADER
 
-    if header_names != _DIFFS_HEADER:
-        raise ParseError("Diffs table structure is not recognized")
 
-    result = []
+class DiffsBuilder:  # pylint: disable=too-few-public-methods
+    """
+    Builder of index changes from table rows, fed one row at a time.
+
+    Cells spanning several rows are carried over between the rows, so the
+    builder can be stopped at any row and every diff built so far is whole.
+
+    :param headers: Texts of the ``th`` cells of the table.
+    """
+
+    def __init__(self, headers: typing.Sequence[str]) -> None:
+        """
+        Init builder.
 
-    date_tag = None
-    date_counter = 0
-    reason_tag = None
-    reason_counter = 0
+        :param headers: Texts of the ``th`` cells of the table.
+        """
+        if not is_diffs_header(headers):
+            raise ParseError("Diffs table structure is not recognized")
 
-    for row in table.find_all("tr")[2:]:
-        td_tags = list(row.find_all("td"))
+        self._header_rows = 2
 
-        if date_counter:
-            td_tags = [date_tag] + td_tags
-        if reason_counter:
-            td_tags = td_tags + [reason_tag]
+        self._date_cell = Cell("")
+        self._date_counter = 0
+        self._reason_cell = Cell("")
+        self._reason_counter = 0
 
-        if not date_counter:
-            date_tag = td_tags[_DATE_IDX]
-            date_counter = int(date_tag.get("rowspan", 0))
-        if not reason_counter:
-            reason_tag = td_tags[_REASON_IDX]
-            reason_counter = int(reason_tag.get("rowspan", 0))
+    def add_row(self, row: typing.Sequence[Cell]) -> typing.Optional[index.Diff]:
+        """
+        Build index change from a table row.
 
-        cells = [cell.getText().strip() for cell in td_tags]
+        :param row: ``td`` cells of the row.
+        :return: Index diff built, None for header rows.
+        """
+        if self._header_rows:
+            self._header_rows -= 1
+            return None
+
+        row_cells = list(row)
+
+        if self._date_counter:
+            row_cells = [self._date_cell] + row_cells
+        if self._reason_counter:
+            row_cells = row_cells + [self._reason_cell]
+
+        if not self._date_counter:
+            self._date_cell = row_cells[_DATE_IDX]
+            self._date_counter = int(self._date_cell.rowspan)
+        if not self._reason_counter:
+            self._reason_cell = row_cells[_REASON_IDX]
+            self._reason_counter = int(self._reason_cell.rowspan)
+
+        cells = [cell.text.strip() for cell in row_cells]
 
         added: typing.Optional[index.Component] = None
         removed: typing.Optional[index.Component] = None
@@ -111,43 +186,161 @@ def parse_diffs(table: bs4.element.Tag) -> typing.List[index.Diff]:
         if cells[_REMOVED_SYM_IDX]:
             removed = index.Component(cells[_REMOVED_SYM_IDX], cells[_REMOVED_NAME_IDX])
 
-        date = cells[_DATE_IDX]
+        date = index.parse_date(cells[_DATE_IDX])
         reason = cells[_REASON_IDX]
 
-        result.append(index.Diff(date, added, removed, reason))
+        self._date_counter = max(self._date_counter - 1, 0)
+        self._reason_counter = max(self._reason_counter - 1, 0)
+
+        return index.Diff(date, added, removed, reason)
 
-        date_counter = max(date_counter - 1, 0)
-        reason_counter = max(reason_counter - 1, 0)
+
+def iter_diffs(
+    headers: typing.Sequence[str], rows: typing.Iterable[typing.Sequence[Cell]]
+) -> typing.Iterator[index.Diff]:
+    """
+    Build index changes from table rows lazily.
+
+    :param headers: Texts of all the ``th`` cells of the table.
+    :param rows: ``td`` cells of every table row, header rows included.
+    :return: Iterator over index diffs built.
+    """
+    builder = DiffsBuilder(headers)
+
+    for row in rows:
+        diff = builder.add_row(row)
+        if diff is not None:
+            yield diff
+
+
+def diffs_from_rows(
+    headers: typing.Sequence[str], rows: typing.Iterable[typing.Sequence[Cell]]
+) -> typing.List[index.Diff]:
+    """
+    Build index changes from table rows.
+
+    :param headers: Texts of all the ``th`` cells of the table.
+    :param rows: ``td`` cells of every table row, header rows included.
+    :return: List of index diffs built.
+    """
+    return list(iter_diffs(headers, rows))
+
+
+def merge_diffs(
+    diffs: typing.Iterable[index.Diff], history: typing.Sequence[index.Diff]
+) -> typing.List[index.Diff]:
+    """
+    Put new index changes on top of the ones known already.
+
+    Diffs are taken, newest first, until the newest known one is reached. If it
+    is never reached the history can not be trusted and is dropped.
+
+    :param diffs: Diffs parsed, newest first.
+    :param history: Diffs known already, newest first.
+    :return: New diffs followed by the history.
+    """
+    result: typing.List[index.Diff] = []
+
+    for diff in diffs:
+        if history and diff == history[0]:
+            return result + list(history)
+        result.append(diff)
 
     return result
 
 
+def parse_diffs(
+    table: bs4.element.Tag, history: typing.Sequence[index.Diff] = ()
+) -> typing.List[index.Diff]:
+    """
+    Parse index changes.
+
+    :param table: Tale tag to parse.
+    :param history: Diffs known already. If set, rows are parsed only until the
+        newest known diff is reached, see `merge_diffs`.
+    :return: List of index diffs parsed.
+    """
+    headers = [hdr.getText() for hdr in table.find_all("th")]
+    rows = map(_cells, table.find_all("tr"))
+
+    return merge_diffs(iter_diffs(headers, rows), history)
+
+
 _ParseComponentsFn = typing.Callable[[bs4.element.Tag], typing.List[index.Component]]
 _ParseDiffsFn = typing.Callable[[bs4.element.Tag], typing.List[index.Diff]]
 
 
+BACKENDS = ("html.parser", "lxml", "html5lib")
+
+_TABLES_ONLY = bs4.SoupStrainer("table")
+
+
+def available_backends() -> typing.List[str]:
+    """
+    List BeautifulSoup backends installed.
+
+    :return: Names of `BACKENDS` that can be used.
+    """
+    result = []
+
+    for name in BACKENDS:
+        try:
+            bs4.BeautifulSoup("", name)
+        except bs4.FeatureNotFound:
+            continue
+        result.append(name)
+
+    return result
+
+
 def parse(
     stream: str,
     parse_components_fn: _ParseComponentsFn = parse_components,
     parse_diffs_fn: _ParseDiffsFn = parse_diffs,
+    backend: str = "html.parser",
+    history: typing.Sequence[index.Diff] = (),
 ) -> index.Index:
     """
     Pare S&P index data from a wiki page.
 
+    Only ``table`` subtrees are built, the rest of the page is skipped by the
+    backend (html5lib does not support that and builds the whole tree).
+
     :param stream: Stream to parse.
     :param parse_components_fn: Parse components function (unit tests only).
     :param parse_diffs_fn: Parse diffs function (unit tests only).
-    :return: index object parsed.
+    :param backend: BeautifulSoup backend, one of `BACKENDS`.
+    :param history: Diffs known already. If set, diff rows are parsed only
+        until the newest known diff is reached, see `merge_diffs`, and
+        `parse_diffs_fn` is not used.
+    :return: index object parsed, components shared, see `index.compact`.
     """
-    soup = bs4.BeautifulSoup(stream, "html.parser")
-
-    tables = soup.find_all("table")
-
-    if len(tables) != 2:
-        components = parse_components_fn(tables[1])
-        diffs = parse_diffs_fn(tables[2])
-    else:
-        components = parse_components_fn(tables[0])
-        diffs = parse_diffs_fn(tables[1])
-
-    return index.Index(components, diffs)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}'")
+
+    if history:
+        parse_diffs_fn = functools.partial(parse_diffs, history=history)
+
+    with spans.span("parse", engine="bs4", backend=backend):
+        parse_only = None if backend == "html5lib" else _TABLES_ONLY
+        with spans.span("html"):
+            soup = bs4.BeautifulSoup(stream, backend, parse_only=parse_only)
+
+        with spans.span("tables"):
+            tables = soup.find_all("table")
+
+            if not tables:
+                raise ParseError("Components table not found")
+            if len(tables) == 1:
+                raise ParseError("Diffs table not found")
+            if len(tables) != 2:
+                components = parse_components_fn(tables[1])
+                diffs = parse_diffs_fn(tables[2])
+            else:
+                components = parse_components_fn(tables[0])
+                diffs = parse_diffs_fn(tables[1])
+
+        # Drop the tree before the span ends, it is not part of the result.
+        del soup, tables
+
+        return index.compact(index.Index(components, diffs))
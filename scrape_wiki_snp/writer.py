@@ -0,0 +1,247 @@
+"""Streaming yaml writer for indices."""
+
+from __future__ import annotations
+
+import typing
+
+import yaml
+
+from . import index
+from .dumper import CDumper, DumperMixin, symbol_anchor
+
+_SEQ_TAG = "tag:yaml.org,2002:seq"
+
+
+def _anchors(idx: index.Index) -> typing.Dict[int, str]:
+    # Same traversal as `yaml.serializer.Serializer.anchor_node`: an object is
+    # anchored when it is seen the second time, children are visited once.
+    seen: typing.Set[int] = set()
+    anchors: typing.Dict[int, str] = {}
+    taken: typing.Set[str] = set()
+    last_id = 0
+
+    def visit(obj: typing.Union[index.Component, index.Diff]) -> bool:
+        nonlocal last_id
+
+        key = id(obj)
+        if key not in seen:
+            seen.add(key)
+            return True
+
+        if key not in anchors:
+            if isinstance(obj, index.Component):
+                anchor = symbol_anchor(obj.symbol, taken)
+            else:
+                anchor = ""
+                while not anchor or anchor in taken:
+                    last_id += 1
+                    anchor = f"id{last_id:03d}"
+            anchors[key] = anchor
+            taken.add(anchor)
+
+        return False
+
+    for component in idx.components:
+        visit(component)
+
+    for diff in idx.diffs:
+        if visit(diff):
+            for diff_component in (diff.added, diff.removed):
+                if diff_component is not None:
+                    visit(diff_component)
+
+    return anchors
+
+
+class IndexWriter:
+    """
+    Writer of indices as yaml, one document per index.
+
+    The output is the same as ``yaml.dump_all(indices, stream, dumper)`` with
+    default arguments (or `sort_keys` set), anchors and aliases included,
+    but no node graph is built: events are emitted component by component
+    and diff by diff. Before a document is written, the index is walked once
+    to find the components referenced more than once.
+
+    :param stream: Text stream to write to.
+    :param dumper: Dumper class the output should match.
+    :param sort_keys: Sort mapping keys, like `yaml.dump` does by default.
+    """
+
+    def __init__(
+        self,
+        stream: typing.IO[str],
+        dumper: typing.Type[DumperMixin] = CDumper,
+        sort_keys: bool = True,
+    ) -> None:
+        """
+        Init writer, start yaml stream.
+
+        :param stream: Text stream to write to.
+        :param dumper: Dumper class the output should match.
+        :param sort_keys: Sort mapping keys, like `yaml.dump` does by default.
+        """
+        self._dumper = dumper(stream, sort_keys=sort_keys)
+        self._sort_keys = sort_keys
+        self._anchors: typing.Dict[int, str] = {}
+        self._emitted: typing.Set[int] = set()
+
+        self._dumper.open()
+
+    def write(self, idx: index.Index) -> None:
+        """
+        Write index document.
+
+        :param idx: Index to write.
+        """
+        self._anchors = _anchors(idx)
+        self._emitted = set()
+
+        emit = self._dumper.emit
+        emit(yaml.DocumentStartEvent(explicit=False))
+
+        emit(yaml.MappingStartEvent(None, index.Index.tag, False, flow_style=False))
+
+        self._scalar("components")
+        emit(yaml.SequenceStartEvent(None, _SEQ_TAG, True, flow_style=False))
+        for component in idx.components:
+            self._component(component)
+        emit(yaml.SequenceEndEvent())
+
+        self._scalar("diffs")
+        emit(yaml.SequenceStartEvent(None, _SEQ_TAG, True, flow_style=False))
+        for diff in idx.diffs:
+            self._diff(diff)
+        emit(yaml.SequenceEndEvent())
+
+        emit(yaml.MappingEndEvent())
+        emit(yaml.DocumentEndEvent(explicit=False))
+
+        self._anchors = {}
+        self._emitted = set()
+
+    def close(self) -> None:
+        """End yaml stream."""
+        self._dumper.close()
+        self._dumper.dispose()
+
+    def __enter__(self) -> IndexWriter:
+        """
+        Enter context.
+
+        :return: self.
+        """
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        """
+        Exit context, end yaml stream.
+
+        :param args: Exception info, if any.
+        """
+        self.close()
+
+    def _alias(self, obj: typing.Union[index.Component, index.Diff]) -> bool:
+        # Emit alias if the object is written already, return True if so.
+        key = id(obj)
+        if key not in self._anchors:
+            return False
+        if key in self._emitted:
+            self._dumper.emit(yaml.AliasEvent(self._anchors[key]))
+            return True
+        self._emitted.add(key)
+        return False
+
+    def _scalar(self, value: typing.Any) -> None:
+        node = typing.cast(yaml.ScalarNode, self._dumper.represent_data(value))
+        resolve = self._dumper.resolve
+        detected = resolve(yaml.ScalarNode, node.value, (True, False))  # type: ignore
+        default = resolve(yaml.ScalarNode, node.value, (False, True))  # type: ignore
+        self._dumper.emit(
+            yaml.ScalarEvent(
+                None,
+                node.tag,
+                (node.tag == detected, node.tag == default),
+                node.value,
+                style=node.style,
+            )
+        )
+
+    def _mapping(
+        self,
+        tag: str,
+        anchor: typing.Optional[str],
+        items: typing.List[typing.Tuple[str, typing.Any]],
+    ) -> None:
+        if self._sort_keys:
+            items.sort(key=lambda item: item[0])
+
+        self._dumper.emit(yaml.MappingStartEvent(anchor, tag, False, flow_style=False))
+        for key, value in items:
+            self._scalar(key)
+            if isinstance(value, index.Component):
+                self._component(value)
+            else:
+                self._scalar(value)
+        self._dumper.emit(yaml.MappingEndEvent())
+
+    def _component(self, component: typing.Optional[index.Component]) -> None:
+        if component is None:
+            self._scalar(None)
+            return
+        if self._alias(component):
+            return
+
+        self._mapping(
+            index.Component.tag,
+            self._anchors.get(id(component)),
+            [("symbol", component.symbol), ("name", component.name)],
+        )
+
+    def _diff(self, diff: index.Diff) -> None:
+        if self._alias(diff):
+            return
+
+        self._mapping(
+            index.Diff.tag,
+            self._anchors.get(id(diff)),
+            [
+                ("date", diff.date),
+                ("added", diff.added),
+                ("removed", diff.removed),
+                ("reason", diff.reason),
+            ],
+        )
+
+
+def dump(
+    idx: index.Index,
+    stream: typing.IO[str],
+    dumper: typing.Type[DumperMixin] = CDumper,
+) -> None:
+    """
+    Write index as yaml, the way ``yaml.dump(idx, stream, dumper)`` does.
+
+    :param idx: Index to write.
+    :param stream: Text stream to write to.
+    :param dumper: Dumper class the output should match.
+    """
+    with IndexWriter(stream, dumper) as writer:
+        writer.write(idx)
+
+
+def dump_all(
+    indices: typing.Iterable[index.Index],
+    stream: typing.IO[str],
+    dumper: typing.Type[DumperMixin] = CDumper,
+) -> None:
+    """
+    Write indices as yaml, the way ``yaml.dump_all(indices, stream, dumper)`` does.
+
+    :param indices: Indices to write.
+    :param stream: Text stream to write to.
+    :param dumper: Dumper class the output should match.
+    """
+    with IndexWriter(stream, dumper) as writer:
+        for idx in indices:
+            writer.write(idx)
@@ -0,0 +1,193 @@
+"""Local stand-in http server for download tests."""
+
+from __future__ import annotations
+
+import contextlib
+import http.server
+import os
+import threading
+import time
+import typing
+from unittest import mock
+
+from scrape_wiki_snp import download, index_cache
+
+_RATE_CHUNK = 16 * 1024
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Request handler serving `StandInServer.pages`."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_HTTPServer"
+
+    def handle(self) -> None:
+        """Handle requests, until the client disconnects."""
+        try:
+            super().handle()
+        except ConnectionError:
+            pass
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve GET request."""
+        self._serve(body=True)
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        """Serve HEAD request."""
+        self._serve(body=False)
+
+    def _serve(self, body: bool) -> None:
+        owner = self.server.owner
+
+        with owner.lock:
+            owner.requests.append(self.path)
+            owner.clients.add(self.client_address)
+            owner.running += 1
+            owner.max_running = max(owner.max_running, owner.running)
+            failures = owner.failures.get(self.path, 0)
+            if failures:
+                owner.failures[self.path] = failures - 1
+
+        try:
+            time.sleep(owner.latency)
+
+            if failures:
+                self._reply(503, b"Service Unavailable", body)
+                return
+
+            page = owner.pages.get(self.path)
+            if page is None:
+                self._reply(404, b"Not Found", body)
+                return
+
+            etag = owner.headers.get(self.path, {}).get("ETag")
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                self._reply(304, b"", False)
+                return
+
+            self._reply(200, page, body)
+        finally:
+            with owner.lock:
+                owner.running -= 1
+
+    def _reply(self, status: int, content: bytes, body: bool) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in self.server.owner.headers.get(self.path, {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not body:
+            return
+
+        rate = self.server.owner.rate
+        if rate is None:
+            self.wfile.write(content)
+            return
+        for offset in range(0, len(content), _RATE_CHUNK):
+            self.wfile.write(content[offset : offset + _RATE_CHUNK])
+            time.sleep(_RATE_CHUNK / rate)
+
+    def log_message(self, *args: typing.Any) -> None:
+        """Keep test output clean."""
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "StandInServer"
+
+
+# pylint: disable=too-many-instance-attributes
+class StandInServer:
+    """
+    Local http server with injectable latency and failures.
+
+    :param pages: Page content by path.
+    :param latency: Seconds to wait before every reply.
+    :param rate: Max bytes per second sent per reply, unlimited if not set.
+    """
+
+    def __init__(
+        self,
+        pages: typing.Dict[str, bytes],
+        latency: float = 0.0,
+        rate: typing.Optional[float] = None,
+    ) -> None:
+        """
+        Init and start the server.
+
+        :param pages: Page content by path.
+        :param latency: Seconds to wait before every reply.
+        :param rate: Max bytes per second sent per reply, unlimited if not set.
+        """
+        self.pages = pages
+        self.latency = latency
+        self.rate = rate
+        self.failures: typing.Dict[str, int] = {}
+        self.headers: typing.Dict[str, typing.Dict[str, str]] = {}
+
+        self.lock = threading.Lock()
+        self.requests: typing.List[str] = []
+        self.clients: typing.Set[typing.Tuple[str, int]] = set()
+        self.running = 0
+        self.max_running = 0
+
+        self._server = _HTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        """
+        Get full url of a path.
+
+        :param path: Path on the server.
+        :return: Url.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}{path}"
+
+    def close(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        """
+        Enter context.
+
+        :return: self.
+        """
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        """
+        Exit context, stop the server.
+
+        :param args: Exception info, if any.
+        """
+        self.close()
+
+
+@contextlib.contextmanager
+def isolated_defaults(directory: str) -> typing.Iterator[None]:
+    """
+    Keep command line tests off the user cache directories: download without
+    the http cache, and keep the index cache under a directory.
+
+    :param directory: Directory to keep the index cache in.
+    """
+    downloader = download.Downloader(cache=False, retries=0)
+    defaults = {True: downloader, False: downloader}
+    with mock.patch.dict(
+        "scrape_wiki_snp.download._DEFAULTS", defaults
+    ), mock.patch.object(
+        index_cache,
+        "default_directory",
+        lambda: os.path.join(directory, "indices"),
+    ):
+        yield
@@ -0,0 +1,194 @@
+"""Asyncio download and parse unit test."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import time
+import unittest
+
+import aiohttp
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import aio, index, spans, stream_parse
+
+from .server import StandInServer
+from .test_stream_parse import _COMPONENTS, _COMPONENTS_TABLE, _DIFFS, _DIFFS_TABLE
+
+_PAGE = f"<html><body>{_COMPONENTS_TABLE}{_DIFFS_TABLE}</body></html>"
+
+
+class AsyncDownloaderTest(unittest.IsolatedAsyncioTestCase):
+    "AsyncDownloader class test."
+
+    def setUp(self) -> None:
+        "Start stand-in server."
+        self.server = StandInServer({"/page": "Ünïcode page".encode("utf-8")})
+        self.addCleanup(self.server.close)
+
+    async def _downloader(self, **kwargs: object) -> aio.AsyncDownloader:
+        downloader = aio.AsyncDownloader(**kwargs)  # type: ignore[arg-type]
+        self.addAsyncCleanup(downloader.close)
+        return downloader
+
+    @parameterized.expand([(True,), (False,)])  # type: ignore
+    async def test_download(self, use_aiohttp: bool) -> None:
+        """
+        Test page is downloaded and decoded.
+
+        :param use_aiohttp: Send requests with aiohttp.
+        """
+        downloader = await self._downloader(use_aiohttp=use_aiohttp, cache=False)
+
+        self.assertEqual(
+            await downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+
+    @parameterized.expand([(True,), (False,)])  # type: ignore
+    async def test_concurrency(self, use_aiohttp: bool) -> None:
+        """
+        Test requests overlap, up to the concurrency.
+
+        :param use_aiohttp: Send requests with aiohttp.
+        """
+        self.server.latency = 0.2
+        downloader = await self._downloader(
+            concurrency=3, use_aiohttp=use_aiohttp, cache=False
+        )
+
+        start = time.perf_counter()
+        pages = await asyncio.gather(
+            *(downloader.download(self.server.url("/page")) for _ in range(6))
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(pages, ["Ünïcode page"] * 6)
+        self.assertEqual(self.server.max_running, 3)
+        self.assertLess(elapsed, 6 * 0.2 / 2)
+
+    async def test_retry_failures(self) -> None:
+        "Test failed replies are retried."
+        self.server.failures["/page"] = 2
+        downloader = await self._downloader(backoff=0.01, cache=False)
+
+        self.assertEqual(
+            await downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+        self.assertEqual(len(self.server.requests), 3)
+
+    async def test_fresh(self) -> None:
+        "Test fresh replies are served from the cache."
+        self.server.headers["/page"] = {"Cache-Control": "max-age=60"}
+        downloader = await self._downloader()
+
+        for _ in range(3):
+            self.assertEqual(
+                await downloader.download(self.server.url("/page")), "Ünïcode page"
+            )
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_revalidate(self) -> None:
+        "Test stale replies are revalidated."
+        self.server.headers["/page"] = {"Cache-Control": "max-age=0", "ETag": '"1"'}
+        downloader = await self._downloader()
+
+        with spans.Recorder() as recorder:
+            for _ in range(2):
+                self.assertEqual(
+                    await downloader.download(self.server.url("/page")),
+                    "Ünïcode page",
+                )
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            [ended.attributes["status"] for ended in recorder.spans], [200, 304]
+        )
+        self.assertEqual(
+            [ended.attributes["from_cache"] for ended in recorder.spans],
+            [False, True],
+        )
+
+    async def test_stale_if_error(self) -> None:
+        "Test stale replies are served when the request fails."
+        self.server.headers["/page"] = {"Cache-Control": "no-cache"}
+        downloader = await self._downloader(retries=0)
+
+        await downloader.download(self.server.url("/page"))
+        self.server.failures["/page"] = 1
+
+        self.assertEqual(
+            await downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await downloader.download(self.server.url("/missing"))
+
+    async def test_no_store(self) -> None:
+        "Test replies are not cached if told so."
+        self.server.headers["/page"] = {"Cache-Control": "no-store, max-age=60"}
+        downloader = await self._downloader()
+
+        for _ in range(2):
+            await downloader.download(self.server.url("/page"))
+
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_cache_entries(self) -> None:
+        "Test least recently used replies are dropped from a full cache."
+        for path in ("/a", "/b", "/c"):
+            self.server.pages[path] = path.encode("utf-8")
+            self.server.headers[path] = {"Cache-Control": "max-age=60"}
+        downloader = await self._downloader(cache_entries=2)
+
+        for path in ("/a", "/b", "/a", "/c", "/a", "/b"):
+            self.assertEqual(await downloader.download(self.server.url(path)), path)
+
+        self.assertEqual(self.server.requests, ["/a", "/b", "/c", "/b"])
+
+
+class ScrapeTest(unittest.IsolatedAsyncioTestCase):
+    "Async scrape test."
+
+    async def test_scrape_all(self) -> None:
+        "Test many scrapes overlap instead of running one after another."
+        latency = 0.2
+        paths = [f"/page{number}" for number in range(8)]
+        server = StandInServer(
+            {path: _PAGE.encode("utf-8") for path in paths}, latency=latency
+        )
+        self.addCleanup(server.close)
+
+        async with aio.AsyncDownloader(concurrency=8, cache=False) as downloader:
+            with concurrent.futures.ThreadPoolExecutor(4) as executor:
+                start = time.perf_counter()
+                indices = await aio.scrape_all(
+                    [server.url(path) for path in paths],
+                    downloader,
+                    stream_parse.parse,
+                    executor,
+                )
+                elapsed = time.perf_counter() - start
+
+        self.assertEqual(indices, [index.Index(_COMPONENTS, _DIFFS)] * len(paths))
+        self.assertEqual(server.max_running, len(paths))
+        self.assertLess(elapsed, len(paths) * latency / 2)
+
+    async def test_parse(self) -> None:
+        "Test parse does not block the event loop."
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            idx = await aio.parse(_PAGE * 50, stream_parse.parse)
+        finally:
+            ticker.cancel()
+
+        self.assertEqual(idx, index.Index(_COMPONENTS, _DIFFS))
+        self.assertGreater(ticks, 1)
@@ -0,0 +1,114 @@
+"""Batch mode unit test."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from scrape_wiki_snp import batch, index, main, stream_parse
+
+from .server import StandInServer, isolated_defaults
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+_PAGES = {
+    "https://example.org/wiki/One": _COMPONENTS_TABLE + _DIFFS_TABLE,
+    "https://example.org/wiki/Two": _DIFFS_TABLE + _COMPONENTS_TABLE,
+    "https://example.org/wiki/Three": "<p>Noise</p>" + _COMPONENTS_TABLE + _DIFFS_TABLE,
+}
+
+
+class BatchTest(unittest.TestCase):
+    "Batch mode unit test."
+
+    def test_read_manifest(self) -> None:
+        "Test manifest comments and blank lines are skipped."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "manifest.txt")
+            with open(path, "w", encoding="utf-8") as manifest:
+                manifest.write("# S&P indices\n\n  https://a/1  \nhttps://a/2\n")
+
+            self.assertEqual(batch.read_manifest(path), ["https://a/1", "https://a/2"])
+
+    def test_output_name(self) -> None:
+        "Test output file names are derived from page titles."
+        self.assertEqual(
+            batch.output_name(
+                "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+            ),
+            "List_of_S&P_500_companies",
+        )
+        self.assertEqual(batch.output_name("https://example.org/"), "index")
+
+    def test_output_names(self) -> None:
+        "Test output file names taken get a numeric suffix."
+        self.assertEqual(
+            batch.output_names(
+                [
+                    "https://a.org/wiki/One",
+                    "https://b.org/wiki/One",
+                    "https://a.org/wiki/one",
+                    "https://a.org/wiki/One_2",
+                    "https://a.org/wiki/Two",
+                ]
+            ),
+            ["One", "One_2", "one_3", "One_2_2", "Two"],
+        )
+
+    def test_run(self) -> None:
+        "Test downloads overlap and indices keep the order of urls."
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def _download(url: str) -> str:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return _PAGES[url]
+
+        expected = stream_parse.parse(_COMPONENTS_TABLE + _DIFFS_TABLE)
+
+        result = batch.run(
+            list(_PAGES),
+            stream_parse.parse,
+            download_jobs=3,
+            parse_jobs=2,
+            download_fn=_download,
+        )
+
+        self.assertEqual(result.indices, [expected] * 3)
+        self.assertIsInstance(result.indices[0], index.Index)
+        self.assertEqual(max_running, 3)
+        self.assertEqual(set(result.timings), {"download", "parse"})
+
+    def test_cli_out_dir(self) -> None:
+        "Test pages with one title are written to distinct files."
+        page = (_COMPONENTS_TABLE + _DIFFS_TABLE).encode("utf-8")
+        with StandInServer(
+            {"/a/wiki/One": page, "/b/wiki/One": page}
+        ) as server, tempfile.TemporaryDirectory() as tmp_dir:
+            out_dir = os.path.join(tmp_dir, "out")
+            with isolated_defaults(tmp_dir):
+                code = main.cli_main(
+                    [
+                        "batch",
+                        server.url("/a/wiki/One"),
+                        server.url("/b/wiki/One"),
+                        "--out-dir",
+                        out_dir,
+                        "--engine",
+                        "stream",
+                        "--parse-jobs",
+                        "1",
+                    ]
+                )
+
+            self.assertEqual(code, 0)
+            self.assertEqual(sorted(os.listdir(out_dir)), ["One.yaml", "One_2.yaml"])
@@ -0,0 +1,156 @@
+"""Cross-index interval table unit test."""
+
+from __future__ import annotations
+
+import contextlib
+import csv
+import datetime
+import io
+import os
+import random
+import tempfile
+import typing
+import unittest
+
+import yaml
+
+from scrape_wiki_snp import consolidate, index, main
+from scrape_wiki_snp.consolidate import IndexInterval
+from scrape_wiki_snp.dumper import Dumper
+
+from .test_membership import _diff
+
+# XYZ moves from the 600 to the 400, then to the 500.
+_INDICES = {
+    "400": index.Index(
+        [index.Component("BBB", "bbb")],
+        [
+            _diff("March 1, 2021", None, "XYZ"),
+            _diff("June 1, 2020", "XYZ", "CCC"),
+        ],
+    ),
+    "500": index.Index(
+        [index.Component("AAA", "aaa"), index.Component("XYZ", "xyz")],
+        [_diff("March 1, 2021", "XYZ", "DDD")],
+    ),
+    "600": index.Index(
+        [index.Component("CCC", "ccc")],
+        [_diff("June 1, 2020", "CCC", "XYZ")],
+    ),
+}
+
+
+def _random_rows(rng: random.Random, count: int) -> typing.List[IndexInterval]:
+    rows = []
+    for _ in range(count):
+        start = rng.choice([None, datetime.date(2000, 1, 1).toordinal()])
+        if start is not None:
+            start += rng.randint(0, 3650)
+        end = rng.choice([None, (start or 730120) + rng.randint(0, 1000)])
+        rows.append(
+            IndexInterval(
+                f"S{rng.randint(0, count // 4)}",
+                rng.choice(["400", "500", "600"]),
+                None if start is None else datetime.date.fromordinal(start),
+                None if end is None else datetime.date.fromordinal(end),
+            )
+        )
+    return rows
+
+
+class ConsolidateTest(unittest.TestCase):
+    "Cross-index interval table unit test."
+
+    def test_consolidate(self) -> None:
+        "Test intervals of a symbol moving between indices."
+        table = consolidate.consolidate(_INDICES)
+
+        self.assertEqual(
+            table.history("XYZ"),
+            [
+                IndexInterval("XYZ", "600", None, datetime.date(2020, 6, 1)),
+                IndexInterval(
+                    "XYZ", "400", datetime.date(2020, 6, 1), datetime.date(2021, 3, 1)
+                ),
+                IndexInterval("XYZ", "500", datetime.date(2021, 3, 1), None),
+            ],
+        )
+        self.assertEqual(table.history("ZZZ"), [])
+
+        for date, expected in [
+            ("2020-05-31", ["600"]),
+            ("2020-06-01", ["400"]),
+            ("2021-02-28", ["400"]),
+            ("2021-03-01", ["500"]),
+        ]:
+            with self.subTest(date):
+                self.assertEqual(
+                    table.indices_of("XYZ", datetime.date.fromisoformat(date)),
+                    expected,
+                )
+
+        self.assertEqual(
+            [
+                (row.symbol, row.index_name)
+                for row in table.members(datetime.date(2020, 6, 1))
+            ],
+            [
+                ("AAA", "500"),
+                ("BBB", "400"),
+                ("CCC", "600"),
+                ("DDD", "500"),
+                ("XYZ", "400"),
+            ],
+        )
+
+    def test_queries_match_scan(self) -> None:
+        "Test queries against a scan of all the intervals."
+        rng = random.Random(3)
+        rows = _random_rows(rng, 400)
+        table = consolidate.IntervalTable(rows)
+
+        self.assertEqual(len(table), len(rows))
+
+        for _ in range(200):
+            date = datetime.date(1999, 1, 1) + datetime.timedelta(rng.randint(0, 6000))
+            expected = [row for row in table.rows if date in row]
+            self.assertEqual(table.members(date), expected, date)
+
+            symbol = f"S{rng.randint(0, 100)}"
+            self.assertEqual(
+                table.indices_of(symbol, date),
+                [row.index_name for row in expected if row.symbol == symbol],
+            )
+
+    def test_empty(self) -> None:
+        "Test empty table and intervals."
+        day = datetime.date(2020, 1, 1)
+
+        self.assertEqual(consolidate.IntervalTable([]).members(day), [])
+        self.assertEqual(
+            consolidate.IntervalTable([IndexInterval("A", "500", day, day)]).members(
+                day
+            ),
+            [],
+        )
+
+    def test_cli(self) -> None:
+        "Test consolidate command line on yaml files."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for name, idx in _INDICES.items():
+                path = os.path.join(tmp_dir, f"sp{name}.yaml")
+                with open(path, "w", encoding="utf-8") as yaml_file:
+                    yaml.dump(idx, yaml_file, Dumper)
+                paths.append(path)
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                main.cli_main(["consolidate", *paths, "--date", "2020-06-01"])
+                main.cli_main(["consolidate", *paths, "--symbol", "XYZ"])
+
+        lines = list(csv.reader(io.StringIO(stdout.getvalue())))
+        self.assertEqual(lines[0], list(consolidate.COLUMNS))
+        self.assertEqual(lines[5], ["XYZ", "sp400", "2020-06-01", "2021-03-01"])
+        self.assertEqual(lines[6], list(consolidate.COLUMNS))
+        self.assertEqual([line[1] for line in lines[7:]], ["sp600", "sp400", "sp500"])
@@ -0,0 +1,162 @@
+"""Index delta unit test."""
+
+from __future__ import annotations
+
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from scrape_wiki_snp import delta, index, main, snapshot
+from scrape_wiki_snp.dumper import Dumper
+
+
+class _Colliding(str):
+    "String of the same hash as any other."
+
+    def __hash__(self) -> int:
+        return 0
+
+
+_ABC = index.Component("ABC", "A b c.")
+_XYZ = index.Component("XYZ", "X y z.")
+_NEW = index.Component("NEW", "N e w.")
+
+_OLD = index.Index(
+    [_ABC, _XYZ],
+    [
+        index.Diff(datetime.date(2022, 6, 8), _ABC, None, "Market cap change."),
+        index.Diff(datetime.date(2022, 6, 9), None, _NEW, "NEW was acquired."),
+        index.Diff("Unknown", _XYZ, None, "Spin-off."),
+    ],
+)
+
+_NEW_INDEX = index.Index(
+    [index.Component("ABC", "A b c. Inc."), _NEW],
+    [
+        index.Diff(datetime.date(2022, 6, 8), _ABC, None, "Market cap change."),
+        index.Diff(datetime.date(2022, 6, 9), None, _NEW, "NEW was bought."),
+        index.Diff(datetime.date(2022, 6, 10), _NEW, _XYZ, "Replaced."),
+    ],
+)
+
+
+class DeltaTest(unittest.TestCase):
+    "Index delta unit test."
+
+    def test_delta(self) -> None:
+        "Test changes of each kind are found."
+        got = delta.delta(_OLD, _NEW_INDEX)
+
+        self.assertEqual(got.components_added, [_NEW])
+        self.assertEqual(got.components_removed, [_XYZ])
+        self.assertEqual(
+            got.components_renamed, [(_ABC, index.Component("ABC", "A b c. Inc."))]
+        )
+        self.assertEqual(got.diffs_added, [_NEW_INDEX.diffs[2]])
+        self.assertEqual(got.diffs_removed, [_OLD.diffs[2]])
+        self.assertEqual(got.diffs_edited, [(_OLD.diffs[1], _NEW_INDEX.diffs[1])])
+        self.assertTrue(got)
+
+    def test_same(self) -> None:
+        "Test equal versions have no changes, whatever the order."
+        reordered = index.Index(_OLD.components[::-1], _OLD.diffs[::-1])
+
+        self.assertFalse(delta.delta(_OLD, _OLD))
+        self.assertFalse(delta.delta(_OLD, reordered))
+        self.assertEqual(delta.delta(_OLD, reordered).events(), [])
+
+    def test_duplicates(self) -> None:
+        "Test duplicates count."
+        twice = index.Index([_ABC, _ABC], [])
+        once = index.Index([_ABC], [])
+
+        self.assertEqual(delta.delta(twice, once).components_removed, [_ABC])
+        self.assertEqual(delta.delta(once, twice).components_added, [_ABC])
+
+    def test_equal_hashes(self) -> None:
+        "Test rows of equal hash are told apart by value."
+        abc = index.Component(_Colliding("ABC"), _Colliding("A b c."))
+        xyz = index.Component(_Colliding("XYZ"), _Colliding("X y z."))
+        date = datetime.date(2022, 6, 8)
+        old = index.Index([abc], [index.Diff(date, abc, None, _Colliding("Old."))])
+        new = index.Index([xyz], [index.Diff(date, abc, None, _Colliding("New."))])
+        self.assertEqual(hash(abc.symbol), hash(xyz.symbol))
+
+        got = delta.delta(old, new)
+
+        self.assertEqual(got.components_added, [xyz])
+        self.assertEqual(got.components_removed, [abc])
+        self.assertEqual(got.diffs_edited, [(old.diffs[0], new.diffs[0])])
+
+    def test_events(self) -> None:
+        "Test events are JSON serializable, dates in ISO format."
+        events = delta.delta(_OLD, _NEW_INDEX).events()
+
+        self.assertEqual(
+            [event["event"] for event in events],
+            [
+                "component_added",
+                "component_removed",
+                "component_renamed",
+                "diff_added",
+                "diff_removed",
+                "diff_edited",
+            ],
+        )
+        self.assertEqual(
+            events[2],
+            {
+                "event": "component_renamed",
+                "old": {"symbol": "ABC", "name": "A b c."},
+                "new": {"symbol": "ABC", "name": "A b c. Inc."},
+            },
+        )
+        self.assertEqual(events[3]["diff"]["date"], "2022-06-10")
+        self.assertEqual(events[4]["diff"]["date"], "Unknown")
+        self.assertEqual(json.loads(json.dumps(events)), events)
+
+    def test_deltas(self) -> None:
+        "Test consecutive versions are compared."
+        got = list(delta.deltas([_OLD, _NEW_INDEX, _OLD]))
+
+        self.assertEqual(len(got), 2)
+        self.assertEqual(got[0], delta.delta(_OLD, _NEW_INDEX))
+        self.assertEqual(got[1], delta.delta(_NEW_INDEX, _OLD))
+        self.assertEqual(list(delta.deltas([_OLD])), [])
+
+    def test_cli(self) -> None:
+        "Test delta command line on a yaml file and a snapshot."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_path = os.path.join(tmp_dir, "old.yaml")
+            new_path = os.path.join(tmp_dir, "new.snap")
+            out_path = os.path.join(tmp_dir, "delta.jsonl")
+            with open(old_path, "w", encoding="utf-8") as old_file:
+                yaml.dump(_OLD, old_file, Dumper)
+            with open(new_path, "wb") as new_file:
+                snapshot.write(_NEW_INDEX, new_file)
+
+            main.cli_main(["delta", old_path, new_path, "--out", out_path])
+            with open(out_path, "r", encoding="utf-8") as out_file:
+                events = [json.loads(line) for line in out_file]
+
+            main.cli_main(
+                ["delta", old_path, new_path, old_path, "--summary", "--out", out_path]
+            )
+            with io.open(out_path, "r", encoding="utf-8") as out_file:
+                summary = out_file.read().splitlines()
+
+        self.assertEqual(
+            [
+                {"from": old_path, "to": new_path, **event}
+                for event in delta.delta(_OLD, _NEW_INDEX).events()
+            ],
+            events,
+        )
+        self.assertEqual(len(summary), 2)
+        self.assertTrue(summary[0].startswith(f"{old_path} -> {new_path}: "))
+        self.assertIn("component_renamed 1", summary[0])
@@ -0,0 +1,222 @@
+"""Downloader unit test."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import datetime
+import socket
+import time
+import typing
+import unittest
+from unittest import mock
+
+import requests
+import requests_cache
+
+from scrape_wiki_snp import download, spans
+from scrape_wiki_snp.download import Downloader, fresh_for, iter_text
+
+from .server import StandInServer
+
+
+def _closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+class DownloaderTest(unittest.TestCase):
+    "Downloader class test."
+
+    def setUp(self) -> None:
+        "Start stand-in server."
+        self.server = StandInServer({"/page": "Ünïcode page".encode("utf-8")})
+        self.addCleanup(self.server.close)
+
+        self.sleeps: typing.List[float] = []
+        self.downloader = Downloader(
+            retries=3, backoff=0.1, cache=False, sleep=self.sleeps.append
+        )
+        self.addCleanup(self.downloader.close)
+
+    def test_download(self) -> None:
+        "Test page is downloaded and decoded."
+        self.assertEqual(
+            self.downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+
+    def test_keep_alive(self) -> None:
+        "Test connection is reused between requests."
+        for _ in range(5):
+            self.downloader.download(self.server.url("/page"))
+
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(len(self.server.clients), 1)
+
+    def test_retry_failures(self) -> None:
+        "Test failed replies are retried with a growing delay."
+        self.server.failures["/page"] = 2
+
+        self.assertEqual(
+            self.downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertLessEqual(self.sleeps[0], 0.1)
+        self.assertLessEqual(self.sleeps[1], 0.2)
+
+    def test_retries_exhausted(self) -> None:
+        "Test last failure is raised once retries are exhausted."
+        self.server.failures["/page"] = 10
+
+        with self.assertRaises(requests.HTTPError):
+            self.downloader.download(self.server.url("/page"))
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_no_retry_on_client_error(self) -> None:
+        "Test client errors are not retried."
+        with self.assertRaises(requests.HTTPError):
+            self.downloader.download(self.server.url("/missing"))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_retry_connection_error(self) -> None:
+        "Test connection errors are retried."
+        with self.assertRaises(requests.ConnectionError):
+            self.downloader.download(_closed_port_url())
+        self.assertEqual(len(self.sleeps), 3)
+
+    def test_per_host_limit(self) -> None:
+        "Test concurrent requests to one host are limited."
+        self.server.latency = 0.05
+        downloader = Downloader(per_host=2, cache=False)
+        self.addCleanup(downloader.close)
+
+        with concurrent.futures.ThreadPoolExecutor(6) as executor:
+            pages = list(
+                executor.map(downloader.download, [self.server.url("/page")] * 6)
+            )
+
+        self.assertEqual(pages, ["Ünïcode page"] * 6)
+        self.assertEqual(self.server.max_running, 2)
+
+    def test_http_cache(self) -> None:
+        "Test downloader goes through an installed http cache."
+        with requests_cache.enabled(backend="memory"):
+            downloader = Downloader()
+            self.addCleanup(downloader.close)
+
+            for _ in range(3):
+                self.assertEqual(
+                    downloader.download(self.server.url("/page")), "Ünïcode page"
+                )
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_stream_text(self) -> None:
+        "Test page is decoded chunk by chunk, multibyte characters split."
+        with self.downloader.stream_text(self.server.url("/page"), 1) as chunks:
+            got = list(chunks)
+
+        self.assertEqual("".join(got), "Ünïcode page")
+        self.assertEqual(len(got), len("Ünïcode page"))
+
+    def test_stream_text_stop(self) -> None:
+        "Test page can be read partially."
+        with self.downloader.stream_text(self.server.url("/page"), 4) as chunks:
+            self.assertEqual(next(chunks), "Ün")
+
+        self.assertEqual(
+            self.downloader.download(self.server.url("/page")), "Ünïcode page"
+        )
+
+    def test_stream_text_cache(self) -> None:
+        "Test streaming goes through the http cache, stale replies on errors."
+        with requests_cache.enabled(
+            backend="memory",
+            expire_after=datetime.timedelta(milliseconds=100),
+            stale_if_error=True,
+        ), spans.Recorder() as recorder:
+            downloader = Downloader(retries=0)
+            self.addCleanup(downloader.close)
+
+            with downloader.stream_text(self.server.url("/page"), 3) as chunks:
+                self.assertEqual("".join(chunks), "Ünïcode page")
+
+            time.sleep(0.2)
+            self.server.failures["/page"] = 1
+
+            with downloader.stream_text(self.server.url("/page"), 3) as chunks:
+                self.assertEqual("".join(chunks), "Ünïcode page")
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            [ended.attributes["from_cache"] for ended in recorder.spans],
+            [False, True],
+        )
+
+    def test_stream_text_cache_partial(self) -> None:
+        "Test streaming through the http cache reads the page as it is consumed."
+        content = b"x" * (16 * download.CHUNK_SIZE)
+        self.server.pages["/large"] = content
+        url = self.server.url("/large")
+
+        with requests_cache.enabled(backend="memory"), spans.Recorder() as recorder:
+            downloader = Downloader()
+            self.addCleanup(downloader.close)
+
+            with downloader.stream_text(url) as chunks:
+                next(chunks)
+            for _ in range(2):
+                with downloader.stream_text(url) as chunks:
+                    self.assertEqual(len("".join(chunks)), len(content))
+
+        self.assertLess(recorder.spans[0].attributes["bytes"], len(content))
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            [ended.attributes["from_cache"] for ended in recorder.spans],
+            [False, False, True],
+        )
+
+    def test_stream_text_default(self) -> None:
+        "Test module level streaming reads the page as it is consumed."
+        content = b"x" * (16 * download.CHUNK_SIZE)
+        self.server.pages["/large"] = content
+
+        with mock.patch.dict("scrape_wiki_snp.download._DEFAULTS", clear=True):
+            with requests_cache.enabled(backend="memory"), spans.Recorder() as recorder:
+                with download.stream_text(self.server.url("/large")) as chunks:
+                    next(chunks)
+                download.default_downloader().close()
+
+        self.assertFalse(recorder.spans[0].attributes["from_cache"])
+        self.assertLess(recorder.spans[0].attributes["bytes"], len(content))
+
+    def test_fresh_for(self) -> None:
+        "Test reply lifetime read from the cache headers."
+        later = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            hours=1
+        )
+        expires = later.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+        self.assertEqual(fresh_for({"cache-control": "max-age=60"}), 60.0)
+        self.assertEqual(fresh_for({"Cache-Control": "no-cache, max-age=60"}), 0.0)
+        self.assertIsNone(fresh_for({"Cache-Control": "no-store, max-age=60"}))
+        self.assertAlmostEqual(
+            typing.cast(float, fresh_for({"Expires": expires})), 3600.0, delta=5.0
+        )
+        self.assertEqual(fresh_for({"Expires": "0"}), 0.0)
+        self.assertEqual(fresh_for({}), 0.0)
+
+    def test_iter_text(self) -> None:
+        "Test incremental decoding."
+        data = "Ünïcode €".encode("utf-8")
+        chunks = [data[offset : offset + 1] for offset in range(len(data))]
+
+        self.assertEqual("".join(iter_text(chunks, "utf-8")), "Ünïcode €")
+        self.assertEqual("".join(iter_text(chunks, None)), "Ünïcode €")
+        self.assertEqual(
+            "".join(iter_text([b"caf\xe9"], "ISO-8859-1")),
+            "café",
+        )
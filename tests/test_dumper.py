@@ -1,11 +1,13 @@
 """Index dumper unit test."""
 
+import datetime
 import unittest
 
 import yaml
 
 from scrape_wiki_snp import index
-from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.dumper import CDumper, Dumper
+from scrape_wiki_snp.loader import Loader
 
 
 class DumperTest(unittest.TestCase):
@@ -85,3 +87,58 @@ class DumperTest(unittest.TestCase):
             "    name: X y z.\n"
             "  reason: Just because.\n",
         )
+
+    def test_anchors(self) -> None:
+        """Test anchors are valid and unique for any symbols."""
+        first = index.Component("BRK.B", "Berkshire Hathaway")
+        second = index.Component("BRK.B", "Berkshire Hathaway Inc.")
+        third = index.Component("BRK_B", "Other")
+
+        idx = index.Index(
+            [first, second, third],
+            [
+                index.Diff("01-02-2020", first, second, "Rename."),
+                index.Diff("01-02-2020", third, None, "Just because."),
+            ],
+        )
+
+        result: str = yaml.dump(idx, None, Dumper)
+
+        for anchor in ("&BRK_B ", "&BRK_B_2 ", "&BRK_B_3 "):
+            self.assertEqual(result.count(anchor), 1)
+
+        got = yaml.load(result, Loader)
+        self.assertEqual(got, idx)
+        self.assertIs(got.diffs[0].added, got.components[0])
+        self.assertIs(got.diffs[0].removed, got.components[1])
+
+    def test_c_dumper(self) -> None:
+        """Test libyaml dumper writes the same yaml, anchors included."""
+        first = index.Component("BRK.B", "Berkshire Hathaway")
+        second = index.Component("BRK.B", "Berkshire Hathaway Inc.")
+
+        idx = index.Index(
+            [first, second],
+            [
+                index.Diff(datetime.date(2020, 1, 2), first, second, "Rename."),
+                index.Diff("Unknown", None, first, "Just because."),
+            ],
+        )
+
+        for kwargs in ({}, {"sort_keys": False}, {"encoding": "utf-8"}):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    yaml.dump_all([idx, idx], None, CDumper, **kwargs),
+                    yaml.dump_all([idx, idx], None, Dumper, **kwargs),
+                )
+
+    def test_shared_dates(self) -> None:
+        """Test dates shared by diffs are not anchored."""
+        date = datetime.date(2020, 1, 2)
+        idx = index.Index(
+            [], [index.Diff(date, None, None, "A."), index.Diff(date, None, None, "B.")]
+        )
+
+        result: str = yaml.dump(idx, None, Dumper)
+
+        self.assertEqual(result.count("date: 2020-01-02\n"), 2)
@@ -0,0 +1,154 @@
+"""Output formats unit test."""
+
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import formats, index, writer
+
+_ADDED = index.Component("ABC", "A b c.")
+_REMOVED = index.Component("XYZ", "X y z.")
+
+_INDEX = index.Index(
+    [_ADDED, index.Component("BRK.B", 'Berkshire, "Hathaway"')],
+    [
+        index.Diff(datetime.date(2020, 1, 2), _ADDED, _REMOVED, "Just because."),
+        index.Diff("Early 2000", None, _ADDED, "Why, not."),
+    ],
+)
+
+_RECORDS = [
+    {
+        "kind": "component",
+        "date": None,
+        "date_text": None,
+        "symbol": "ABC",
+        "name": "A b c.",
+        "removed_symbol": None,
+        "removed_name": None,
+        "reason": None,
+    },
+    {
+        "kind": "component",
+        "date": None,
+        "date_text": None,
+        "symbol": "BRK.B",
+        "name": 'Berkshire, "Hathaway"',
+        "removed_symbol": None,
+        "removed_name": None,
+        "reason": None,
+    },
+    {
+        "kind": "diff",
+        "date": "2020-01-02",
+        "date_text": None,
+        "symbol": "ABC",
+        "name": "A b c.",
+        "removed_symbol": "XYZ",
+        "removed_name": "X y z.",
+        "reason": "Just because.",
+    },
+    {
+        "kind": "diff",
+        "date": None,
+        "date_text": "Early 2000",
+        "symbol": None,
+        "name": None,
+        "removed_symbol": "ABC",
+        "removed_name": "A b c.",
+        "reason": "Why, not.",
+    },
+]
+
+
+class FormatsTest(unittest.TestCase):
+    "Output formats test."
+
+    def test_jsonl(self) -> None:
+        "Test JSON Lines output."
+        out = io.StringIO()
+        formats.write_jsonl(_INDEX, out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual(records, _RECORDS)
+
+    def test_csv(self) -> None:
+        "Test CSV output."
+        out = io.StringIO()
+        formats.write_csv(_INDEX, out)
+
+        records = list(csv.DictReader(io.StringIO(out.getvalue())))
+
+        expected = [
+            {key: "" if value is None else value for key, value in record.items()}
+            for record in _RECORDS
+        ]
+        self.assertEqual(records, expected)
+
+    def test_table(self) -> None:
+        "Test Arrow table types and values."
+        table = formats.table(_INDEX)
+
+        self.assertEqual(table.column_names, list(formats.COLUMNS))
+        self.assertEqual(table.schema.field("date").type, pa.date32())
+        for name in ("kind", "symbol", "name", "removed_symbol", "removed_name"):
+            with self.subTest(name):
+                self.assertTrue(pa.types.is_dictionary(table.schema.field(name).type))
+
+        rows = table.to_pylist()
+        for record in rows:
+            if record["date"] is not None:
+                record["date"] = record["date"].isoformat()
+        self.assertEqual(rows, _RECORDS)
+
+    def test_empty(self) -> None:
+        "Test empty index table."
+        table = formats.table(index.Index([], []))
+
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.column_names, list(formats.COLUMNS))
+
+    @parameterized.expand(  # type: ignore
+        [("yaml",), ("jsonl",), ("csv",), ("parquet",), ("arrow",)]
+    )
+    def test_write_file(self, name: str) -> None:
+        """
+        Test every registered format writes a file read back the same way.
+
+        :param name: Format name.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index" + formats.get(name).suffix)
+            formats.write(_INDEX, name, path)
+
+            if name == "parquet":
+                self.assertEqual(pq.read_table(path), formats.table(_INDEX))
+                return
+            if name == "arrow":
+                with pa.ipc.open_file(path) as reader:
+                    self.assertEqual(reader.read_all(), formats.table(_INDEX))
+                return
+
+            expected = io.StringIO()
+            formats.get(name).write(_INDEX, expected)
+            with open(path, "r", encoding="utf-8") as text_file:
+                self.assertEqual(text_file.read(), expected.getvalue())
+
+        if name == "yaml":
+            out = io.StringIO()
+            writer.dump(_INDEX, out)
+            self.assertEqual(expected.getvalue(), out.getvalue())
+
+    def test_unknown(self) -> None:
+        "Test unknown format."
+        with self.assertRaises(formats.FormatError):
+            formats.get("xml")
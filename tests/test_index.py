@@ -0,0 +1,163 @@
+"""Index types unit test."""
+
+import datetime
+import locale
+import pickle
+import typing
+import unittest
+
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import index
+
+
+def _index() -> index.Index:
+    return index.Index(
+        [index.Component("ABC", "A b c."), index.Component("DEF", "D e f.")],
+        [
+            index.Diff(
+                datetime.date(2020, 3, 1),
+                index.Component("ABC", "A b c."),
+                index.Component("XYZ", "X y z."),
+                "Just because.",
+            ),
+            index.Diff(
+                datetime.date(2020, 2, 1),
+                None,
+                index.Component("ABC", "A b c."),
+                "Why.",
+            ),
+        ],
+    )
+
+
+class IndexTest(unittest.TestCase):
+    "Index types test."
+
+    def test_slots(self) -> None:
+        "Test index types keep no per-instance dict."
+        idx = _index()
+
+        for obj in (idx, idx.components[0], idx.diffs[0]):
+            with self.subTest(type(obj).__name__):
+                self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_pickle(self) -> None:
+        "Test index pickling round trip."
+        idx = _index()
+
+        self.assertEqual(pickle.loads(pickle.dumps(idx)), idx)
+
+    def test_compact(self) -> None:
+        "Test compact index shares components."
+        idx = _index()
+        got = index.compact(idx)
+
+        self.assertEqual(got, idx)
+        self.assertIs(got.diffs[0].added, got.components[0])
+        self.assertIs(got.diffs[1].removed, got.components[0])
+        self.assertIsNot(idx.diffs[0].added, idx.components[0])
+
+    def test_interner_shared(self) -> None:
+        "Test interner shares components between indices."
+        interner = index.Interner()
+
+        first = index.compact(_index(), interner)
+        second = index.compact(_index(), interner)
+
+        self.assertEqual(first, second)
+        self.assertIs(first.components[1], second.components[1])
+        self.assertIs(first.diffs[0].removed, second.diffs[0].removed)
+
+    def test_equal_by_value(self) -> None:
+        "Test components differing by name are not shared."
+        interner = index.Interner()
+
+        first = interner.component(index.Component("ABC", "A b c."))
+        second = interner.component(index.Component("ABC", "A b c. Inc."))
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.name, "A b c. Inc.")
+
+    @parameterized.expand(  # type: ignore
+        [
+            ("September 18, 2023", datetime.date(2023, 9, 18)),
+            (" June 8, 2022\n", datetime.date(2022, 6, 8)),
+            ("march 01, 2020", datetime.date(2020, 3, 1)),
+            ("February 30, 2020", "February 30, 2020"),
+            ("Sept 18, 2023", "Sept 18, 2023"),
+            ("2023-09-18", "2023-09-18"),
+            ("", ""),
+        ]
+    )
+    def test_parse_date(self, text: str, expected: index.DiffDate) -> None:
+        """
+        Test diff date parsing.
+
+        :param text: Date text.
+        :param expected: Date or text expected.
+        """
+        self.assertEqual(index.parse_date(text), expected)
+
+    def test_format_date(self) -> None:
+        "Test diff date formatting."
+        self.assertEqual(index.format_date(datetime.date(2022, 6, 8)), "June 8, 2022")
+        self.assertEqual(index.format_date("Unknown"), "Unknown")
+
+    def test_date_locale(self) -> None:
+        "Test dates are formatted and parsed in English whatever the locale."
+        previous = locale.setlocale(locale.LC_TIME)
+        for name in ("de_DE.UTF-8", "fr_FR.UTF-8", "ru_RU.UTF-8"):
+            try:
+                locale.setlocale(locale.LC_TIME, name)
+                break
+            except locale.Error:
+                pass
+        else:
+            self.skipTest("no non-English locale available")
+        self.addCleanup(locale.setlocale, locale.LC_TIME, previous)
+
+        date = datetime.date(2023, 3, 18)
+        self.assertEqual(index.format_date(date), "March 18, 2023")
+        self.assertEqual(index.parse_date(index.format_date(date)), date)
+
+
+class DateIndexTest(unittest.TestCase):
+    "DateIndex class test."
+
+    def setUp(self) -> None:
+        "Make diffs out of order."
+        self.diffs = [
+            index.Diff(datetime.date(2020, month, day), None, None, f"{month}-{day}")
+            for month, day in ((9, 30), (3, 1), (7, 1), (7, 1), (10, 1), (6, 30))
+        ]
+        self.diffs.append(index.Diff("Unknown", None, None, "undated"))
+        self.diffs.append(index.Diff("August 3, 2020", None, None, "8-3"))
+
+    def test_between(self) -> None:
+        "Test range queries."
+        by_date = index.Index([], self.diffs).date_index()
+
+        def reasons(diffs: typing.List[index.Diff]) -> typing.List[str]:
+            return [diff.reason for diff in diffs]
+
+        q3 = by_date.between(datetime.date(2020, 7, 1), datetime.date(2020, 9, 30))
+        self.assertEqual(reasons(q3), ["7-1", "7-1", "8-3", "9-30"])
+
+        self.assertEqual(
+            reasons(by_date.between(end=datetime.date(2020, 6, 30))), ["3-1", "6-30"]
+        )
+        self.assertEqual(
+            reasons(by_date.between(start=datetime.date(2020, 9, 1))), ["9-30", "10-1"]
+        )
+        self.assertEqual(reasons(by_date.on(datetime.date(2020, 7, 1))), ["7-1", "7-1"])
+        self.assertEqual(by_date.on(datetime.date(2020, 7, 2)), [])
+        self.assertEqual(len(by_date.between()), len(by_date))
+
+    def test_undated(self) -> None:
+        "Test diffs with dates not recognized are kept aside."
+        by_date = index.DateIndex(self.diffs)
+
+        self.assertEqual(len(by_date), len(self.diffs) - 1)
+        self.assertEqual(by_date.undated, [self.diffs[-2]])
+        self.assertEqual(by_date.dates, sorted(by_date.dates))
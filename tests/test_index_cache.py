@@ -0,0 +1,118 @@
+"""Parsed index cache unit test."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+import typing
+import unittest
+from unittest import mock
+
+from scrape_wiki_snp import index, main, wiki_snp
+from scrape_wiki_snp.index_cache import IndexCache
+
+from .server import StandInServer, isolated_defaults
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+
+def _index(name: str) -> index.Index:
+    component = index.Component("ABC", name)
+    return index.Index([component], [index.Diff("Jan 1, 2000", component, None, "")])
+
+
+class IndexCacheTest(unittest.TestCase):
+    "IndexCache class test."
+
+    def setUp(self) -> None:
+        "Make an empty cache."
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+        self.cache = IndexCache(self.directory)
+
+    def test_put_get(self) -> None:
+        "Test index round trip."
+        key = IndexCache.key("<html>")
+
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, _index("A b c."))
+
+        self.assertEqual(self.cache.get(key), _index("A b c."))
+        self.assertIsNone(self.cache.get(IndexCache.key("<html> ")))
+
+    def test_parse(self) -> None:
+        "Test page is parsed on a cache miss only."
+        parsed: typing.List[str] = []
+
+        def _parse(html: str) -> index.Index:
+            parsed.append(html)
+            return _index(html)
+
+        for html in ("one", "two", "one", "two"):
+            self.assertEqual(self.cache.parse(html, _parse), _index(html))
+
+        self.assertEqual(parsed, ["one", "two"])
+
+    def test_evict_old(self) -> None:
+        "Test entries not used for too long are evicted."
+        self.cache.put("old", _index("old"))
+        old_time = time.time() - self.cache.max_age - 1
+        os.utime(os.path.join(self.directory, "old.idx"), (old_time, old_time))
+
+        self.cache.put("new", _index("new"))
+
+        self.assertEqual([entry.key for entry in self.cache.entries()], ["new"])
+
+    def test_evict_size(self) -> None:
+        "Test least recently used entries are evicted to fit the max size."
+        for number, key in enumerate(("a", "b", "c")):
+            self.cache.put(key, _index(key))
+            entry_time = time.time() - 100 + number
+            os.utime(
+                os.path.join(self.directory, f"{key}.idx"), (entry_time, entry_time)
+            )
+
+        self.cache.get("a")
+        self.cache.max_bytes = sum(entry.size for entry in self.cache.entries()) - 1
+        self.cache.evict()
+
+        self.assertEqual(
+            sorted(entry.key for entry in self.cache.entries()), ["a", "c"]
+        )
+
+    def test_cli(self) -> None:
+        "Test cache command line."
+        self.cache.put("a", _index("a"))
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            main.cli_main(["cache", "info", "--dir", self.directory])
+            main.cli_main(["cache", "clear", "--dir", self.directory])
+
+        self.assertIn("entries: 1", out.getvalue())
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_cli_index_cache(self) -> None:
+        "Test a second scrape of a page with --index-cache skips parsing."
+        page = _COMPONENTS_TABLE + _DIFFS_TABLE
+        outs = [os.path.join(self.directory, f"{run}.yaml") for run in (1, 2)]
+
+        with StandInServer({"/page": page.encode("utf-8")}) as server:
+            with isolated_defaults(self.directory):
+                url = server.url("/page")
+                main.cli_main([url, outs[0], "--index-cache"])
+                with mock.patch.object(
+                    wiki_snp, "parse", side_effect=AssertionError("parsed")
+                ):
+                    main.cli_main([url, outs[1], "--index-cache"])
+
+        cache = IndexCache(os.path.join(self.directory, "indices"))
+        self.assertEqual(len(cache.entries()), 1)
+
+        with open(outs[0], "r", encoding="utf-8") as first:
+            with open(outs[1], "r", encoding="utf-8") as second:
+                self.assertEqual(first.read(), second.read())
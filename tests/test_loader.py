@@ -1,11 +1,19 @@
 """Index loader unit test."""
 
+import datetime
 import unittest
 
 import yaml
 
 from scrape_wiki_snp import index
-from scrape_wiki_snp.loader import Loader
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.loader import (
+    CLoader,
+    Loader,
+    LoaderException,
+    load_all_indices,
+    load_index,
+)
 
 
 class LoaderTest(unittest.TestCase):
@@ -75,3 +83,122 @@ class LoaderTest(unittest.TestCase):
 
         self.assertIsInstance(got, index.Index)
         self.assertEqual(expected, got)
+
+    def test_parse_diff_dates(self) -> None:
+        "Test diff dates are loaded as dates, unrecognized texts as is."
+        cases = [
+            ("2000-01-02", datetime.date(2000, 1, 2)),
+            ("2000-01-02 10:00:00", datetime.date(2000, 1, 2)),
+            ("January 2, 2000", datetime.date(2000, 1, 2)),
+            ("'2000-01-02'", "2000-01-02"),
+            ("Early 2000", "Early 2000"),
+        ]
+
+        for text, expected in cases:
+            with self.subTest(text):
+                got = yaml.load(
+                    "!index-diff\n"
+                    f"date: {text}\n"
+                    "added: null\n"
+                    "removed: null\n"
+                    "reason: Just because.\n",
+                    Loader,
+                )
+                self.assertEqual(got.date, expected)
+
+    def test_round_trip(self) -> None:
+        "Test dumped diff dates are loaded back."
+        added = index.Component("ABC", "A b c.")
+        idx = index.Index(
+            [added],
+            [
+                index.Diff(datetime.date(2020, 1, 2), added, None, "Why."),
+                index.Diff("2020-01-01", None, added, "Why not."),
+            ],
+        )
+
+        dumped = yaml.dump(idx, None, Dumper)
+
+        self.assertIn("date: 2020-01-02\n", dumped)
+        self.assertEqual(yaml.load(dumped, Loader), idx)
+
+    def test_c_loader(self) -> None:
+        "Test libyaml loader builds the same index, aliases shared."
+        added = index.Component("BRK.B", "A b c.")
+        idx = index.Index(
+            [added],
+            [index.Diff(datetime.date(2020, 1, 2), added, None, "Why.")],
+        )
+        dumped = yaml.dump(idx, None, Dumper)
+
+        got = yaml.load(dumped, CLoader)
+
+        self.assertEqual(got, yaml.load(dumped, Loader))
+        self.assertIs(got.diffs[0].added, got.components[0])
+
+
+class LoadIndexTest(unittest.TestCase):
+    "Event based loader test."
+
+    def test_load_index(self) -> None:
+        "Test index is loaded the same way Loader does, aliases shared."
+        first = index.Component("BRK.B", "Berkshire Hathaway")
+        second = index.Component("BRK.B", "Berkshire Hathaway Inc.")
+        idx = index.Index(
+            [first, second],
+            [
+                index.Diff(datetime.date(2020, 1, 2), first, second, "Rename."),
+                index.Diff("2020-01-01", None, first, "null"),
+                index.Diff("Early 2000", second, None, "Just because."),
+            ],
+        )
+        dumped = yaml.dump(idx, None, Dumper)
+
+        got = load_index(dumped)
+
+        self.assertEqual(got, idx)
+        self.assertEqual(got, yaml.load(dumped, Loader))
+        self.assertIs(got.diffs[0].added, got.components[0])
+        self.assertIs(got.diffs[1].removed, got.components[0])
+        self.assertIs(got.diffs[2].added, got.components[1])
+
+    def test_text_dates(self) -> None:
+        "Test date texts written before dates were parsed."
+        got = load_index("""
+            !index
+            components: []
+            diffs:
+              - !index-diff
+                date: January 2, 2000
+                added: null
+                removed: null
+                reason: Just because.
+            """)
+
+        self.assertEqual(got.diffs[0].date, datetime.date(2000, 1, 2))
+
+    def test_load_all(self) -> None:
+        "Test every document is loaded, any yaml loaded as safe_load does."
+        idx = index.Index([index.Component("ABC", "A b c.")], [])
+        other = {"a": 1, "b": [True, None, 1.5, "x"], "c": {"d": "2000-01-01"}}
+        dumped = yaml.dump_all([idx, other, idx], None, Dumper)
+
+        self.assertEqual(list(load_all_indices(dumped)), [idx, other, idx])
+
+    def test_errors(self) -> None:
+        "Test malformed documents."
+        cases = {
+            "not_index": "a: 1\n",
+            "two_documents": "--- !index\ncomponents: []\ndiffs: []\n--- 1\n",
+            "unknown_anchor": "!index\ncomponents: [*ABC]\ndiffs: []\n",
+            "unknown_tag": "!index\ncomponents: [!other {}]\ndiffs: []\n",
+            "extra_field": "!index\ncomponents: []\ndiffs: []\nother: 1\n",
+            "missing_field": "!index\ncomponents: []\n",
+            "truncated": "!index\ncomponents: [{symbol: ABC, name: 'A b",
+            "invalid": "!index\ncomponents: [\n  - : :\n",
+        }
+
+        for name, text in cases.items():
+            with self.subTest(name):
+                with self.assertRaises(LoaderException):
+                    load_index(text)
@@ -0,0 +1,134 @@
+"""Symbol index unit test."""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import yaml
+
+from scrape_wiki_snp import index, lookup, main
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.membership import Membership
+
+from .test_membership import _INDEX, _diff
+
+
+def _random_index(rng: random.Random, symbols: int, diffs: int) -> index.Index:
+    pool = [f"S{number}" for number in range(symbols)]
+    members = set(pool[: symbols // 2])
+    changes = []
+    day = datetime.date(2020, 1, 1)
+    for _ in range(diffs):
+        day += datetime.timedelta(days=rng.randint(0, 3))
+        added = rng.choice(sorted(set(pool) - members))
+        removed = rng.choice(sorted(members))
+        members = (members - {removed}) | {added}
+        changes.append(_diff(index.format_date(day), added, removed))
+
+    return index.Index(
+        [index.Component(symbol, symbol.lower()) for symbol in sorted(members)],
+        changes[::-1],
+    )
+
+
+class LookupTest(unittest.TestCase):
+    "Symbol index unit test."
+
+    def test_build(self) -> None:
+        "Test histories of current, removed and undated symbols."
+        symbols = lookup.build(_INDEX)
+
+        self.assertEqual(len(symbols), 5)
+        self.assertNotIn("ZZZ", symbols)
+        self.assertIsNone(symbols.get("ZZZ"))
+
+        bbb = symbols.get("BBB")
+        assert bbb is not None
+        self.assertFalse(bbb.member)
+        self.assertEqual(bbb.diffs, [_INDEX.diffs[2], _INDEX.diffs[0]])
+        self.assertEqual(
+            bbb.intervals,
+            [lookup.Interval(datetime.date(2020, 1, 15), datetime.date(2020, 3, 1))],
+        )
+
+        aaa = symbols.get("AAA")
+        assert aaa is not None
+        self.assertTrue(aaa.member)
+        self.assertEqual(aaa.diffs, [])
+        self.assertEqual(aaa.intervals, [lookup.Interval(None, None)])
+
+        xxx = symbols.get("XXX")
+        assert xxx is not None
+        self.assertEqual(xxx.diffs, [_INDEX.diffs[3]])
+        self.assertEqual(xxx.intervals, [])
+
+    def test_matches_membership(self) -> None:
+        "Test membership intervals agree with point-in-time membership."
+        idx = _random_index(random.Random(7), 20, 200)
+        last_date = index.DateIndex(idx.diffs).dates[-1]
+
+        membership = Membership(idx)
+        symbols = lookup.build(idx)
+
+        for offset in range(0, (last_date - datetime.date(2020, 1, 1)).days + 2, 5):
+            date = datetime.date(2019, 12, 31) + datetime.timedelta(days=offset)
+            expected = membership.members(date)
+            for symbol, history in symbols.histories.items():
+                self.assertEqual(
+                    history.is_member(date), symbol in expected, (symbol, date)
+                )
+
+    def test_write_load(self) -> None:
+        "Test symbol index is loaded back as written."
+        symbols = lookup.build(_INDEX)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index" + lookup.SIDECAR_SUFFIX)
+            with open(path, "w", encoding="utf-8") as symbols_file:
+                lookup.write(symbols, symbols_file)
+            loaded = lookup.load(path)
+
+            with open(path, "w", encoding="utf-8") as symbols_file:
+                symbols_file.write("{}")
+            with self.assertRaises(lookup.SymbolIndexError):
+                lookup.load(path)
+
+        self.assertEqual(loaded.histories, symbols.histories)
+
+    def test_cli(self) -> None:
+        "Test lookup reads the symbol index written next to the output."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            yaml_path = os.path.join(tmp_dir, "index.yaml")
+            with open(yaml_path, "w", encoding="utf-8") as yaml_file:
+                yaml.dump(_INDEX, yaml_file, Dumper)
+            lookup.write_sidecar(_INDEX, yaml_path)
+
+            # The output is not loaded again while the symbol index is newer.
+            with open(yaml_path, "w", encoding="utf-8") as yaml_file:
+                yaml_file.write("not an index")
+            os.utime(yaml_path, (0, 0))
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                code = main.cli_main(
+                    ["lookup", yaml_path, "CCC", "DDD", "--date", "2020-01-31"]
+                )
+            with contextlib.redirect_stderr(io.StringIO()):
+                missing = main.cli_main(["lookup", yaml_path, "ZZZ"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(missing, 1)
+
+        ccc, ddd = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(ccc["intervals"], [["2020-03-01", None]])
+        self.assertEqual(ccc["diffs"][0]["removed"], ["BBB", "bbb"])
+        self.assertFalse(ccc["member_on_date"])
+        self.assertEqual(ddd["intervals"], [[None, "2020-02-01"]])
+        self.assertTrue(ddd["member_on_date"])
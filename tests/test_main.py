@@ -0,0 +1,164 @@
+"""Command line unit test."""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import typing
+import unittest
+from unittest import mock
+
+import yaml
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import formats, index, main, stream_parse, wiki_snp, writer
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.index_cache import IndexCache
+from scrape_wiki_snp.loader import load_all_indices, load_index
+
+from .server import StandInServer, isolated_defaults
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+_PAGE = _COMPONENTS_TABLE + _DIFFS_TABLE
+
+# Diff dropped from the page since, kept in the history of --update runs.
+_OLD_DIFF = index.Diff(
+    datetime.date(2001, 1, 2),
+    index.Component("OLD", "O l d."),
+    None,
+    "Index rebalancing.",
+)
+
+
+class MainTest(unittest.TestCase):
+    "Command line unit test."
+
+    def setUp(self) -> None:
+        "Start stand-in server, keep caches in a temporary directory."
+        self.server = StandInServer({"/page": _PAGE.encode("utf-8")})
+        self.addCleanup(self.server.close)
+
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+
+        defaults = isolated_defaults(self.directory)
+        defaults.__enter__()  # pylint: disable=unnecessary-dunder-call
+        self.addCleanup(defaults.__exit__, None, None, None)
+
+        self.url = self.server.url("/page")
+        self.expected = stream_parse.parse(_PAGE)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, idx: index.Index, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as out_file:
+            writer.dump(idx, out_file)
+
+    def _read(self, path: str) -> index.Index:
+        with open(path, "r", encoding="utf-8") as out_file:
+            return load_index(out_file)
+
+    @parameterized.expand([("bs4",), ("stream",)])  # type: ignore
+    def test_update(self, engine: str) -> None:
+        "Test --update output equals a full scrape."
+        out = self._path("index.yaml")
+        self._write(index.Index(self.expected.components, self.expected.diffs[1:]), out)
+
+        main.cli_main([self.url, out, "--update", "--engine", engine])
+
+        self.assertEqual(self._read(out), self.expected)
+
+    @parameterized.expand([("bs4",), ("stream",)])  # type: ignore
+    def test_update_truncated(self, engine: str) -> None:
+        "Test --update of a truncated file falls back to a full scrape."
+        out = self._path("index.yaml")
+        text = yaml.dump(self.expected, None, Dumper, default_flow_style=True)
+        with open(out, "w", encoding="utf-8") as out_file:
+            out_file.write(text[: len(text) // 2])
+
+        main.cli_main([self.url, out, "--update", "--engine", engine])
+
+        self.assertEqual(self._read(out), self.expected)
+
+    @parameterized.expand([("bs4",), ("stream",)])  # type: ignore
+    def test_update_index_cache(self, engine: str) -> None:
+        "Test --update history is neither lost to nor stored in the index cache."
+        full = self._path("full.yaml")
+        main.cli_main([self.url, full, "--index-cache", "--engine", engine])
+
+        out = self._path("index.yaml")
+        history = self.expected.diffs[1:] + [_OLD_DIFF]
+        self._write(index.Index(self.expected.components, history), out)
+
+        argv = [self.url, out, "--update", "--index-cache", "--engine", engine]
+        main.cli_main(argv)
+        main.cli_main(argv)
+
+        self.assertEqual(self._read(out).diffs, self.expected.diffs + [_OLD_DIFF])
+
+        main.cli_main([self.url, full, "--index-cache", "--engine", engine])
+
+        self.assertEqual(self._read(full), self.expected)
+        self.assertEqual(len(IndexCache(self._path("indices")).entries()), 1)
+
+    def test_parse_fn_history(self) -> None:
+        "Test parse functions with a history skip the index cache."
+        cache = IndexCache(self._path("indices"))
+        history = self.expected.diffs[1:] + [_OLD_DIFF]
+
+        for engine in main.ENGINES:
+            with self.subTest(engine):
+                parse = main.parse_fn(engine, "html.parser", cache)
+                update = main.parse_fn(engine, "html.parser", cache, history)
+
+                self.assertEqual(parse(_PAGE), self.expected)
+                self.assertEqual(
+                    update(_PAGE).diffs, self.expected.diffs + history[-1:]
+                )
+                self.assertEqual(parse(_PAGE), self.expected)
+
+    def test_store_dir(self) -> None:
+        "Test --store-dir skips parsing a page not changed."
+        store_dir = self._path("store")
+        outs = [self._path(f"{run}.yaml") for run in (1, 2)]
+
+        main.cli_main([self.url, outs[0], "--store-dir", store_dir])
+        with mock.patch.object(wiki_snp, "parse", side_effect=AssertionError("parsed")):
+            main.cli_main([self.url, outs[1], "--store-dir", store_dir])
+
+        self.assertEqual(self._read(outs[0]), self.expected)
+        self.assertEqual(self._read(outs[1]), self.expected)
+
+    @parameterized.expand([("csv",), ("jsonl",)])  # type: ignore
+    def test_format(self, name: str) -> None:
+        "Test --format output."
+        out = self._path("index" + formats.get(name).suffix)
+        expected = self._path("expected" + formats.get(name).suffix)
+
+        main.cli_main([self.url, out, "--format", name])
+        formats.write(self.expected, name, expected)
+
+        with open(out, "r", encoding="utf-8") as out_file:
+            with open(expected, "r", encoding="utf-8") as expected_file:
+                self.assertEqual(out_file.read(), expected_file.read())
+
+    def test_batch_out(self) -> None:
+        "Test batch subcommand writes all the indices as one yaml stream."
+        out = self._path("indices.yaml")
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            code = main.cli_main(
+                ["batch", self.url, self.url, "--out", out, "--parse-jobs", "1"]
+            )
+
+        with open(out, "r", encoding="utf-8") as out_file:
+            indices: typing.List[index.Index] = list(load_all_indices(out_file))
+
+        self.assertEqual(code, 0)
+        self.assertEqual(indices, [self.expected] * 2)
+        self.assertIn("parse:", stderr.getvalue())
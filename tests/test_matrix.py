@@ -0,0 +1,96 @@
+"""Membership matrix unit test."""
+
+from __future__ import annotations
+
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from scrape_wiki_snp import index, main, matrix
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.membership import Membership
+
+from .test_membership import _INDEX
+
+
+class MatrixTest(unittest.TestCase):
+    "Membership matrix unit test."
+
+    def assert_matches_membership(self, got: matrix.MembershipMatrix) -> None:
+        """
+        Check matrix against point-in-time membership.
+
+        :param got: Matrix to check.
+        """
+        membership = Membership(_INDEX)
+        data = got.unpack()
+
+        for col, date in enumerate(got.dates.tolist()):
+            members = membership.members(date)
+            for row, symbol in enumerate(got.tickers.tolist()):
+                self.assertEqual(bool(data[row, col]), symbol in members)
+
+    def test_diff_dates(self) -> None:
+        "Test columns are the distinct diff dates."
+        got = matrix.membership_matrix(_INDEX)
+
+        self.assertEqual(got.tickers.tolist(), ["AAA", "BBB", "CCC", "DDD"])
+        self.assertEqual(
+            got.dates.tolist(),
+            [
+                datetime.date(2020, 1, 15),
+                datetime.date(2020, 2, 1),
+                datetime.date(2020, 3, 1),
+            ],
+        )
+        self.assert_matches_membership(got)
+
+    def test_trading_days(self) -> None:
+        "Test columns are weekdays."
+        got = matrix.membership_matrix(_INDEX, columns="trading", packed=True)
+
+        self.assertTrue(got.packed)
+        self.assertEqual(got.dates[0], np.datetime64("2020-01-15"))
+        self.assertEqual(got.dates[-1], np.datetime64("2020-02-28"))
+        self.assertTrue(np.is_busday(got.dates).all())
+        self.assert_matches_membership(got)
+
+    def test_dates(self) -> None:
+        "Test explicit column dates."
+        dates = ["2019-12-31", "2020-01-20", "2030-01-01"]
+        got = matrix.membership_matrix(_INDEX, dates=dates)
+
+        self.assertEqual(got.dates.astype(str).tolist(), dates)
+        self.assert_matches_membership(got)
+
+    def test_save_load(self) -> None:
+        "Test .npz round trip."
+        expected = matrix.membership_matrix(_INDEX, packed=True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "matrix.npz")
+            expected.save(path)
+            got = matrix.load(path)
+
+        self.assertTrue(got.packed)
+        np.testing.assert_array_equal(got.tickers, expected.tickers)
+        np.testing.assert_array_equal(got.dates, expected.dates)
+        np.testing.assert_array_equal(got.unpack(), expected.unpack())
+
+    def test_cli(self) -> None:
+        "Test matrix command line on a yaml file."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            yaml_path = os.path.join(tmp_dir, "index.yaml")
+            npz_path = os.path.join(tmp_dir, "matrix.npz")
+            with open(yaml_path, "w", encoding="utf-8") as yaml_file:
+                yaml.dump(_INDEX, yaml_file, Dumper)
+
+            main.cli_main(["matrix", yaml_path, npz_path, "--columns", "trading"])
+            got = matrix.load(npz_path)
+
+        self.assertIsInstance(_INDEX, index.Index)
+        self.assert_matches_membership(got)
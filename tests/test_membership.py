@@ -0,0 +1,133 @@
+"""Point-in-time membership unit test."""
+
+from __future__ import annotations
+
+import datetime
+import random
+import typing
+import unittest
+
+import numpy as np
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import index, lookup, matrix
+from scrape_wiki_snp.membership import Membership
+
+
+def _component(symbol: typing.Optional[str]) -> typing.Optional[index.Component]:
+    return None if symbol is None else index.Component(symbol, symbol.lower())
+
+
+def _diff(
+    date: str, added: typing.Optional[str], removed: typing.Optional[str]
+) -> index.Diff:
+    return index.Diff(date, _component(added), _component(removed), "")
+
+
+_INDEX = index.Index(
+    [index.Component("AAA", "aaa"), index.Component("CCC", "ccc")],
+    [
+        _diff("March 1, 2020", "CCC", "BBB"),
+        _diff("February 1, 2020", None, "DDD"),
+        _diff("January 15, 2020", "BBB", None),
+        _diff("not a date", "XXX", None),
+    ],
+)
+
+
+class MembershipTest(unittest.TestCase):
+    "Membership class test."
+
+    @parameterized.expand([(1,), (2,), (32,)])  # type: ignore
+    def test_members(self, checkpoint_every: int) -> None:
+        """
+        Test members at dates around the diffs.
+
+        :param checkpoint_every: Diffs between membership checkpoints.
+        """
+        membership = Membership(_INDEX, checkpoint_every)
+
+        cases = [
+            ("2021-01-01", {"AAA", "CCC"}),
+            ("2020-03-01", {"AAA", "CCC"}),
+            ("2020-02-29", {"AAA", "BBB"}),
+            ("2020-02-01", {"AAA", "BBB"}),
+            ("2020-01-31", {"AAA", "BBB", "DDD"}),
+            ("2020-01-15", {"AAA", "BBB", "DDD"}),
+            ("2020-01-14", {"AAA", "DDD"}),
+        ]
+
+        for date, expected in cases:
+            with self.subTest(date):
+                day = datetime.date.fromisoformat(date)
+                self.assertEqual(membership.members(day), expected)
+                for symbol in ("AAA", "BBB", "CCC", "DDD", "XXX"):
+                    self.assertEqual(
+                        membership.is_member(symbol, day), symbol in expected
+                    )
+
+        self.assertEqual(membership.skipped, [_INDEX.diffs[-1]])
+
+    def test_text_dates(self) -> None:
+        "Test dates may be given as diff date texts."
+        membership = Membership(_INDEX)
+
+        self.assertEqual(membership.members("February 1, 2020"), {"AAA", "BBB"})
+
+    def test_replay(self) -> None:
+        "Test checkpoints give the same answers as a full replay."
+        rnd = random.Random(0)
+        symbols = [f"S{number}" for number in range(30)]
+        start = datetime.date(2000, 1, 1)
+
+        diffs = []
+        for _ in range(200):
+            date = start + datetime.timedelta(days=rnd.randint(0, 3000))
+            diffs.append(
+                index.Diff(
+                    index.format_date(date),
+                    _component(rnd.choice(symbols)),
+                    _component(rnd.choice(symbols)),
+                    "",
+                )
+            )
+        idx = index.Index(
+            [index.Component(symbol, "") for symbol in symbols[:10]], diffs
+        )
+
+        full = Membership(idx, checkpoint_every=len(diffs) + 1)
+        checkpointed = Membership(idx, checkpoint_every=7)
+
+        for days in range(0, 3100, 13):
+            date = start + datetime.timedelta(days=days)
+            self.assertEqual(checkpointed.members(date), full.members(date))
+
+    def test_same_date_readd(self) -> None:
+        "Test a symbol removed and re-added the same day, re-add first on the page."
+        idx = index.Index(
+            [index.Component("AAA", "aaa"), index.Component("XXX", "xxx")],
+            [
+                _diff("December 23, 2024", "XXX", None),
+                _diff("December 23, 2024", None, "XXX"),
+                _diff("March 29, 2016", "XXX", None),
+            ],
+        )
+        days = [
+            datetime.date(2016, 3, 28),
+            datetime.date(2020, 1, 1),
+            datetime.date(2024, 12, 23),
+            datetime.date(2025, 1, 1),
+        ]
+        expected = [False, True, True, True]
+
+        membership = Membership(idx)
+        got = matrix.membership_matrix(idx, dates=np.array(days, "datetime64[D]"))
+        history = lookup.build(idx).get("XXX")
+        assert history is not None
+        row = got.tickers.tolist().index("XXX")
+
+        for col, (day, member) in enumerate(zip(days, expected)):
+            with self.subTest(day):
+                self.assertEqual(membership.is_member("XXX", day), member)
+                self.assertEqual(bool(got.unpack()[row, col]), member)
+                self.assertEqual(history.is_member(day), member)
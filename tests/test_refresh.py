@@ -0,0 +1,93 @@
+"""Revision-aware refresh unit test."""
+
+from __future__ import annotations
+
+import tempfile
+import typing
+import unittest
+
+from scrape_wiki_snp import index, refresh, stream_parse
+from scrape_wiki_snp.download import Downloader
+
+from .server import StandInServer
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+_PAGE = _COMPONENTS_TABLE + _DIFFS_TABLE
+
+
+class RefreshTest(unittest.TestCase):
+    "Revision-aware refresh unit test."
+
+    def setUp(self) -> None:
+        "Start stand-in server, make an empty store."
+        self.server = StandInServer({"/page": _PAGE.encode("utf-8")})
+        self.addCleanup(self.server.close)
+
+        self.downloader = Downloader(cache=False, retries=0)
+        self.addCleanup(self.downloader.close)
+
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.store = refresh.RevisionStore(tmp_dir.name)
+
+        self.parsed: typing.List[str] = []
+
+    def _parse(self, html: str) -> index.Index:
+        self.parsed.append(html)
+        return stream_parse.parse(html)
+
+    def _fetch(self) -> index.Index:
+        return refresh.fetch_index(
+            self.server.url("/page"), self._parse, self.store, self.downloader
+        )
+
+    def test_revision_api_url(self) -> None:
+        "Test revision lookup url of wiki pages."
+        self.assertEqual(
+            refresh.revision_api_url(
+                "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+            ),
+            "https://en.wikipedia.org/w/api.php?action=query&prop=info"
+            "&titles=List_of_S%26P_500_companies&format=json&formatversion=2",
+        )
+        self.assertIsNone(refresh.revision_api_url("https://example.org/wiki/A"))
+
+    def test_etag(self) -> None:
+        "Test page is neither downloaded nor parsed while its ETag is the same."
+        self.server.headers["/page"] = {"ETag": '"1"'}
+
+        first = self._fetch()
+        second = self._fetch()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.server.requests, ["/page"] * 3)
+
+        self.server.headers["/page"] = {"ETag": '"2"'}
+        self._fetch()
+
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_content_hash(self) -> None:
+        "Test page is not parsed while its content is the same."
+        first = self._fetch()
+        second = self._fetch()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.parsed), 1)
+
+        self.server.pages["/page"] = (_PAGE + "<p>edit</p>").encode("utf-8")
+        self._fetch()
+
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_store(self) -> None:
+        "Test store keeps one index per url."
+        idx = stream_parse.parse(_PAGE)
+
+        self.assertIsNone(self.store.get("https://a/1"))
+
+        self.store.put("https://a/1", "rev", idx)
+
+        self.assertEqual(self.store.get("https://a/1"), ("rev", idx))
+        self.assertIsNone(self.store.get("https://a/2"))
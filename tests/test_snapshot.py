@@ -0,0 +1,107 @@
+"""Binary index snapshot unit test."""
+
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from scrape_wiki_snp import formats, index, snapshot, source
+
+_ADDED = index.Component("ABC", "A b c.")
+_REMOVED = index.Component("XYZ", "Ünïcode")
+
+_INDEX = index.Index(
+    [_ADDED, index.Component("BRK.B", "Berkshire Hathaway")],
+    [
+        index.Diff(datetime.date(2020, 1, 2), _ADDED, _REMOVED, "Just because."),
+        index.Diff("Early 2000", None, index.Component("ABC", "A b c."), ""),
+        index.Diff(datetime.date(1999, 12, 31), _REMOVED, None, "Just because."),
+    ],
+)
+
+
+class SnapshotTest(unittest.TestCase):
+    "Snapshot read and write test."
+
+    def setUp(self) -> None:
+        "Make a temporary directory."
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+
+    def _write(self, idx: index.Index) -> str:
+        path = os.path.join(self.directory, "index.snap")
+        formats.write(idx, "snapshot", path)
+        return path
+
+    def test_round_trip(self) -> None:
+        "Test index loaded is the one written."
+        self.assertEqual(snapshot.load(self._write(_INDEX)), _INDEX)
+
+    def test_empty(self) -> None:
+        "Test empty index round trip."
+        empty = index.Index([], [])
+
+        self.assertEqual(snapshot.load(self._write(empty)), empty)
+
+    def test_lazy(self) -> None:
+        "Test records are decoded on access."
+        with snapshot.Snapshot(self._write(_INDEX)) as snap:
+            self.assertEqual(len(snap.components), 2)
+            self.assertEqual(len(snap.diffs), 3)
+            self.assertEqual(snap.diffs[-1], _INDEX.diffs[-1])
+            self.assertEqual(snap.diffs[1:], _INDEX.diffs[1:])
+            self.assertEqual(snap.components[1], _INDEX.components[1])
+            with self.assertRaises(IndexError):
+                _ = snap.diffs[3]
+
+    def test_shared(self) -> None:
+        "Test components equal by value are decoded as one instance."
+        idx = snapshot.load(self._write(_INDEX))
+
+        self.assertIs(idx.diffs[0].added, idx.components[0])
+        self.assertIs(idx.diffs[1].removed, idx.components[0])
+        self.assertIs(idx.diffs[0].removed, idx.diffs[2].added)
+
+    def test_dedup(self) -> None:
+        "Test strings and components are written once."
+        component = index.Component("ABC", "A b c.")
+        many = index.Index(
+            [component],
+            [index.Diff("June 1, 2020", component, None, "same")] * 100,
+        )
+        one = index.Index([component], many.diffs[:1])
+
+        out_many = io.BytesIO()
+        snapshot.write(many, out_many)
+        out_one = io.BytesIO()
+        snapshot.write(one, out_one)
+
+        self.assertEqual(len(out_many.getvalue()) - len(out_one.getvalue()), 99 * 16)
+
+    def test_source(self) -> None:
+        "Test source.load detects snapshots."
+        self.assertEqual(source.load(self._write(_INDEX)), _INDEX)
+
+    def test_not_snapshot(self) -> None:
+        "Test files that are not snapshots are rejected."
+        path = os.path.join(self.directory, "index.snap")
+
+        for content in (b"", b"SNPINDEX", b"not a snapshot" * 4):
+            with self.subTest(content):
+                with open(path, "wb") as snapshot_file:
+                    snapshot_file.write(content)
+                with self.assertRaises(snapshot.SnapshotError):
+                    snapshot.Snapshot(path)
+
+    def test_truncated(self) -> None:
+        "Test truncated snapshots are rejected."
+        path = self._write(_INDEX)
+        with open(path, "rb") as snapshot_file:
+            content = snapshot_file.read()
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(content[:-1])
+
+        with self.assertRaises(source.SourceError):
+            source.load(path)
@@ -0,0 +1,270 @@
+"""Timing spans unit test."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+
+import requests_cache
+import yaml
+
+from scrape_wiki_snp import index, main, spans, stream_parse, wiki_snp
+from scrape_wiki_snp.dumper import Dumper
+from scrape_wiki_snp.download import Downloader
+
+from .server import StandInServer
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+_PAGE = f"<html><body>{_COMPONENTS_TABLE}{_DIFFS_TABLE}</body></html>"
+
+
+class SpansTest(unittest.TestCase):
+    "Spans and hooks test."
+
+    def setUp(self) -> None:
+        "Record spans."
+        self.recorder = spans.Recorder()
+        spans.add_hook(self.recorder)
+        self.addCleanup(spans.remove_hook, self.recorder)
+
+    def test_nested(self) -> None:
+        "Test nested spans paths and attributes."
+        with spans.span("outer", url="u") as outer:
+            with spans.span("inner") as inner:
+                inner.attributes["bytes"] = 10
+            outer.attributes["status"] = 200
+
+        self.assertEqual(
+            [(ended.path, ended.attributes) for ended in self.recorder.spans],
+            [("outer/inner", {"bytes": 10}), ("outer", {"url": "u", "status": 200})],
+        )
+        self.assertGreaterEqual(outer.seconds, inner.seconds)
+
+    def test_error(self) -> None:
+        "Test spans are reported when the stage fails."
+        with self.assertRaises(ValueError):
+            with spans.span("failed"):
+                raise ValueError()
+
+        self.assertEqual([ended.name for ended in self.recorder.spans], ["failed"])
+
+    def test_remove_hook(self) -> None:
+        "Test removed hooks are not called."
+        spans.remove_hook(self.recorder)
+        self.addCleanup(spans.add_hook, self.recorder)
+
+        with spans.span("ignored"):
+            pass
+
+        self.assertEqual(self.recorder.spans, [])
+
+    def test_summary(self) -> None:
+        "Test spans summary."
+        for hit in (False, True, True):
+            with spans.span("download", bytes=512, from_cache=hit):
+                pass
+        with spans.span("parse"):
+            pass
+
+        summary = self.recorder.summary()
+
+        self.assertEqual(len(summary), 2)
+        self.assertRegex(summary[0], r"^download: \d+\.\d{3}s in 3 spans, 1\.5 KiB")
+        self.assertTrue(summary[0].endswith("cache hits 2/3"), summary[0])
+        self.assertRegex(summary[1], r"^parse: \d+\.\d{3}s$")
+
+    def test_parse(self) -> None:
+        "Test parse stages."
+        wiki_snp.parse(_PAGE)
+        stream_parse.parse(_PAGE)
+
+        self.assertEqual(
+            [ended.path for ended in self.recorder.spans],
+            ["parse/html", "parse/tables", "parse", "parse"],
+        )
+        self.assertEqual(self.recorder.spans[2].attributes["engine"], "bs4")
+        self.assertEqual(self.recorder.spans[3].attributes["engine"], "stream")
+
+    def test_download(self) -> None:
+        "Test download span tells http cache hits from network fetches."
+        server = StandInServer({"/page": b"page"})
+        self.addCleanup(server.close)
+
+        with requests_cache.enabled(backend="memory"):
+            downloader = Downloader()
+            self.addCleanup(downloader.close)
+            for _ in range(2):
+                downloader.download(server.url("/page"))
+
+        self.assertEqual(
+            [ended.attributes for ended in self.recorder.spans],
+            [
+                {
+                    "url": server.url("/page"),
+                    "status": 200,
+                    "bytes": 4,
+                    "from_cache": from_cache,
+                }
+                for from_cache in (False, True)
+            ],
+        )
+
+    def test_stream_text(self) -> None:
+        "Test page parsed as it arrives is nested in the download span."
+        content = (_PAGE + "<p>tail</p>" * 100).encode("utf-8")
+        server = StandInServer({"/page": content})
+        self.addCleanup(server.close)
+        downloader = Downloader(cache=False)
+        self.addCleanup(downloader.close)
+
+        with downloader.stream_text(server.url("/page"), 16) as chunks:
+            stream_parse.parse(chunks)
+
+        self.assertEqual(
+            [ended.path for ended in self.recorder.spans],
+            ["download/parse", "download"],
+        )
+        # Reading stops after the tables.
+        self.assertLess(self.recorder.spans[1].attributes["bytes"], len(content))
+
+    def test_opt_in(self) -> None:
+        "Test memory is not accounted outside of account_memory blocks."
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        freed = bytearray(8 * 2**20)
+        del freed
+        with spans.span("stage"):
+            pass
+
+        self.assertNotIn("memory_peak", self.recorder.spans[0].attributes)
+        self.assertGreaterEqual(tracemalloc.get_traced_memory()[1], 8 * 2**20)
+
+
+class MemoryTest(unittest.TestCase):
+    "Span memory accounting test."
+
+    def setUp(self) -> None:
+        "Trace memory and record spans."
+        self.recorder = spans.Recorder()
+        spans.add_hook(self.recorder)
+        self.addCleanup(spans.remove_hook, self.recorder)
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        memory = spans.account_memory()
+        memory.__enter__()  # pylint: disable=unnecessary-dunder-call
+        self.addCleanup(memory.__exit__, None, None, None)
+
+    def test_nested(self) -> None:
+        "Test peak and retained memory of nested spans."
+        kept = []
+        with spans.span("outer") as outer:
+            with spans.span("inner") as inner:
+                freed = bytearray(8 * 2**20)
+                del freed
+                kept.append(bytearray(2**20))
+            with spans.span("after") as after:
+                pass
+
+        self.assertGreaterEqual(inner.attributes["memory_peak"], 8 * 2**20)
+        self.assertGreaterEqual(outer.attributes["memory_peak"], 8 * 2**20)
+        self.assertLess(after.attributes["memory_peak"], 2**20)
+        for ended in (inner, outer):
+            self.assertGreaterEqual(ended.attributes["memory_retained"], 2**20)
+            self.assertLess(ended.attributes["memory_retained"], 2 * 2**20)
+
+    def test_outer_peak(self) -> None:
+        "Test peak traced before spans is reported by the outermost one."
+        freed = bytearray(8 * 2**20)
+        del freed
+        with spans.span("outer") as outer:
+            with spans.span("inner") as inner:
+                pass
+
+        self.assertGreaterEqual(outer.attributes["memory_traced_peak"], 8 * 2**20)
+        self.assertNotIn("memory_traced_peak", inner.attributes)
+
+        tracemalloc.reset_peak()
+        with spans.span("outer") as outer:
+            with spans.span("inner"):
+                freed = bytearray(4 * 2**20)
+                del freed
+
+        self.assertGreaterEqual(outer.attributes["memory_traced_peak"], 4 * 2**20)
+        self.assertLess(outer.attributes["memory_traced_peak"], 8 * 2**20)
+
+    def test_dumper(self) -> None:
+        "Test yaml node graph is reported."
+        component = index.Component("ABC", "A b c.")
+        yaml.dump(index.Index([component], []), None, Dumper)
+
+        self.assertEqual([ended.path for ended in self.recorder.spans], ["represent"])
+        self.assertGreater(self.recorder.spans[0].attributes["memory_peak"], 0)
+
+
+class ProfiledTest(unittest.TestCase):
+    "Profile report test."
+
+    def _run(self) -> int:
+        with spans.span("stage", bytes=2048):
+            pass
+        return 3
+
+    def test_summary(self) -> None:
+        "Test summary is written to stderr."
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main.profiled(self._run, "summary"), 3)
+
+        self.assertRegex(stderr.getvalue(), r"^stage: \d+\.\d{3}s, 2\.0 KiB\n$")
+
+    def test_memory(self) -> None:
+        "Test memory summary."
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main.profiled(self._run, "memory"), 3)
+
+        self.assertRegex(
+            stderr.getvalue(),
+            r"^stage: \d+\.\d{3}s, 2\.0 KiB, peak \d+\.\d MiB, retained \d+\.\d MiB\n$",
+        )
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_json(self) -> None:
+        "Test JSON spans are written to a file."
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            self.assertEqual(main.profiled(self._run, "json", path), 3)
+
+            with open(path, "r", encoding="utf-8") as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]["path"], "stage")
+        self.assertEqual(report[0]["attributes"], {"bytes": 2048})
+
+    def test_cprofile(self) -> None:
+        "Test cProfile stats are dumped."
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.pstats")
+            self.assertEqual(main.profiled(self._run, "cprofile", path), 3)
+
+            stats = pstats.Stats(path)
+
+        self.assertTrue(
+            any(function[2] == "_run" for function in stats.stats)  # type: ignore
+        )
+
+    def test_no_profile(self) -> None:
+        "Test nothing is reported without a profile kind."
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main.profiled(self._run, None), 3)
+
+        self.assertEqual(stderr.getvalue(), "")
@@ -0,0 +1,151 @@
+"""Streaming page parser unit test."""
+
+from __future__ import annotations
+
+import datetime
+import typing
+import unittest
+
+from scrape_wiki_snp import index, stream_parse, wiki_snp
+
+from .test_wiki_snp import _DIFFS_HEADER, to_html_row
+
+_COMPONENTS = [
+    index.Component("ABC", "A b c."),
+    index.Component("XYZ", "X y z."),
+]
+
+_DIFFS = [
+    index.Diff(
+        datetime.date(2022, 6, 8),
+        index.Component("AAA", "A a a."),
+        index.Component("BBB", "B b b."),
+        "Market capitalization change.",
+    ),
+    index.Diff(
+        datetime.date(2022, 6, 8),
+        None,
+        index.Component("DDD", "D d d."),
+        "Market capitalization change.",
+    ),
+    index.Diff(
+        datetime.date(2022, 6, 9),
+        index.Component("EEE", "E e e."),
+        None,
+        "FFF was acquired by XXX.",
+    ),
+]
+
+_COMPONENTS_TABLE = f"""
+<table id="constituents">
+<tr><th>Symbol</th><th>Security</th><th>Sector</th></tr>
+<tr>{to_html_row(_COMPONENTS[0])}<td>Tech</td></tr>
+<tr><td><a href="#">XYZ</a></td><td><b>X y z.</b></td><td>Tech</td></tr>
+</table>
+"""
+
+_DIFFS_TABLE = f"""
+<table id="changes">
+{_DIFFS_HEADER}
+<tbody>
+<tr>
+  <td rowspan="2">{index.format_date(_DIFFS[0].date)}</td>
+  {to_html_row(_DIFFS[0].added)}
+  {to_html_row(_DIFFS[0].removed)}
+  <td rowspan="2">{_DIFFS[0].reason}</td>
+</tr>
+<tr>
+  {to_html_row(_DIFFS[1].added)}
+  {to_html_row(_DIFFS[1].removed)}
+</tr>
+<tr>
+  <td>{index.format_date(_DIFFS[2].date)}</td>
+  {to_html_row(_DIFFS[2].added)}
+  {to_html_row(_DIFFS[2].removed)}
+  <td>{_DIFFS[2].reason}</td>
+</tr>
+</tbody>
+</table>
+"""
+
+_NOISE_TABLE = """
+<table class="infobox">
+<tr><th>Foundation</th><td>1957</td></tr>
+<tr><td><table><tr><th>Symbol</th><th>Security</th></tr></table></td></tr>
+</table>
+"""
+
+
+class StreamParseTest(unittest.TestCase):
+    "Streaming page parser unit test."
+
+    def test_parse(self) -> None:
+        "Test both tables are extracted the same way bs4 parser does."
+        html = f"<html><body>{_COMPONENTS_TABLE}{_DIFFS_TABLE}</body></html>"
+
+        got = stream_parse.parse(html)
+
+        self.assertEqual(got, index.Index(_COMPONENTS, _DIFFS))
+        self.assertEqual(got, wiki_snp.parse(html))
+
+    def test_parse_skips_other_tables(self) -> None:
+        "Test tables are recognized by headers rather than by position."
+        html = f"{_NOISE_TABLE}{_DIFFS_TABLE}{_NOISE_TABLE}{_COMPONENTS_TABLE}"
+
+        got = stream_parse.parse(html)
+
+        self.assertEqual(got, index.Index(_COMPONENTS, _DIFFS))
+
+    def test_parse_chunks(self) -> None:
+        "Test page can be fed in arbitrary chunks."
+        html = f"{_NOISE_TABLE}{_COMPONENTS_TABLE}{_DIFFS_TABLE}"
+        chunks = [html[offset : offset + 7] for offset in range(0, len(html), 7)]
+
+        got = stream_parse.parse(chunks)
+
+        self.assertEqual(got, index.Index(_COMPONENTS, _DIFFS))
+
+    def test_parse_stops_early(self) -> None:
+        "Test reading stops once both tables are extracted."
+        consumed = []
+
+        def _chunks() -> typing.Iterator[str]:
+            for chunk in (_COMPONENTS_TABLE, _DIFFS_TABLE, "<p>tail</p>"):
+                consumed.append(chunk)
+                yield chunk
+
+        stream_parse.parse(_chunks())
+
+        self.assertEqual(consumed, [_COMPONENTS_TABLE, _DIFFS_TABLE])
+
+    def test_parse_missing_table(self) -> None:
+        "Test missing table is reported."
+        with self.assertRaises(wiki_snp.ParseError):
+            stream_parse.parse(_COMPONENTS_TABLE)
+        with self.assertRaises(wiki_snp.ParseError):
+            stream_parse.parse(_NOISE_TABLE + _DIFFS_TABLE)
+
+    def test_parse_history(self) -> None:
+        "Test diffs table is read only until the newest known diff."
+        consumed = []
+        new_row = f"""
+        <tr>
+          <td>June 10, 2022</td>
+          {to_html_row(_COMPONENTS[0])}
+          {to_html_row(None)}
+          <td>New.</td>
+        </tr>
+        """
+        diffs_table = _DIFFS_TABLE.replace("<tbody>", "<tbody>" + new_row)
+        head, tail = diffs_table.split("<td>June 9, 2022</td>")
+
+        def _chunks() -> typing.Iterator[str]:
+            for chunk in (_COMPONENTS_TABLE, head, "<td>June 9, 2022</td>", tail):
+                consumed.append(chunk)
+                yield chunk
+
+        got = stream_parse.parse(_chunks(), history=_DIFFS[1:])
+
+        new = index.Diff(datetime.date(2022, 6, 10), _COMPONENTS[0], None, "New.")
+        self.assertEqual(got, index.Index(_COMPONENTS, [new] + _DIFFS))
+        self.assertEqual(consumed, [_COMPONENTS_TABLE, head])
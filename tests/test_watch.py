@@ -0,0 +1,257 @@
+"""Watch mode unit test."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import tempfile
+import typing
+import unittest
+
+from scrape_wiki_snp import index, main, stream_parse, watch, wiki_snp
+from scrape_wiki_snp.download import Downloader
+
+from .server import StandInServer
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+from .test_wiki_snp import to_html_row
+
+_PAGE = _COMPONENTS_TABLE + _DIFFS_TABLE
+
+_ADDED = index.Component("NEW", "N e w.")
+
+_CHANGED_PAGE = _PAGE.replace(
+    "</table>", f"<tr>{to_html_row(_ADDED)}<td>Tech</td></tr></table>", 1
+).replace(
+    '<tr><td><a href="#">XYZ</a></td><td><b>X y z.</b></td><td>Tech</td></tr>', ""
+)
+
+
+class WatchTest(unittest.TestCase):
+    "Watch mode unit test."
+
+    def setUp(self) -> None:
+        "Start stand-in server."
+        self.server = StandInServer({"/page": _PAGE.encode("utf-8")})
+        self.addCleanup(self.server.close)
+
+        self.downloader = Downloader(cache=False, retries=0)
+        self.addCleanup(self.downloader.close)
+
+        self.parsed: typing.List[str] = []
+        self.parse_failures = 0
+        self.watcher = watch.Watcher(
+            [self.server.url("/page")], self._parse, self.downloader
+        )
+
+    def _parse(self, html: str) -> index.Index:
+        self.parsed.append(html)
+        if self.parse_failures:
+            self.parse_failures -= 1
+            raise wiki_snp.ParseError("Components table not found")
+        return stream_parse.parse(html)
+
+    def _events(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        events = self.watcher.poll()
+        for event in events:
+            self.assertEqual(event["url"], self.server.url("/page"))
+            del event["time"], event["url"]
+        return events
+
+    def test_changes(self) -> None:
+        "Test changes between index versions are reported."
+        old = stream_parse.parse(_PAGE)
+        new = index.Index(
+            old.components[1:] + [_ADDED],
+            old.diffs[:1]
+            + [
+                index.Diff(datetime.date(2022, 6, 10), _ADDED, None, "Added."),
+                index.Diff("soon", None, None, "Date is not known."),
+            ],
+        )
+        versions = {_PAGE: old, _CHANGED_PAGE: new}
+        watcher = watch.Watcher(
+            [self.server.url("/page")], versions.__getitem__, self.downloader
+        )
+
+        watcher.poll()
+        self.server.pages["/page"] = _CHANGED_PAGE.encode("utf-8")
+        events = watcher.poll()
+        for event in events:
+            del event["time"], event["url"]
+
+        self.assertEqual(
+            events,
+            [
+                {
+                    "event": "component_added",
+                    "component": {"symbol": "NEW", "name": "N e w."},
+                },
+                {
+                    "event": "component_removed",
+                    "component": {"symbol": "ABC", "name": "A b c."},
+                },
+                {
+                    "event": "diff_added",
+                    "diff": {
+                        "date": "2022-06-10",
+                        "added": {"symbol": "NEW", "name": "N e w."},
+                        "removed": None,
+                        "reason": "Added.",
+                    },
+                },
+                {
+                    "event": "diff_added",
+                    "diff": {
+                        "date": "soon",
+                        "added": None,
+                        "removed": None,
+                        "reason": "Date is not known.",
+                    },
+                },
+                {
+                    "event": "diff_removed",
+                    "diff": {
+                        "date": "2022-06-08",
+                        "added": None,
+                        "removed": {"symbol": "DDD", "name": "D d d."},
+                        "reason": "Market capitalization change.",
+                    },
+                },
+                {
+                    "event": "diff_removed",
+                    "diff": {
+                        "date": "2022-06-09",
+                        "added": {"symbol": "EEE", "name": "E e e."},
+                        "removed": None,
+                        "reason": "FFF was acquired by XXX.",
+                    },
+                },
+            ],
+        )
+        self.assertEqual(watcher.poll(), [])
+
+    def test_etag(self) -> None:
+        "Test page is not parsed again while the server replies not modified."
+        self.server.headers["/page"] = {"ETag": '"1"'}
+
+        self.assertEqual(
+            self._events(), [{"event": "loaded", "components": 2, "diffs": 3}]
+        )
+        self.assertEqual(self._events(), [])
+        self.assertEqual(len(self.parsed), 1)
+
+        self.server.pages["/page"] = _CHANGED_PAGE.encode("utf-8")
+        self.server.headers["/page"] = {"ETag": '"2"'}
+
+        self.assertEqual(
+            self._events(),
+            [
+                {
+                    "event": "component_added",
+                    "component": {"symbol": "NEW", "name": "N e w."},
+                },
+                {
+                    "event": "component_removed",
+                    "component": {"symbol": "XYZ", "name": "X y z."},
+                },
+            ],
+        )
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(
+            self.watcher.current(self.server.url("/page")),
+            stream_parse.parse(_CHANGED_PAGE),
+        )
+
+    def test_content_hash(self) -> None:
+        "Test page is not parsed again while its content is the same."
+        self._events()
+        self.assertEqual(self._events(), [])
+        self.assertEqual(len(self.parsed), 1)
+
+        self.server.pages["/page"] = (_PAGE + "<p>edit</p>").encode("utf-8")
+
+        self.assertEqual(self._events(), [])
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_error(self) -> None:
+        "Test failed polls are reported, and the page is polled again."
+        self.server.failures["/page"] = 1
+
+        events = self._events()
+        self.assertEqual([event["event"] for event in events], ["error"])
+        self.assertEqual(
+            self._events(), [{"event": "loaded", "components": 2, "diffs": 3}]
+        )
+
+    def test_parse_error(self) -> None:
+        "Test pages failing to parse are reported, and parsed again."
+        self.server.headers["/page"] = {"ETag": '"1"'}
+        self._events()
+
+        self.server.pages["/page"] = _CHANGED_PAGE.encode("utf-8")
+        self.server.headers["/page"] = {"ETag": '"2"'}
+        self.parse_failures = 1
+
+        self.assertEqual(
+            self._events(),
+            [{"event": "error", "error": "Components table not found"}],
+        )
+        self.assertEqual(
+            [event["event"] for event in self._events()],
+            ["component_added", "component_removed"],
+        )
+        self.assertEqual(self._events(), [])
+        self.assertEqual(len(self.parsed), 3)
+
+    def test_parse_error_bs4(self) -> None:
+        "Test pages the bs4 engine finds no tables in are reported."
+        watcher = watch.Watcher(
+            [self.server.url("/page")], wiki_snp.parse, self.downloader
+        )
+
+        for page in ("<html><p>maintenance</p></html>", _COMPONENTS_TABLE):
+            with self.subTest(page):
+                self.server.pages["/page"] = page.encode("utf-8")
+                self.assertEqual(
+                    [event["event"] for event in watcher.poll()], ["error"]
+                )
+
+        self.server.pages["/page"] = _PAGE.encode("utf-8")
+        self.assertEqual([event["event"] for event in watcher.poll()], ["loaded"])
+
+    def test_run(self) -> None:
+        "Test polls are spaced by the interval."
+        events: typing.List[watch.Event] = []
+        sleeps: typing.List[float] = []
+
+        self.watcher.run(60.0, events.append, polls=3, sleep=sleeps.append)
+
+        self.assertEqual([event["event"] for event in events], ["loaded"])
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(all(50.0 < sleep <= 60.0 for sleep in sleeps))
+
+    def test_cli(self) -> None:
+        "Test watch subcommand appends events to a file."
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out = os.path.join(tmp_dir, "events.jsonl")
+            argv = [
+                "watch",
+                self.server.url("/page"),
+                "--engine",
+                "stream",
+                "--interval",
+                "0",
+                "--polls",
+                "2",
+                "--out",
+                out,
+            ]
+
+            self.assertEqual(main.cli_main(argv), 0)
+            self.assertEqual(main.cli_main(argv), 0)
+
+            with open(out, "r", encoding="utf-8") as out_file:
+                events = [json.loads(line) for line in out_file]
+
+        self.assertEqual([event["event"] for event in events], ["loaded"] * 2)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import datetime
 import typing
 import unittest
 
@@ -38,24 +39,52 @@ def to_html_row(component: typing.Optional[index.Component]) -> str:
     return f"<td>{component.symbol}</td><td>{component.name}</td>"
 
 
+def with_backends(
+    cases: typing.List[typing.Tuple[typing.Any, ...]],
+) -> typing.List[typing.Tuple[typing.Any, ...]]:
+    """
+    Repeat test cases for every parser backend.
+
+    :param cases: Test cases.
+    :return: Test cases with a backend name appended.
+    """
+    return [case + (backend,) for backend in wiki_snp.BACKENDS for case in cases]
+
+
 class WikiSnpTest(unittest.TestCase):
     "snp index parsed unit test."
 
+    def make_soup(self, html: str, backend: str) -> bs4.BeautifulSoup:
+        """
+        Parse html with a backend, skip the test if it is not installed.
+
+        :param html: html to parse.
+        :param backend: BeautifulSoup backend.
+        :return: Soup parsed.
+        """
+        if backend not in wiki_snp.available_backends():
+            self.skipTest(f"{backend} is not installed")
+
+        return bs4.BeautifulSoup(html, backend)
+
     @parameterized.expand(  # type: ignore
-        [
-            ("Ticker symbol", "Security"),
-            ("Symbol", "Security"),
-            ("Ticker", "Security"),
-            ("Ticker", "Company"),
-            ("Ticker\n", "Company\n"),
-        ]
+        with_backends(
+            [
+                ("Ticker symbol", "Security"),
+                ("Symbol", "Security"),
+                ("Ticker", "Security"),
+                ("Ticker", "Company"),
+                ("Ticker\n", "Company\n"),
+            ]
+        )
     )
-    def test_parse_components(self, symbol_hdr, company_hdr) -> None:
+    def test_parse_components(self, symbol_hdr, company_hdr, backend) -> None:
         """
         Test components parsing.
 
         :param symbol_hdr: Symbol header name.
         :param company_hdr: Company header name.
+        :param backend: BeautifulSoup backend.
         """
         expected = index.Component("ABC", "A b c.")
         html = f"""<table>
@@ -68,7 +97,7 @@ class WikiSnpTest(unittest.TestCase):
         </table>
         """
 
-        soup = bs4.BeautifulSoup(html, "html.parser")
+        soup = self.make_soup(html, backend)
         table = soup.find("table")
         assert isinstance(table, bs4.Tag)
 
@@ -78,36 +107,41 @@ class WikiSnpTest(unittest.TestCase):
         self.assertEqual(components[0], expected)
 
     @parameterized.expand(  # type: ignore
-        [
-            (
-                index.Diff(
-                    "June 8, 2022",
-                    index.Component("ABC", "A b c."),
-                    index.Component("XYZ", "X y z."),
-                    "Market capitalization change.",
+        with_backends(
+            [
+                (
+                    index.Diff(
+                        datetime.date(2022, 6, 8),
+                        index.Component("ABC", "A b c."),
+                        index.Component("XYZ", "X y z."),
+                        "Market capitalization change.",
+                    ),
                 ),
-            ),
-            (
-                index.Diff(
-                    "June 8, 2022",
-                    None,
-                    index.Component("XYZ", "X y z."),
-                    "Market capitalization change.",
+                (
+                    index.Diff(
+                        datetime.date(2022, 6, 8),
+                        None,
+                        index.Component("XYZ", "X y z."),
+                        "Market capitalization change.",
+                    ),
                 ),
-            ),
-            (
-                index.Diff(
-                    "June 8, 2022",
-                    index.Component("ABC", "A b c."),
-                    None,
-                    "Market capitalization change.",
+                (
+                    index.Diff(
+                        datetime.date(2022, 6, 8),
+                        index.Component("ABC", "A b c."),
+                        None,
+                        "Market capitalization change.",
+                    ),
                 ),
-            ),
-        ]
+            ]
+        )
     )
-    def xtest_parse_diffs(self, expected: index.Diff) -> None:
+    def xtest_parse_diffs(self, expected: index.Diff, backend: str) -> None:
         """
         Test index diffs parsing (no colspan).
+
+        :param expected: Diff expected.
+        :param backend: BeautifulSoup backend.
         """
         html = f"""
         <table>
@@ -123,7 +157,7 @@ class WikiSnpTest(unittest.TestCase):
         </table>
         """
 
-        soup = bs4.BeautifulSoup(html, "html.parser")
+        soup = self.make_soup(html, backend)
         table = soup.find("table")
         assert isinstance(table, bs4.Tag)
 
@@ -132,24 +166,27 @@ class WikiSnpTest(unittest.TestCase):
         self.assertEqual(len(diffs), 1)
         self.assertEqual(diffs[0], expected)
 
-    def test_pare_diffs_rowspan(self) -> None:
+    @parameterized.expand(with_backends([()]))  # type: ignore
+    def test_pare_diffs_rowspan(self, backend: str) -> None:
         """
         Test index diffs parsing (with colspan).
+
+        :param backend: BeautifulSoup backend.
         """
         diff1 = index.Diff(
-            "June 8, 2022",
+            datetime.date(2022, 6, 8),
             index.Component("AAA", "A a a."),
             index.Component("BBB", "B b b."),
             "Market capitalization change.",
         )
         diff2 = index.Diff(
-            "June 8, 2022",
+            datetime.date(2022, 6, 8),
             index.Component("CCC", "C c c."),
             index.Component("DDD", "D d d."),
             "Market capitalization change.",
         )
         diff3 = index.Diff(
-            "June 9, 2022",
+            datetime.date(2022, 6, 9),
             index.Component("EEE", "E e e."),
             index.Component("FFF", "F f f."),
             "FFF was acquired by XXX.",
@@ -160,7 +197,7 @@ class WikiSnpTest(unittest.TestCase):
         {_DIFFS_HEADER}
         <tbody>
         <tr>
-          <td rowspan="2">{diff1.date}</td>
+          <td rowspan="2">{index.format_date(diff1.date)}</td>
           {to_html_row(diff1.added)}
           {to_html_row(diff1.removed)}
           <td rowspan="2">{diff1.reason}</td>
@@ -170,7 +207,7 @@ class WikiSnpTest(unittest.TestCase):
           {to_html_row(diff2.removed)}
         </tr>
         <tr>
-          <td>{diff3.date}</td>
+          <td>{index.format_date(diff3.date)}</td>
           {to_html_row(diff3.added)}
           {to_html_row(diff3.removed)}
           <td>{diff3.reason}</td>
@@ -180,7 +217,7 @@ class WikiSnpTest(unittest.TestCase):
         </table>
         """
 
-        soup = bs4.BeautifulSoup(html, "html.parser")
+        soup = self.make_soup(html, backend)
         table = soup.find("table")
         self.assertIsNotNone(table)
 
@@ -189,35 +226,40 @@ class WikiSnpTest(unittest.TestCase):
         self.assertEqual(diffs, [diff1, diff2, diff3])
 
     @parameterized.expand(  # type: ignore
-        [
-            (
-                """
+        with_backends(
+            [
+                (
+                    """
             <table>one</table>
             <table>two</table>
             """,
-                0,
-                1,
-            ),
-            (
-                """
+                    0,
+                    1,
+                ),
+                (
+                    """
             <table>one</table>
             <table>two</table>
             <table>three</table>
             """,
-                1,
-                2,
-            ),
-        ]
+                    1,
+                    2,
+                ),
+            ]
+        )
     )
-    def test_parse_index(self, html: str, components_idx: int, diffs_idx: int) -> None:
+    def test_parse_index(
+        self, html: str, components_idx: int, diffs_idx: int, backend: str
+    ) -> None:
         """
         Test index parsing.
 
         :param html: html to parse.
         :param components_idx: Talbe index with the components.
         :param diffs_idx: Talbe index with the diffs.
+        :param backend: BeautifulSoup backend.
         """
-        soup = bs4.BeautifulSoup(html, "html.parser")
+        soup = self.make_soup(html, backend)
         tables = soup.find_all("table")
 
         parse_componetns_called = False
@@ -237,7 +279,124 @@ class WikiSnpTest(unittest.TestCase):
 
             return []
 
-        wiki_snp.parse(html, _parse_componetns, _parse_diffs)
+        wiki_snp.parse(html, _parse_componetns, _parse_diffs, backend)
 
         self.assertTrue(parse_componetns_called)
         self.assertTrue(parse_diffs_called)
+
+    @parameterized.expand(with_backends([()]))  # type: ignore
+    def test_parse_missing_table(self, backend: str) -> None:
+        """
+        Test missing table is reported.
+
+        :param backend: BeautifulSoup backend.
+        """
+        self.make_soup("", backend)
+
+        for html in ("<html><p>maintenance</p></html>", "<table>one</table>"):
+            with self.subTest(html):
+                with self.assertRaises(wiki_snp.ParseError):
+                    wiki_snp.parse(html, backend=backend)
+
+    @parameterized.expand(with_backends([()]))  # type: ignore
+    def test_parse_backends_agree(self, backend: str) -> None:
+        """
+        Test every backend parses a page the same way.
+
+        :param backend: BeautifulSoup backend.
+        """
+        self.make_soup("", backend)
+
+        component = index.Component("ABC", "A b c.")
+        diff = index.Diff(datetime.date(2022, 6, 8), component, None, "Just because.")
+        html = f"""
+        <html><head><title>S&amp;P</title></head><body>
+        <p>Noise<br>text <a href="#">link</a></p>
+        <table class="wikitable">
+        <tbody>
+        <tr><th>Symbol</th><th>Security</th></tr>
+        <tr>{to_html_row(component)}</tr>
+        </tbody>
+        </table>
+        <div><p>More noise</p></div>
+        <table>
+        {_DIFFS_HEADER}
+        <tbody>
+        <tr>
+          <td>{index.format_date(diff.date)}</td>
+          {to_html_row(diff.added)}
+          {to_html_row(diff.removed)}
+          <td>{diff.reason}</td>
+        </tr>
+        </tbody>
+        </table>
+        </body></html>
+        """
+
+        got = wiki_snp.parse(html, backend=backend)
+
+        self.assertEqual(got, index.Index([component], [diff]))
+
+    def test_merge_diffs(self) -> None:
+        """Test new diffs are put on top of the history."""
+        diffs = [
+            index.Diff(str(number), None, None, "Just because.") for number in range(4)
+        ]
+
+        with self.subTest("history_found"):
+            got = wiki_snp.merge_diffs(iter(diffs[:3]), diffs[2:])
+            self.assertEqual(got, diffs)
+
+        with self.subTest("no_history"):
+            self.assertEqual(wiki_snp.merge_diffs(iter(diffs), []), diffs)
+
+        with self.subTest("history_not_found"):
+            got = wiki_snp.merge_diffs(iter(diffs[:2]), diffs[3:])
+            self.assertEqual(got, diffs[:2])
+
+    @parameterized.expand(with_backends([()]))  # type: ignore
+    def test_parse_diffs_history(self, backend: str) -> None:
+        """
+        Test parsing stops at the newest known diff inside a rowspan.
+
+        :param backend: BeautifulSoup backend.
+        """
+        new = index.Diff(
+            datetime.date(2022, 6, 8),
+            index.Component("NNN", "N n n."),
+            None,
+            "Market capitalization change.",
+        )
+        known = index.Diff(
+            datetime.date(2022, 6, 8),
+            index.Component("AAA", "A a a."),
+            index.Component("BBB", "B b b."),
+            "Market capitalization change.",
+        )
+        older = index.Diff(datetime.date(2022, 6, 7), None, None, "Old.")
+
+        html = f"""
+        <table>
+        {_DIFFS_HEADER}
+        <tbody>
+        <tr>
+          <td rowspan="2">{index.format_date(new.date)}</td>
+          {to_html_row(new.added)}
+          {to_html_row(new.removed)}
+          <td rowspan="2">{new.reason}</td>
+        </tr>
+        <tr>
+          {to_html_row(known.added)}
+          {to_html_row(known.removed)}
+        </tr>
+        <tr><td>This row is not parsed</td></tr>
+        </tbody>
+        </table>
+        """
+
+        table = self.make_soup(html, backend).find("table")
+        assert isinstance(table, bs4.Tag)
+
+        diffs = wiki_snp.parse_diffs(table, history=[known, older])
+
+        self.assertEqual(diffs, [new, known, older])
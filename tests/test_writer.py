@@ -0,0 +1,85 @@
+"""Streaming yaml writer unit test."""
+
+import datetime
+import io
+import typing
+import unittest
+
+import yaml
+from parameterized import parameterized  # type: ignore
+
+from scrape_wiki_snp import index, stream_parse, writer
+from scrape_wiki_snp.dumper import CDumper, Dumper, DumperMixin
+
+from .test_stream_parse import _COMPONENTS_TABLE, _DIFFS_TABLE
+
+
+def _shared_index() -> index.Index:
+    first = index.Component("BRK.B", "Berkshire Hathaway")
+    second = index.Component("BRK_B", "Other")
+    third = index.Component("id001", "Looks like a generated anchor")
+    diff = index.Diff(datetime.date(2020, 1, 2), first, second, "Rename.")
+
+    return index.Index(
+        [first, second, index.Component("ABC", "A b c.")],
+        [
+            diff,
+            index.Diff("Early 2000", third, third, "yes"),
+            diff,
+            index.Diff(datetime.date(2020, 1, 2), None, first, "null"),
+            index.Diff("2020-01-01", None, None, "Multi\nline: 'reason'"),
+        ],
+    )
+
+
+class WriterTest(unittest.TestCase):
+    "Streaming writer test."
+
+    @parameterized.expand(  # type: ignore
+        [
+            ("dumper", Dumper, True),
+            ("dumper_unsorted", Dumper, False),
+            ("c_dumper", CDumper, True),
+            ("c_dumper_unsorted", CDumper, False),
+        ]
+    )
+    def test_same_as_dumper(
+        self, _: str, dumper: typing.Type[DumperMixin], sort_keys: bool
+    ) -> None:
+        """
+        Test output is byte for byte the one of the dumper.
+
+        :param dumper: Dumper class.
+        :param sort_keys: Sort mapping keys.
+        """
+        parsed = stream_parse.parse(_COMPONENTS_TABLE + _DIFFS_TABLE)
+        cases = {
+            "shared": [_shared_index()],
+            "parsed": [parsed],
+            "empty": [index.Index([], [])],
+            "several": [_shared_index(), parsed, _shared_index()],
+        }
+
+        for name, indices in cases.items():
+            with self.subTest(name):
+                out = io.StringIO()
+                with writer.IndexWriter(out, dumper, sort_keys) as index_writer:
+                    for idx in indices:
+                        index_writer.write(idx)
+
+                self.assertEqual(
+                    out.getvalue(),
+                    yaml.dump_all(indices, None, dumper, sort_keys=sort_keys),
+                )
+
+    def test_dump(self) -> None:
+        "Test module level functions."
+        idx = _shared_index()
+
+        out = io.StringIO()
+        writer.dump(idx, out)
+        self.assertEqual(out.getvalue(), yaml.dump(idx, None, CDumper))
+
+        out = io.StringIO()
+        writer.dump_all([idx, idx], out)
+        self.assertEqual(out.getvalue(), yaml.dump_all([idx, idx], None, CDumper))